@@ -0,0 +1,85 @@
+"""
+"Matches of queue 420 a champion won" over cached matches, parsing every match
+against the normalized tables of `AAshe.match.matches.normalized`.
+
+The cache is filled with `matches` sample matches, half of them in queue 420.
+"parse" reads the matches of the queue and walks their participants,
+"read_related" reads the matching ones with the filters in SQL and
+"read_relation" reads only the rows of the participants. The writes are timed
+with and without the normalized tables, which they have to keep up to date.
+
+	python -m AAshe.benchmarks.match_relations [matches] [queries]
+"""
+import tempfile
+import sqlite3
+import time
+import sys
+import os
+
+import AAshe.match.matches as matches
+import AAshe.benchmarks.samples as samples
+
+
+def parse(champion_id: int)->set:
+	found = set()
+	for match in matches.Match.read_all_data(queueId=420):
+		for participant in match.participants:
+			if participant.championId == champion_id and participant.stats.win:
+				found.add(match.matchId)
+	return found
+
+
+def read_related(champion_id: int)->set:
+	return {
+		match.matchId
+		for match in matches.Match.read_related("match_participants", championId=champion_id, win=True, queueId=420)}
+
+
+def read_relation(champion_id: int)->set:
+	return {
+		row["matchId"]
+		for row in matches.Match.read_relation("match_participants", championId=champion_id, win=True, queueId=420)}
+
+
+def main():
+	count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+	queries = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+	cls = matches.Match
+	cls.memory_max_bytes = 0
+
+	objects = []
+	for match_id in range(count):
+		data = samples.match(match_id)
+		data["queueId"] = 420 if match_id % 2 else 440
+		objects.append(cls.from_response(region="euw1", match_id=match_id, resp_data=data))
+	champion_ids = [objects[i].participants[0].championId for i in range(1, 2 * queries, 2)]
+
+	print(f"{count} matches")
+	print(f"  {'layout':<12}{'write':>8}{'per match':>12}{'size':>8}")
+	with tempfile.TemporaryDirectory() as directory:
+		for layout, relations in (("JSON", []), ("normalized", matches.normalized)):
+			cls.relations = relations
+			path = os.path.join(directory, f"{layout}.db")
+			conn = sqlite3.connect(path)
+			cls.init_database(conn=conn)
+
+			start = time.perf_counter()
+			for begin in range(0, count, 500):
+				cls.bulk_write(objects[begin:begin + 500])
+			seconds = time.perf_counter() - start
+			print(f"  {layout:<12}{seconds:>7.2f}s{seconds / count * 1e6:>10.0f}us{os.path.getsize(path) / 1024 ** 2:>6.0f}MB")
+
+		print(f"{queries} queries, a champion that won in queue 420 each")
+		print(f"  {'mode':<15}{'took':>8}{'per query':>12}")
+		expected = [parse(champion_id) for champion_id in champion_ids]
+		for name, query in (("parse", parse), ("read_related", read_related), ("read_relation", read_relation)):
+			start = time.perf_counter()
+			for champion_id, found in zip(champion_ids, expected):
+				assert query(champion_id) == found
+			seconds = time.perf_counter() - start
+			print(f"  {name:<15}{seconds:>7.2f}s{seconds / queries * 1000:>10.1f}ms")
+		conn.close()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,79 @@
+"""
+Simulated-clock comparison of the `RateLimit` limit engines.
+
+Nothing sleeps, every engine is asked for the earliest send time of each queued
+call and the clock jumps straight to it. For every scenario it reports the calls
+sent against the theoretical maximum, and the most calls seen in any window of
+each tier, anything above the limit is what Riot answers with a 429.
+
+	python -m AAshe.benchmarks.ratelimit_engines
+"""
+import typing
+
+import AAshe.utils.ratelimit as ratelimit
+
+# Float error on times that are meant to be equal, e.g. 0.04 + 1.0 against 1.04.
+EPSILON = 1e-9
+
+ENGINES = (
+	("fixed window", ratelimit.RateLimit.Region.Limit),
+	("sliding log", ratelimit.RateLimit.Region.SlidingLog),
+	("gcra", ratelimit.RateLimit.Region.GCRA),
+)
+
+# (name, limits as (period, every), arrival times of the calls, horizon in seconds)
+SCENARIOS = (
+	("backlog 20/1s+100/120s", ((20, 1.0), (100, 120.0)), [0.0] * 5000, 600.0),
+	("steady 25/s vs 20/1s", ((20, 1.0),), [i / 25 for i in range(25 * 60)], 60.0),
+	("steady 1/s vs 20/1s+100/120s", ((20, 1.0), (100, 120.0)), [float(i) for i in range(600)], 600.0),
+)
+
+
+def simulate(engine: typing.Type[ratelimit.RateLimit.Region.Limit], limits, arrivals, horizon)->typing.List[float]:
+	"""Returns the send times of the calls, served in arrival order."""
+	tiers = [engine(period=period, every=every) for period, every in limits]
+	sent = []
+	now = 0.0
+	for arrival in arrivals:
+		now = max(now, arrival)
+		now = max([tier.earliest(now) for tier in tiers])
+		if now >= horizon - EPSILON:
+			break
+		for tier in tiers:
+			tier.hit(at=now)
+		sent.append(now)
+	return sent
+
+
+def theoretical_max(limits, arrivals, horizon)->int:
+	"""Most calls any limiter could send within the horizon without breaking a window."""
+	demand = len([arrival for arrival in arrivals if arrival < horizon])
+	capacity = min([period * -(-horizon // every) for period, every in limits])
+	return int(min(demand, capacity))
+
+
+def peak(sent: typing.List[float], every: float)->int:
+	"""Most calls within any window [t, t + every)."""
+	most = 0
+	start = 0
+	for end, t in enumerate(sent):
+		while t - sent[start] >= every - EPSILON:
+			start += 1
+		most = max(most, end - start + 1)
+	return most
+
+
+def main():
+	for scenario, limits, arrivals, horizon in SCENARIOS:
+		bound = theoretical_max(limits, arrivals, horizon)
+		print(f"{scenario} over {horizon:.0f}s, theoretical max {bound}")
+		print(f"  {'engine':<14}{'sent':>7}{'of max':>9}  peak per window")
+		for name, engine in ENGINES:
+			sent = simulate(engine, limits, arrivals, horizon)
+			peaks = ", ".join([f"{peak(sent, every)}/{period}" for period, every in limits])
+			print(f"  {name:<14}{len(sent):>7}{len(sent) / bound:>9.1%}  {peaks}")
+		print()
+
+
+if __name__ == "__main__":
+	main()
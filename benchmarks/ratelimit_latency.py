@@ -0,0 +1,85 @@
+"""
+Wait latency of `RateLimit.check_cooldown` under many concurrent callers.
+
+Compares the reservation scheduler against the previous approach, which held an
+asyncio lock on the region while sleeping. A tenth of the callers use endpoints
+that don't count on the key (count=False).
+
+	python -m AAshe.benchmarks.ratelimit_latency [callers]
+"""
+import asyncio
+import time
+import sys
+
+import AAshe.utils.ratelimit as ratelimit
+
+LIMITS = ((100, 0.5), (300, 2.0))
+
+
+class LockedRateLimit(ratelimit.RateLimit):
+	"""The previous scheduler, sleeping while holding the region lock."""
+
+	__slots__ = (
+		"locks",  # type: dict
+	)
+
+	def __init__(self, name: str):
+		super().__init__(name=name)
+		self.locks = {}
+
+	async def check_cooldown(self, region: str, count: bool=True)->None:
+		region_limit = self.region_limits[region.lower()]
+		lock = self.locks.setdefault(region.lower(), asyncio.Lock())
+
+		async with lock:
+			now = time.time()
+			send_at = max([limit.earliest(now) for limit in region_limit.limits], default=now)
+			if send_at > now:
+				await asyncio.sleep(send_at - now)
+			if count:
+				for limit in region_limit.limits:
+					limit.hit(at=time.time())
+
+
+def percentile(values: list, fraction: float)->float:
+	values = sorted(values)
+	return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def measure(limit: ratelimit.RateLimit, callers: int)->(list, list):
+	for period, every in LIMITS:
+		limit.add_limit(period=period, every=every, region="euw1")
+
+	async def one(count: bool)->float:
+		start = time.perf_counter()
+		await limit.check_cooldown(region="euw1", count=count)
+		return time.perf_counter() - start
+
+	counts = [i % 10 != 0 for i in range(callers)]
+	waits = await asyncio.gather(*[one(count) for count in counts])
+	counted = [wait for wait, count in zip(waits, counts) if count]
+	uncounted = [wait for wait, count in zip(waits, counts) if not count]
+	return counted, uncounted
+
+
+async def async_main(callers: int):
+	limits = ", ".join([f"{period}/{every}s" for period, every in LIMITS])
+	print(f"{callers} concurrent callers, limits {limits}")
+	print(f"  {'scheduler':<14}{'p50':>9}{'p99':>9}{'max':>9}{'count=False p99':>17}")
+	for name, limit in (
+			("region lock", LockedRateLimit(name="Locked")),
+			("reservation", ratelimit.RateLimit(name="Reservation"))):
+		counted, uncounted = await measure(limit, callers)
+		print(
+			f"  {name:<14}{percentile(counted, 0.5):>8.3f}s{percentile(counted, 0.99):>8.3f}s"
+			f"{max(counted):>8.3f}s{percentile(uncounted, 0.99):>16.3f}s")
+
+
+def main():
+	ratelimit.RateLimit.logger.disabled = True
+	callers = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+	asyncio.run(async_main(callers=callers))
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,84 @@
+"""
+Aggregate send rate of several worker processes sharing one api key.
+
+Every worker runs its own `RateLimit` with the same limits. Without a store each
+of them believes it has the full budget, with a `SQLiteStore` they reserve
+their slots against each other's calls. The peaks are taken over the reserved
+slots, the lateness is how long after its slot a worker woke up, which is what
+`RateLimit.margin_of_error` is there to cover.
+
+	python -m AAshe.benchmarks.ratelimit_shared [workers] [calls per worker]
+"""
+import multiprocessing
+import tempfile
+import asyncio
+import time
+import sys
+import os
+
+import AAshe.utils.ratelimit as ratelimit
+
+LIMITS = ((20, 1.0), (100, 10.0))
+
+
+def worker(path: str, calls: int, start: float, results: multiprocessing.Queue):
+	ratelimit.RateLimit.logger.disabled = True
+	store = ratelimit.SQLiteStore(path=path) if path else None
+
+	async def run()->list:
+		limit = ratelimit.RateLimit(name="Api Key Limit", store=store)
+		for period, every in LIMITS:
+			limit.add_limit(period=period, every=every, region="euw1")
+
+		await asyncio.sleep(max(0.0, start - time.time()))
+		sent = []
+		for _ in range(calls):
+			await limit.check_cooldown(region="euw1")
+			sent.append((limit.region_limits["euw1"].reserved, time.time()))
+		return sent
+
+	results.put(asyncio.run(run()))
+
+
+def peak(sent: list, every: float)->int:
+	"""Most calls within any window [t, t + every)."""
+	most = 0
+	start = 0
+	for end, t in enumerate(sent):
+		while t - sent[start] >= every:
+			start += 1
+		most = max(most, end - start + 1)
+	return most
+
+
+def measure(path: str, workers: int, calls: int)->list:
+	results = multiprocessing.Queue()
+	start = time.time() + 1.0
+	processes = [
+		multiprocessing.Process(target=worker, args=(path, calls, start, results)) for _ in range(workers)]
+	for process in processes:
+		process.start()
+	sent = [t for _ in processes for t in results.get()]
+	for process in processes:
+		process.join()
+	return sent
+
+
+def main():
+	workers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+	calls = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+	limits = ", ".join([f"{period}/{every}s" for period, every in LIMITS])
+	print(f"{workers} workers x {calls} calls, limits {limits}")
+
+	with tempfile.TemporaryDirectory() as directory:
+		for name, path in (("per process", None), ("SQLiteStore", os.path.join(directory, "ratelimit.db"))):
+			sent = measure(path, workers, calls)
+			slots = sorted([slot for slot, _ in sent])
+			lateness = max([woke - slot for slot, woke in sent])
+			peaks = ", ".join([f"{peak(slots, every)}/{period}" for period, every in LIMITS])
+			rate = len(slots) / max(slots[-1] - slots[0], 1e-9)
+			print(f"  {name:<12} {rate:>8.1f} calls/s  peak per window {peaks}  lateness {lateness * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,115 @@
+"""
+Match and timeline documents shaped like the responses of match-v3, for the benchmarks.
+
+The values are random but seeded by the match id, so a match is the same on every run.
+"""
+import random
+
+STAT_NAMES = tuple(name for name in (
+	"physicalDamageDealt", "neutralMinionsKilledTeamJungle", "magicDamageDealt", "totalPlayerScore", "deaths",
+	"neutralMinionsKilledEnemyJungle", "altarsCaptured", "largestCriticalStrike", "totalDamageDealt",
+	"magicDamageDealtToChampions", "visionWardsBoughtInGame", "damageDealtToObjectives", "largestKillingSpree",
+	"item1", "quadraKills", "teamObjective", "totalTimeCrowdControlDealt", "longestTimeSpentLiving", "wardsKilled",
+	"item2", "item3", "item0", "visionScore", "wardsPlaced", "item4", "item5", "item6", "turretKills",
+	"tripleKills", "damageSelfMitigated", "champLevel", "nodeNeutralizeAssist", "goldEarned", "magicalDamageTaken",
+	"kills", "doubleKills", "nodeCaptureAssist", "trueDamageTaken", "nodeNeutralize", "assists", "unrealKills",
+	"neutralMinionsKilled", "objectivePlayerScore", "combatPlayerScore", "damageDealtToTurrets",
+	"altarsNeutralized", "physicalDamageDealtToChampions", "goldSpent", "trueDamageDealt",
+	"trueDamageDealtToChampions", "pentaKills", "totalHeal", "totalMinionsKilled", "nodeCapture",
+	"largestMultiKill", "sightWardsBoughtInGame", "totalDamageDealtToChampions", "totalUnitsHealed",
+	"inhibitorKills", "totalScoreRank", "totalDamageTaken", "killingSprees", "timeCCingOthers",
+	"physicalDamageTaken"))
+
+FLAG_NAMES = (
+	"win", "firstTowerAssist", "firstTowerKill", "firstBloodAssist", "firstInhibitorKill",
+	"firstInhibitorAssist", "firstBloodKill")
+
+EVENT_TYPES = ("ITEM_PURCHASED", "SKILL_LEVEL_UP", "WARD_PLACED", "CHAMPION_KILL", "WARD_KILL", "BUILDING_KILL")
+
+
+def match(match_id: int)->dict:
+	"""Returns a match document of ten participants."""
+	rng = random.Random(match_id)
+	participants = []
+	identities = []
+	for participant_id in range(1, 11):
+		stats = {name: rng.randrange(0, 50000) for name in STAT_NAMES}
+		stats.update({name: rng.random() < 0.5 for name in FLAG_NAMES})
+		stats["participantId"] = participant_id
+		deltas = {"0-10": rng.random() * 10, "10-20": rng.random() * 10}
+		participants.append({
+			"participantId": participant_id,
+			"teamId": 100 if participant_id <= 5 else 200,
+			"championId": rng.randrange(1, 500),
+			"spell1Id": 4,
+			"spell2Id": rng.choice((7, 11, 12, 14)),
+			"highestAchievedSeasonTier": "GOLD",
+			"stats": stats,
+			"timeline": {
+				"participantId": participant_id, "lane": "MIDDLE", "role": "SOLO",
+				"creepsPerMinDeltas": deltas, "xpPerMinDeltas": deltas, "goldPerMinDeltas": deltas,
+				"csDiffPerMinDeltas": deltas, "xpDiffPerMinDeltas": deltas,
+				"damageTakenPerMinDeltas": deltas, "damageTakenDiffPerMinDeltas": deltas}})
+		identities.append({
+			"participantId": participant_id,
+			"player": {
+				"platformId": "EUW1", "currentPlatformId": "EUW1", "summonerName": f"player {match_id} {participant_id}",
+				"matchHistoryUri": f"/v1/stats/player_history/EUW1/{participant_id}", "profileIcon": 1,
+				"accountId": rng.randrange(10 ** 7, 10 ** 8), "currentAccountId": rng.randrange(10 ** 7, 10 ** 8),
+				"summonerId": rng.randrange(10 ** 7, 10 ** 8)}})
+
+	teams = [{
+		"teamId": team_id, "win": "Win" if team_id == 100 else "Fail",
+		"firstBlood": team_id == 100, "firstTower": team_id == 200, "firstInhibitor": False,
+		"firstBaron": False, "firstDragon": True, "firstRiftHerald": False, "towerKills": rng.randrange(12),
+		"inhibitorKills": rng.randrange(3), "baronKills": rng.randrange(2), "dragonKills": rng.randrange(4),
+		"vilemawKills": 0, "riftHeraldKills": rng.randrange(2), "dominionVictoryScore": 0,
+		"bans": [{"championId": rng.randrange(1, 500), "pickTurn": turn} for turn in range(1, 6)]}
+		for team_id in (100, 200)]
+
+	return {
+		"gameId": match_id, "platformId": "EUW1", "gameCreation": 1500000000000 + match_id,
+		"gameDuration": rng.randrange(1200, 2400), "queueId": 420, "mapId": 11, "seasonId": 9,
+		"gameVersion": "7.16.195.7908", "gameMode": "CLASSIC", "gameType": "MATCHED_GAME",
+		"teams": teams, "participants": participants, "participantIdentities": identities}
+
+
+def timeline(match_id: int, minutes: int=30, events_per_frame: int=40)->dict:
+	"""Returns a timeline document with a frame per minute."""
+	rng = random.Random(match_id)
+	frames = []
+	for minute in range(minutes + 1):
+		participant_frames = {}
+		for participant_id in range(1, 11):
+			participant_frames[str(participant_id)] = {
+				"participantId": participant_id,
+				"position": {"x": rng.randrange(0, 14870), "y": rng.randrange(0, 14980)},
+				"currentGold": rng.randrange(0, 3000), "totalGold": 500 + minute * rng.randrange(250, 450),
+				"level": min(18, 1 + minute // 2), "xp": minute * rng.randrange(300, 500),
+				"minionsKilled": minute * rng.randrange(4, 9), "jungleMinionsKilled": rng.randrange(0, 50),
+				"dominionScore": 0, "teamScore": 0}
+
+		events = []
+		for _ in range(events_per_frame if minute else 0):
+			event_type = rng.choice(EVENT_TYPES)
+			event = {
+				"type": event_type, "timestamp": (minute - 1) * 60000 + rng.randrange(60000),
+				"participantId": rng.randrange(1, 11)}
+			if event_type == "ITEM_PURCHASED":
+				event["itemId"] = rng.randrange(1000, 4000)
+			elif event_type == "SKILL_LEVEL_UP":
+				event.update({"skillSlot": rng.randrange(1, 5), "levelUpType": "NORMAL"})
+			elif event_type in ("WARD_PLACED", "WARD_KILL"):
+				event.update({"wardType": "YELLOW_TRINKET", "creatorId": event["participantId"]})
+			else:
+				event.update({
+					"killerId": event.pop("participantId"), "victimId": rng.randrange(1, 11),
+					"assistingParticipantIds": rng.sample(range(1, 11), 2),
+					"position": {"x": rng.randrange(0, 14870), "y": rng.randrange(0, 14980)}})
+				if event_type == "BUILDING_KILL":
+					event.update({"teamId": 100, "buildingType": "TOWER_BUILDING", "laneType": "MID_LANE"})
+			events.append(event)
+
+		frames.append({"timestamp": minute * 60000, "participantFrames": participant_frames, "events": events})
+
+	return {"frames": frames, "frameInterval": 60000}
@@ -0,0 +1,81 @@
+"""
+Compares a new `aiohttp.ClientSession` per call against the pooled session of `AAshe.client.AAshe`.
+
+Both patterns go through `make_riot_request` against a local server, so the
+difference is the connection setup paid per call.
+
+	python -m AAshe.benchmarks.session_pool [requests] [concurrency]
+"""
+import asyncio
+import time
+import sys
+
+import aiohttp
+import aiohttp.web
+
+import AAshe.client
+import AAshe.utils.request
+import AAshe.summoner.summoners as summoners
+
+
+async def handle(request: aiohttp.web.Request)->aiohttp.web.Response:
+	return aiohttp.web.json_response({"id": 1, "name": "adde r2", "summonerLevel": 30})
+
+
+async def start_server()->(aiohttp.web.AppRunner, str):
+	app = aiohttp.web.Application()
+	app.router.add_get("/{region}/summoner", handle)
+	runner = aiohttp.web.AppRunner(app, access_log=None)
+	await runner.setup()
+	site = aiohttp.web.TCPSite(runner, "127.0.0.1", 0)
+	await site.start()
+	port = site._server.sockets[0].getsockname()[1]
+	return runner, f"http://127.0.0.1:{port}" + "/{}/summoner"
+
+
+async def per_call(url: str, requests: int, concurrency: int)->float:
+	semaphore = asyncio.Semaphore(concurrency)
+
+	async def one():
+		async with semaphore:
+			async with aiohttp.ClientSession() as aiosession:
+				await AAshe.utils.request.make_riot_request(
+					cls=summoners.Summoner, aiosession=aiosession, region="euw1", url=url, headers={})
+
+	start = time.perf_counter()
+	await asyncio.gather(*[one() for _ in range(requests)])
+	return time.perf_counter() - start
+
+
+async def pooled(url: str, requests: int, concurrency: int)->float:
+	semaphore = asyncio.Semaphore(concurrency)
+
+	async with AAshe.client.AAshe(limit_per_host=concurrency) as client:
+		async def one():
+			async with semaphore:
+				await AAshe.utils.request.make_riot_request(
+					cls=summoners.Summoner, aiosession=client.aiosession, region="euw1", url=url, headers={})
+
+		start = time.perf_counter()
+		await asyncio.gather(*[one() for _ in range(requests)])
+		return time.perf_counter() - start
+
+
+async def async_main(requests: int, concurrency: int):
+	runner, url = await start_server()
+	try:
+		for name, pattern in (("per-call session", per_call), ("pooled client", pooled)):
+			elapsed = await pattern(url, requests, concurrency)
+			print(f"{name:<18} {requests} requests in {elapsed:.3f}s ({requests / elapsed:.0f} req/s)")
+	finally:
+		await runner.cleanup()
+
+
+def main():
+	requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+	concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+	asyncio.run(async_main(requests=requests, concurrency=concurrency))
+
+
+if __name__ == "__main__":
+	main()
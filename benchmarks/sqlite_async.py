@@ -0,0 +1,136 @@
+"""
+Event loop lag and HTTP concurrency while timelines are written to the cache.
+
+A local server in another process stands in for the Riot API, `clients`
+coroutines keep requesting from it while `megabytes` of timelines are written,
+either with `write_data` on the event loop or through an `AsyncStorage`. The
+lag is how late a 10ms sleep on the loop wakes up.
+
+	python -m AAshe.benchmarks.sqlite_async [megabytes] [clients]
+"""
+import multiprocessing
+import tempfile
+import asyncio
+import time
+import sys
+import os
+
+import aiohttp
+import aiohttp.web
+
+import AAshe.sqlite
+import AAshe.match.timelines as timelines
+import AAshe.benchmarks.samples as samples
+
+PORT = 8781
+TICK = 0.01
+
+
+def serve():
+	async def handle(request):
+		await asyncio.sleep(0.005)
+		return aiohttp.web.json_response({"ok": True})
+
+	app = aiohttp.web.Application()
+	app.router.add_get("/", handle)
+	aiohttp.web.run_app(app, host="127.0.0.1", port=PORT, print=None)
+
+
+def percentile(values: list, fraction: float)->float:
+	values = sorted(values)
+	return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+async def measure(write, clients: int)->(float, list, list):
+	"""Runs `write` next to the ticker and the clients, returning its duration, the lags and the request latencies."""
+	running = True
+	lags = []
+	latencies = []
+
+	async def ticker():
+		while running:
+			start = time.perf_counter()
+			await asyncio.sleep(TICK)
+			lags.append(time.perf_counter() - start - TICK)
+
+	async def client(session: aiohttp.ClientSession):
+		while running:
+			start = time.perf_counter()
+			async with session.get(f"http://127.0.0.1:{PORT}/") as resp:
+				await resp.read()
+			latencies.append(time.perf_counter() - start)
+
+	async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=clients)) as session:
+		tasks = [asyncio.ensure_future(ticker())] + [asyncio.ensure_future(client(session)) for _ in range(clients)]
+		await asyncio.sleep(0.5)
+		del lags[:], latencies[:]
+
+		start = time.perf_counter()
+		await write()
+		duration = time.perf_counter() - start
+
+		running = False
+		await asyncio.gather(*tasks)
+	return duration, lags, latencies
+
+
+def main():
+	megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+	clients = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+	document = samples.timeline(1)
+	template = timelines.Timeline.from_response(region="euw1", match_id=1, resp_data=document)
+	size = len(template.get_values()[1][2])
+	count = megabytes * 1024 * 1024 // size
+
+	def timeline(match_id: int)->timelines.Timeline:
+		# The frames are shared, writing only reads them.
+		return timelines.Timeline(
+			matchId=match_id, region="euw1", time=time.time(),
+			frames=template.frames, frameInterval=template.frameInterval)
+
+	async def idle():
+		await asyncio.sleep(5.0)
+
+	async def on_loop():
+		for match_id in range(count):
+			timeline(match_id).write_data()
+			await asyncio.sleep(0)
+
+	async def off_loop():
+		pending = set()
+		for match_id in range(count):
+			pending.add(asyncio.ensure_future(timeline(match_id).write_data_async()))
+			if len(pending) >= 32:
+				_, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+		await asyncio.gather(*pending)
+
+	server = multiprocessing.Process(target=serve, daemon=True)
+	server.start()
+	time.sleep(1.0)
+
+	print(f"{count} timelines of {size / 1024:.0f}KB ({count * size / 1024 ** 3:.2f}GB), {clients} HTTP clients")
+	print(f"  {'mode':<18}{'took':>8}{'lag p50':>10}{'lag p99':>10}{'lag max':>10}{'req/s':>9}{'req p99':>10}")
+	with tempfile.TemporaryDirectory() as directory:
+		conn = AAshe.sqlite.sqlite3.connect(os.path.join(directory, "loop.db"))
+		storage = AAshe.sqlite.AsyncStorage(path=os.path.join(directory, "storage.db"))
+
+		for name, write, setup in (
+				("no writes", idle, lambda: None),
+				("write_data", on_loop, lambda: timelines.Timeline.init_database(conn=conn)),
+				("AsyncStorage", off_loop, lambda: storage.init_database(timelines.Timeline))):
+			timelines.Timeline.storage = None
+			setup()
+			duration, lags, latencies = asyncio.run(measure(write, clients))
+			print(
+				f"  {name:<18}{duration:>7.1f}s{percentile(lags, 0.5) * 1000:>8.1f}ms"
+				f"{percentile(lags, 0.99) * 1000:>8.1f}ms{max(lags) * 1000:>8.1f}ms"
+				f"{len(latencies) / duration:>9.0f}{percentile(latencies, 0.99) * 1000:>8.1f}ms")
+
+		storage.close()
+		conn.close()
+	server.terminate()
+
+
+if __name__ == "__main__":
+	main()
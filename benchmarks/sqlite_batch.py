@@ -0,0 +1,63 @@
+"""
+Writing fetched matches with a commit per match against batched writes.
+
+Every mode writes the same matches to a new database file with the default
+journal, so each commit is a sync to disk.
+
+	python -m AAshe.benchmarks.sqlite_batch [matches]
+"""
+import tempfile
+import sqlite3
+import time
+import sys
+import os
+
+import AAshe.match.matches as matches
+import AAshe.benchmarks.samples as samples
+
+
+def per_row(games: list):
+	for game in games:
+		game.write_data()
+
+
+def bulk_write(games: list):
+	matches.Match.bulk_write(games)
+
+
+def batch(games: list):
+	with matches.Match.batch():
+		for game in games:
+			game.write_data()
+
+
+MODES = (
+	("write_data per match", per_row),
+	("Match.batch()", batch),
+	("Match.bulk_write", bulk_write),
+)
+
+
+def main():
+	count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+	games = [
+		matches.Match.from_response(region="euw1", match_id=match_id, resp_data=samples.match(match_id))
+		for match_id in range(count)]
+
+	print(f"{count} matches")
+	with tempfile.TemporaryDirectory() as directory:
+		for i, (name, write) in enumerate(MODES):
+			conn = sqlite3.connect(os.path.join(directory, f"{i}.db"))
+			matches.Match.init_database(conn=conn)
+
+			start = time.perf_counter()
+			write(games)
+			seconds = time.perf_counter() - start
+
+			assert conn.execute(f"SELECT COUNT(*) FROM {matches.Match.table_name}").fetchone()[0] == count
+			conn.close()
+			print(f"  {name:<22}{seconds:>8.2f}s  {count / seconds:>8.0f} matches/s")
+
+
+if __name__ == "__main__":
+	main()
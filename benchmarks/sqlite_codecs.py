@@ -0,0 +1,78 @@
+"""
+Database size and throughput of the nested column codecs.
+
+Every codec writes the same matches and timelines with `bulk_write` to a new
+database file, and reads them all back with `read_cached` in chunks of
+`AAshe.utils.bulk.chunk_size`, which decodes the nested columns. Codecs whose
+module isn't installed are skipped.
+
+	python -m AAshe.benchmarks.sqlite_codecs [matches] [timelines]
+"""
+import tempfile
+import sqlite3
+import time
+import sys
+import os
+
+import AAshe.utils.serialization
+import AAshe.utils.bulk
+import AAshe.match.matches as matches
+import AAshe.match.timelines as timelines
+import AAshe.benchmarks.samples as samples
+
+
+def measure(path: str, cls, objects: list)->(float, float):
+	"""Returns the seconds writing and reading back `objects` took."""
+	conn = sqlite3.connect(path)
+	cls.init_database(conn=conn)
+
+	start = time.perf_counter()
+	cls.bulk_write(objects)
+	written = time.perf_counter() - start
+
+	start = time.perf_counter()
+	count = 0
+	for keys in AAshe.utils.bulk.chunks(range(len(objects)), AAshe.utils.bulk.chunk_size):
+		count += len(cls.read_cached(key_name="matchId", keys=keys, max_age=float("inf"), region="euw1"))
+	read = time.perf_counter() - start
+
+	assert count == len(objects)
+	conn.close()
+	return written, read
+
+
+def main():
+	# The database is measured, not the in-process tier in front of it.
+	matches.Match.memory_max_bytes = timelines.Timeline.memory_max_bytes = 0
+	match_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+	timeline_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+	corpora = (
+		("matches", matches.Match, [
+			matches.Match.from_response(region="euw1", match_id=match_id, resp_data=samples.match(match_id))
+			for match_id in range(match_count)]),
+		("timelines", timelines.Timeline, [
+			timelines.Timeline.from_response(region="euw1", match_id=match_id, resp_data=samples.timeline(match_id))
+			for match_id in range(timeline_count)]),
+	)
+
+	with tempfile.TemporaryDirectory() as directory:
+		for name, cls, objects in corpora:
+			print(f"{len(objects)} {name}, serialization backend {AAshe.utils.serialization.backend}")
+			print(f"  {'codec':<10}{'size':>10}{'write/s':>10}{'read/s':>10}")
+			for codec in AAshe.utils.serialization.codecs.values():
+				if not codec.available:
+					print(f"  {codec.name:<10}{'not installed':>30}")
+					continue
+
+				cls.codec = codec
+				path = os.path.join(directory, f"{name}_{codec.name}.db")
+				written, read = measure(path, cls, objects)
+				print(
+					f"  {codec.name:<10}{os.path.getsize(path) / 1024 ** 2:>8.1f}MB"
+					f"{len(objects) / written:>10.0f}{len(objects) / read:>10.0f}")
+			cls.codec = "json"
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,76 @@
+"""
+Deleting cached timelines by their keys against matching every column.
+
+The cache is filled with `timelines` timelines sharing the frames of one
+sample `minutes` long. "all columns" is the statement `del_data` used before,
+which encoded the frames of every timeline to compare them, "del_data" deletes
+one timeline per statement by its keys and "bulk_delete" deletes them with
+`IN (...)`.
+Every mode deletes all of them in one transaction.
+
+	python -m AAshe.benchmarks.sqlite_delete [timelines] [minutes]
+"""
+import tempfile
+import sqlite3
+import time
+import sys
+import os
+
+import AAshe.match.timelines as timelines
+import AAshe.benchmarks.samples as samples
+
+
+def all_columns(cls, objects: list):
+	queries = cls.get_queries()
+	query = "DELETE FROM {} WHERE {}".format(
+		queries.table_name, " AND ".join([name + " IS (?)" for name in queries.names]))
+	cursor = cls.cursor()
+	for _object in objects:
+		args_names, args, keys_names, keys = _object.get_values()
+		cursor.execute(query, args + keys)
+	cls.commit()
+
+
+def del_data(cls, objects: list):
+	for _object in objects:
+		_object.del_data(commit=False)
+	cls.commit()
+
+
+def bulk_delete(cls, objects: list):
+	cls.bulk_delete(objects)
+
+
+def main():
+	count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+	minutes = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+	cls = timelines.Timeline
+	cls.memory_max_bytes = 0
+
+	template = cls.from_response(region="euw1", match_id=1, resp_data=samples.timeline(1, minutes=minutes))
+	now = time.time()
+
+	print(f"{count} timelines of {minutes} minutes deleted")
+	print(f"  {'mode':<14}{'took':>8}{'per timeline':>15}")
+	with tempfile.TemporaryDirectory() as directory:
+		for name, delete in (("all columns", all_columns), ("del_data", del_data), ("bulk_delete", bulk_delete)):
+			conn = sqlite3.connect(os.path.join(directory, f"{delete.__name__}.db"))
+			cls.init_database(conn=conn)
+			objects = [
+				cls(
+					matchId=match_id, region="euw1", time=now,
+					frames=template.frames, frameInterval=template.frameInterval)
+				for match_id in range(count)]
+			cls.bulk_write(objects)
+
+			start = time.perf_counter()
+			delete(cls, objects)
+			seconds = time.perf_counter() - start
+
+			assert conn.execute(f"SELECT COUNT(*) FROM {cls.table_name}").fetchone()[0] == 0
+			print(f"  {name:<14}{seconds:>7.2f}s{seconds / count * 1e6:>13.0f}us")
+			conn.close()
+
+
+if __name__ == "__main__":
+	main()
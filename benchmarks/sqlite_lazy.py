@@ -0,0 +1,75 @@
+"""
+Reading one scalar field of cached matches, with the nested attributes built
+lazily against building all of them like every cache hit used to.
+
+The matches are read back from the cache with `read_cached` in chunks of
+`AAshe.utils.bulk.chunk_size` and kept, as a caller collecting them would.
+The time is measured on its own, the memory in a second run under tracemalloc.
+
+	python -m AAshe.benchmarks.sqlite_lazy [matches]
+"""
+import tracemalloc
+import tempfile
+import sqlite3
+import time
+import sys
+import os
+
+import AAshe.utils.bulk
+import AAshe.match.matches as matches
+import AAshe.benchmarks.samples as samples
+
+
+def lazy(game: matches.Match)->object:
+	return game.gameDuration
+
+
+def eager(game: matches.Match)->object:
+	# What the getters did on a cache hit before the attributes were lazy.
+	game.teams, game.participants, game.participantIdentities
+	return game.gameDuration
+
+
+def fetch(count: int, read)->list:
+	games = []
+	for keys in AAshe.utils.bulk.chunks(range(count), AAshe.utils.bulk.chunk_size):
+		found = matches.Match.read_cached(key_name="matchId", keys=keys, max_age=float("inf"), region="euw1")
+		for game in found.values():
+			read(game)
+			games.append(game)
+	return games
+
+
+def main():
+	# The database is measured, not the in-process tier in front of it.
+	matches.Match.memory_max_bytes = 0
+	count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+	with tempfile.TemporaryDirectory() as directory:
+		conn = sqlite3.connect(os.path.join(directory, "matches.db"))
+		matches.Match.init_database(conn=conn)
+		matches.Match.bulk_write([
+			matches.Match.from_response(region="euw1", match_id=match_id, resp_data=samples.match(match_id))
+			for match_id in range(count)])
+
+		print(f"{count} matches read from the cache, reading gameDuration")
+		print(f"  {'mode':<8}{'took':>8}{'per match':>12}{'peak memory':>14}")
+		for name, read in (("eager", eager), ("lazy", lazy)):
+			start = time.perf_counter()
+			games = fetch(count, read)
+			seconds = time.perf_counter() - start
+			assert len(games) == count
+			del games
+
+			tracemalloc.start()
+			games = fetch(count, read)
+			_, peak = tracemalloc.get_traced_memory()
+			tracemalloc.stop()
+			del games
+
+			print(f"  {name:<8}{seconds:>7.2f}s{seconds / count * 1e6:>10.0f}us{peak / 1024 ** 2:>12.1f}MB")
+		conn.close()
+
+
+if __name__ == "__main__":
+	main()
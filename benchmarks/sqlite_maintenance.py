@@ -0,0 +1,110 @@
+"""
+Purging expired timelines in the background against one DELETE and VACUUM.
+
+The cache is filled with `megabytes` of timelines, two thirds of them past the
+retention. The maintenance runs through an `AsyncStorage`, the baseline runs
+the DELETE and a VACUUM on the event loop. The lag is how late a 10ms sleep on
+the loop wakes up meanwhile.
+
+	python -m AAshe.benchmarks.sqlite_maintenance [megabytes]
+"""
+import tempfile
+import asyncio
+import time
+import sys
+import os
+
+import AAshe.sqlite
+import AAshe.match.timelines as timelines
+import AAshe.benchmarks.samples as samples
+
+TICK = 0.01
+
+
+def percentile(values: list, fraction: float)->float:
+	values = sorted(values)
+	return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+async def measure(work)->(float, list):
+	"""Runs `work` next to the ticker, returning its duration and the lags."""
+	running = True
+	lags = []
+
+	async def ticker():
+		while running:
+			start = time.perf_counter()
+			await asyncio.sleep(TICK)
+			lags.append(time.perf_counter() - start - TICK)
+
+	task = asyncio.ensure_future(ticker())
+	await asyncio.sleep(0.1)
+	del lags[:]
+
+	start = time.perf_counter()
+	await work()
+	duration = time.perf_counter() - start
+
+	running = False
+	await task
+	return duration, lags
+
+
+def size(path: str)->int:
+	return sum([os.path.getsize(path + suffix) for suffix in ("", "-wal") if os.path.exists(path + suffix)])
+
+
+def main():
+	megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+	cls = timelines.Timeline
+	cls.retention = 3600
+	cls.memory_max_bytes = 0
+
+	template = cls.from_response(region="euw1", match_id=1, resp_data=samples.timeline(1))
+	count = megabytes * 1024 * 1024 // len(template.get_values()[1][2])
+
+	def fill():
+		now = time.time()
+		for start in range(0, count, 100):
+			cls.bulk_write([
+				cls(
+					matchId=match_id, region="euw1", time=now - 7200 if match_id % 3 else now,
+					frames=template.frames, frameInterval=template.frameInterval)
+				for match_id in range(start, min(count, start + 100))])
+
+	async def maintenance():
+		await AAshe.sqlite.SQLiteMaintenance(cls=cls, interval=3600).run_once()
+
+	async def statement():
+		cls.conn.execute(f"DELETE FROM {cls.table_name} WHERE time < ?", (time.time() - cls.retention,))
+		cls.conn.commit()
+		cls.conn.execute("VACUUM")
+
+	print(f"{count} timelines ({megabytes}MB), {count - (count + 2) // 3} expired")
+	print(f"  {'mode':<22}{'took':>8}{'lag p99':>10}{'lag max':>10}{'size before':>13}{'after':>10}")
+	with tempfile.TemporaryDirectory() as directory:
+		for name, work in (("DELETE + VACUUM", statement), ("SQLiteMaintenance", maintenance)):
+			path = os.path.join(directory, f"{len(name)}.db")
+			storage = None
+			if work is maintenance:
+				storage = AAshe.sqlite.AsyncStorage(path=path)
+				storage.init_database(cls)
+			else:
+				cls.storage = None
+				cls.init_database(conn=AAshe.sqlite.connect(path=path))
+			fill()
+			cls.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+			before = size(path)
+
+			duration, lags = asyncio.run(measure(work))
+			if storage is not None:
+				storage.close()
+			cls.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+			print(
+				f"  {name:<22}{duration:>7.1f}s{percentile(lags, 0.99) * 1000:>8.1f}ms{max(lags) * 1000:>8.1f}ms"
+				f"{before / 1024 ** 2:>11.0f}MB{size(path) / 1024 ** 2:>8.0f}MB")
+			cls.conn.close()
+
+
+if __name__ == "__main__":
+	main()
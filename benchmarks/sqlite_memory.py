@@ -0,0 +1,70 @@
+"""
+Repeated `Match.get_match` cache hits with and without the in-process tier.
+
+The cache holds `matches` matches and the calls ask for them with a skewed
+distribution, a few matches being asked for most of the time, like a bot
+answering about recent games. Every call is a cache hit, so no request is made.
+
+	python -m AAshe.benchmarks.sqlite_memory [calls] [matches] [memory megabytes]
+"""
+import tempfile
+import asyncio
+import sqlite3
+import random
+import time
+import sys
+import os
+
+import AAshe.match.matches as matches
+import AAshe.benchmarks.samples as samples
+
+
+def percentile(values: list, fraction: float)->float:
+	values = sorted(values)
+	return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+async def measure(match_ids: list)->list:
+	latencies = []
+	for match_id in match_ids:
+		start = time.perf_counter()
+		game = await matches.Match.get_match(region="euw1", aiosession=None, match_id=match_id)
+		game.gameDuration
+		latencies.append(time.perf_counter() - start)
+	return latencies
+
+
+def main():
+	calls = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+	count = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+	megabytes = int(sys.argv[3]) if len(sys.argv) > 3 else 64
+
+	rng = random.Random(0)
+	match_ids = [min(count - 1, int(rng.paretovariate(1.2)) - 1) for _ in range(calls)]
+	matches.Match.request_cooldown = float("inf")
+
+	print(f"{calls} get_match cache hits over {count} matches")
+	print(f"  {'memory':<10}{'calls/s':>9}{'p50':>10}{'p99':>10}  stats")
+	with tempfile.TemporaryDirectory() as directory:
+		conn = sqlite3.connect(os.path.join(directory, "matches.db"))
+		matches.Match.init_database(conn=conn)
+		matches.Match.bulk_write([
+			matches.Match.from_response(region="euw1", match_id=match_id, resp_data=samples.match(match_id))
+			for match_id in range(count)])
+
+		for max_bytes in (0, megabytes * 1024 ** 2):
+			matches.Match.memory_max_bytes = max_bytes
+			matches.Match.init_database(conn=conn)
+
+			latencies = asyncio.run(measure(match_ids))
+			memory = matches.Match.get_memory()
+			stats = memory.stats() if memory is not None else {}
+			print(
+				f"  {max_bytes // 1024 ** 2:>6}MB  {calls / sum(latencies):>9.0f}"
+				f"{percentile(latencies, 0.5) * 1e6:>8.0f}us{percentile(latencies, 0.99) * 1e6:>8.0f}us  "
+				+ ", ".join([f"{name} {value}" for name, value in stats.items()]))
+		conn.close()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,62 @@
+"""
+Python overhead of the SQLite ORM hot paths on the `Summoner` table.
+
+Writes `calls` distinct summoners with `write_data` in one transaction, writes
+them again over the existing entries, then reads each of them back with
+`read_all_data`. The unique constraint indexes the key columns, so the time is
+spent building and running the statements rather than scanning.
+
+	python -m AAshe.benchmarks.sqlite_orm [calls]
+"""
+import tempfile
+import sqlite3
+import time
+import sys
+import os
+
+import AAshe.summoner.summoners as summoners
+
+
+def measure(conn: sqlite3.Connection, calls: int)->(float, float, float):
+	summoners.Summoner.init_database(conn=conn)
+
+	objects = [
+		summoners.Summoner(
+			id=i, accountId=i, name=f"summoner {i}", profileIconId=i % 30, summonerLevel=30,
+			revisionDate=1500000000000 + i, time=time.time(), region="euw1")
+		for i in range(calls)]
+
+	start = time.perf_counter()
+	for summoner in objects:
+		summoner.write_data(commit=False)
+	summoners.Summoner.commit()
+	write = time.perf_counter() - start
+
+	start = time.perf_counter()
+	for summoner in objects:
+		summoner.write_data(commit=False)
+	summoners.Summoner.commit()
+	overwrite = time.perf_counter() - start
+
+	start = time.perf_counter()
+	for i in range(calls):
+		summoners.Summoner.read_all_data(id=i, region="euw1")
+	read = time.perf_counter() - start
+
+	return write, overwrite, read
+
+
+def main():
+	calls = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+	with tempfile.TemporaryDirectory() as directory:
+		conn = sqlite3.connect(os.path.join(directory, "benchmark.db"))
+		write, overwrite, read = measure(conn, calls)
+		conn.close()
+
+	print(f"{calls} calls on {summoners.Summoner.table_name}")
+	for name, seconds in (("write_data", write), ("overwrite", overwrite), ("read_all_data", read)):
+		print(f"  {name:<14}{seconds:>7.2f}s  {calls / seconds:>9.0f} calls/s  {seconds / calls * 1e6:>6.1f}us/call")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,87 @@
+"""
+The connection profiles under the cache traffic of `Match.get_match`.
+
+A hit is the cache read of `get_match`, a miss is what follows the request,
+writing the match with its own commit. Only those are timed, hydrating and
+building the matches doesn't touch the database. The cache starts with
+`matches` matches and `hit_ratio` of the calls ask for one of them.
+"default" is a plain `sqlite3.connect`, with the rollback journal and
+synchronous=FULL.
+
+	python -m AAshe.benchmarks.sqlite_profiles [calls] [matches] [hit ratio]
+"""
+import tempfile
+import sqlite3
+import random
+import time
+import sys
+import os
+
+import AAshe.sqlite
+import AAshe.match.matches as matches
+import AAshe.benchmarks.samples as samples
+
+
+def percentile(values: list, fraction: float)->float:
+	values = sorted(values)
+	return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def measure(path: str, profile: str, documents: list, calls: int, hit_ratio: float)->(float, list, list):
+	if profile == "default":
+		matches.Match.init_database(conn=sqlite3.connect(path))
+	else:
+		matches.Match.init_database(path=path, profile=profile)
+	matches.Match.request_cooldown = float("inf")
+
+	count = len(documents)
+	matches.Match.bulk_write([
+		matches.Match.from_response(region="euw1", match_id=match_id, resp_data=document)
+		for match_id, document in enumerate(documents)])
+
+	rng = random.Random(0)
+	hits = []
+	misses = []
+	for call in range(calls):
+		if rng.random() < hit_ratio:
+			match_id = rng.randrange(count)
+			started = time.perf_counter()
+			matches.Match.read_cached(key_name="matchId", keys=[match_id], max_age=float("inf"), region="euw1")
+			hits.append(time.perf_counter() - started)
+		else:
+			match_id = count + call
+			game = matches.Match.from_response(
+				region="euw1", match_id=match_id, resp_data=documents[match_id % count])
+			started = time.perf_counter()
+			game.write_data()
+			misses.append(time.perf_counter() - started)
+	seconds = sum(hits) + sum(misses)
+
+	if matches.Match.connector is not None:
+		matches.Match.connector.close()
+	else:
+		matches.Match.conn.close()
+	return seconds, hits, misses
+
+
+def main():
+	# The database is measured, not the in-process tier in front of it.
+	matches.Match.memory_max_bytes = 0
+	calls = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+	count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+	hit_ratio = float(sys.argv[3]) if len(sys.argv) > 3 else 0.8
+	documents = [samples.match(match_id) for match_id in range(count)]
+
+	print(f"{calls} get_match calls, {hit_ratio:.0%} hits, {count} cached matches")
+	print(f"  {'profile':<12}{'calls/s':>9}{'hit p50':>10}{'hit p99':>10}{'miss p50':>10}{'miss p99':>10}")
+	with tempfile.TemporaryDirectory() as directory:
+		for profile in ("default", "durable", "throughput"):
+			seconds, hits, misses = measure(os.path.join(directory, f"{profile}.db"), profile, documents, calls, hit_ratio)
+			print(
+				f"  {profile:<12}{calls / seconds:>9.0f}"
+				f"{percentile(hits, 0.5) * 1000:>8.2f}ms{percentile(hits, 0.99) * 1000:>8.2f}ms"
+				f"{percentile(misses, 0.5) * 1000:>8.2f}ms{percentile(misses, 0.99) * 1000:>8.2f}ms")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,69 @@
+"""
+Gold difference curves of timelines, walking the `Frame` objects against
+`Timeline.to_arrays`.
+
+The timelines cycle through `distinct` samples, as cached ones read with the
+frames still stored and as built ones whose `Frame` objects are already there.
+Each curve is the total gold of participants 1 to 5 minus the one of 6 to 10
+per frame.
+
+	python -m AAshe.benchmarks.timeline_arrays [timelines] [distinct]
+"""
+import time
+import sys
+
+import numpy
+
+import AAshe.sqlite
+import AAshe.utils.serialization
+import AAshe.match.timelines as timelines
+import AAshe.benchmarks.samples as samples
+
+
+def walk(timeline: timelines.Timeline)->list:
+	curve = []
+	for frame in timeline.frames:
+		difference = 0
+		for participant_frame in frame.participantFrames.values():
+			if participant_frame.participantId <= 5:
+				difference += participant_frame.totalGold
+			else:
+				difference -= participant_frame.totalGold
+		curve.append(difference)
+	return curve
+
+
+def arrays(timeline: timelines.Timeline)->numpy.ndarray:
+	return timeline.to_arrays().difference("totalGold")
+
+
+def main():
+	count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+	distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+	built = [
+		timelines.Timeline.from_response(region="euw1", match_id=match_id, resp_data=samples.timeline(match_id))
+		for match_id in range(distinct)]
+	stored = [timeline.get_values()[1][2] for timeline in built]
+
+	def cached(i: int)->timelines.Timeline:
+		# A fresh entry every time, as `read_cached` returns them.
+		return timelines.Timeline(
+			matchId=i, region="euw1", frameInterval=60000, frames=AAshe.sqlite.SQLiteLazy.Raw(stored[i % distinct]))
+
+	for timeline in built[:5]:
+		assert numpy.array_equal(walk(timeline), arrays(timeline))
+
+	print(f"{count} gold difference curves over {distinct} distinct timelines")
+	print(f"  {'timelines':<11}{'mode':<12}{'took':>8}{'per timeline':>15}")
+	for source, get in (("cached", cached), ("built", lambda i: built[i % distinct])):
+		for name, curve in (("Frame walk", walk), ("to_arrays", arrays)):
+			start = time.perf_counter()
+			for i in range(count):
+				curve(get(i))
+			seconds = time.perf_counter() - start
+			print(f"  {source:<11}{name:<12}{seconds:>7.2f}s{seconds / count * 1e6:>13.0f}us")
+
+
+if __name__ == "__main__":
+	main()
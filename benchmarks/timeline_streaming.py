@@ -0,0 +1,121 @@
+"""
+Peak RSS of concurrent timeline requests, read whole against parsed as they arrive.
+
+A local server sends `requests` timelines in chunks, `concurrency` of them at a
+time, and every timeline is built and written to a cache file. "buffered" reads
+the body whole, decodes it and builds the frames, "streamed" parses it with
+`Timeline.parse_response` as it arrives. Every mode runs in a process of its
+own, the server in another one, and the peak is counted from the RSS before the
+requests.
+
+	python -m AAshe.benchmarks.timeline_streaming [concurrency] [requests] [minutes]
+"""
+import multiprocessing
+import subprocess
+import tempfile
+import resource
+import asyncio
+import sqlite3
+import socket
+import time
+import sys
+import os
+
+import aiohttp
+import aiohttp.web
+
+import AAshe.utils.serialization
+import AAshe.utils.request
+import AAshe.match.timelines as timelines
+import AAshe.benchmarks.samples as samples
+
+CHUNK = 16 * 1024
+DISTINCT = 10
+
+
+def rss()->int:
+	"""Returns the resident set size of the process in bytes."""
+	with open("/proc/self/statm") as statm:
+		return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def serve(port: int, minutes: int):
+	bodies = [AAshe.utils.serialization.dumps(samples.timeline(match_id, minutes=minutes)) for match_id in range(DISTINCT)]
+
+	async def handler(request: aiohttp.web.Request)->aiohttp.web.StreamResponse:
+		body = bodies[int(request.match_info["match_id"]) % DISTINCT]
+		response = aiohttp.web.StreamResponse(headers={"Content-Type": "application/json"})
+		response.content_length = len(body)
+		await response.prepare(request)
+		# The body arrives over a while, like it would from the other side of the world.
+		for start in range(0, len(body), CHUNK):
+			await response.write(body[start:start + CHUNK])
+			await asyncio.sleep(0.001)
+		await response.write_eof()
+		return response
+
+	app = aiohttp.web.Application()
+	app.router.add_get("/{region}/{match_id}", handler)
+	aiohttp.web.run_app(app, host="127.0.0.1", port=port, print=None)
+
+
+async def fetch_all(port: int, mode: str, concurrency: int, count: int):
+	cls = timelines.Timeline
+	parse = cls.parse_response if mode == "streamed" else None
+	semaphore = asyncio.Semaphore(concurrency)
+
+	async def fetch(session: aiohttp.ClientSession, match_id: int):
+		async with semaphore:
+			resp_data, _ = await AAshe.utils.request.make_riot_request(
+				cls=cls, aiosession=session, region="euw1", url=f"http://127.0.0.1:{port}/{{}}/{match_id}",
+				headers={}, parse=parse)
+			cls.from_response(region="euw1", match_id=match_id, resp_data=resp_data).write_data(commit=False)
+
+	async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency)) as session:
+		await asyncio.gather(*[fetch(session, match_id) for match_id in range(count)])
+	cls.commit()
+
+
+def measure(port: int, mode: str, concurrency: int, count: int):
+	with tempfile.TemporaryDirectory() as directory:
+		timelines.Timeline.memory_max_bytes = 0
+		timelines.Timeline.init_database(conn=sqlite3.connect(os.path.join(directory, "timelines.db")))
+		before = rss()
+
+		start = time.perf_counter()
+		asyncio.run(fetch_all(port=port, mode=mode, concurrency=concurrency, count=count))
+		seconds = time.perf_counter() - start
+
+		peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+		print(f"  {mode:<10}{seconds:>7.1f}s{count / seconds:>9.1f}{(peak - before) / 1024 ** 2:>10.0f}MB")
+
+
+def main():
+	concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+	count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+	minutes = int(sys.argv[3]) if len(sys.argv) > 3 else 30
+
+	with socket.socket() as sock:
+		sock.bind(("127.0.0.1", 0))
+		port = sock.getsockname()[1]
+	server = multiprocessing.Process(target=serve, args=(port, minutes), daemon=True)
+	server.start()
+	time.sleep(2)
+
+	size = len(AAshe.utils.serialization.dumps(samples.timeline(0, minutes=minutes)))
+	print(f"{count} timelines of {size / 1024:.0f}KB, {concurrency} at a time")
+	print(f"  {'mode':<10}{'took':>8}{'per s':>9}{'peak RSS':>12}")
+	try:
+		for mode in ("buffered", "streamed"):
+			subprocess.run(
+				[sys.executable, "-m", __spec__.name, "--measure", str(port), mode, str(concurrency), str(count)],
+				check=True)
+	finally:
+		server.terminate()
+
+
+if __name__ == "__main__":
+	if sys.argv[1:2] == ["--measure"]:
+		measure(port=int(sys.argv[2]), mode=sys.argv[3], concurrency=int(sys.argv[4]), count=int(sys.argv[5]))
+	else:
+		main()
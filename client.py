@@ -0,0 +1,187 @@
+import typing
+import ssl
+
+import aiohttp
+
+import AAshe.utils.config as config
+import AAshe.summoner.summoners as summoners
+import AAshe.match.matches as matches
+import AAshe.match.matchlists as matchlists
+import AAshe.match.timelines as timelines
+import AAshe.spectator.activegames as activegames
+import AAshe.lolstatus.sharddata as sharddata
+
+
+class AAshe:
+	"""
+	Long-lived client owning one pooled `aiohttp.ClientSession`.
+
+	Every region is served from its own host (`euw1.api.riotgames.com`, ...), so
+	`limit_per_host` is the keep-alive limit per region. Connections, resolved
+	addresses and the TLS context are kept between calls instead of being rebuilt
+	with a new session for every request.
+
+	Attributes:
+		limit (int): Total amount of simultaneous connections.
+		limit_per_host (int): Simultaneous connections kept per region.
+		keepalive_timeout (float): Seconds an idle connection is kept open.
+		ttl_dns_cache (int): Seconds a resolved host is cached, None caches forever.
+		default (AAshe): The client used when no aiosession is passed to a call.
+	"""
+
+	limit = 100
+	limit_per_host = 20
+	keepalive_timeout = 60.0
+	ttl_dns_cache = 300
+
+	default = None  # type: AAshe
+
+	def __init__(
+			self,
+			api_key: str=None,
+			*,
+			limit: int=None,
+			limit_per_host: int=None,
+			keepalive_timeout: float=None,
+			ttl_dns_cache: int=None,
+			ssl_context: ssl.SSLContext=None):
+		if api_key is not None:
+			config.Config.api_key = api_key
+
+		self.limit = limit if limit is not None else self.__class__.limit
+		self.limit_per_host = limit_per_host if limit_per_host is not None else self.__class__.limit_per_host
+		self.keepalive_timeout = keepalive_timeout if keepalive_timeout is not None else self.__class__.keepalive_timeout
+		self.ttl_dns_cache = ttl_dns_cache if ttl_dns_cache is not None else self.__class__.ttl_dns_cache
+
+		# One context for every connection, so certificates are only loaded once.
+		self.ssl_context = ssl_context or ssl.create_default_context()
+		self.session = None
+
+	def __repr__(self):
+		return f"<AAshe:{self.limit}:{self.limit_per_host}>"
+
+	async def __aenter__(self)->'AAshe':
+		return self
+
+	async def __aexit__(self, exc_type, exc_val, exc_tb):
+		await self.close()
+
+	@classmethod
+	def shared(cls)->'AAshe':
+		"""Returns the default client, creating it if there is none."""
+		if cls.default is None:
+			cls.default = cls()
+		return cls.default
+
+	@property
+	def aiosession(self)->aiohttp.ClientSession:
+		"""The pooled session, created on first use within the running loop."""
+		if self.session is None or self.session.closed:
+			connector = aiohttp.TCPConnector(
+				limit=self.limit,
+				limit_per_host=self.limit_per_host,
+				keepalive_timeout=self.keepalive_timeout,
+				use_dns_cache=True,
+				ttl_dns_cache=self.ttl_dns_cache,
+				ssl=self.ssl_context)
+			self.session = aiohttp.ClientSession(connector=connector)
+		return self.session
+
+	async def close(self)->None:
+		"""Closes the session and every pooled connection."""
+		if self.session is not None and not self.session.closed:
+			await self.session.close()
+		self.session = None
+
+	async def get_summoner(
+			self,
+			region: str,
+			*,
+			summoner_name: str=None,
+			summoner_id: int=None,
+			account_id: int=None)->typing.Union['summoners.Summoner', None]:
+		"""See `Summoner.get_summoner`."""
+		return await summoners.Summoner.get_summoner(
+			region=region,
+			aiosession=self.aiosession,
+			summoner_name=summoner_name,
+			summoner_id=summoner_id,
+			account_id=account_id)
+
+	def get_summoners(
+			self,
+			region: str,
+			summoner_ids: typing.Iterable[int],
+			**kwargs)->typing.AsyncIterator['summoners.Summoner']:
+		"""See `Summoner.get_summoners`."""
+		return summoners.Summoner.get_summoners(
+			region=region,
+			aiosession=self.aiosession,
+			summoner_ids=summoner_ids,
+			**kwargs)
+
+	async def get_match(self, region: str, match_id: int)->typing.Union['matches.Match', None]:
+		"""See `Match.get_match`."""
+		return await matches.Match.get_match(
+			region=region,
+			aiosession=self.aiosession,
+			match_id=match_id)
+
+	def get_matches(
+			self,
+			region: str,
+			match_ids: typing.Iterable[int],
+			**kwargs)->typing.AsyncIterator['matches.Match']:
+		"""See `Match.get_matches`."""
+		return matches.Match.get_matches(
+			region=region,
+			aiosession=self.aiosession,
+			match_ids=match_ids,
+			**kwargs)
+
+	async def get_matchlist(
+			self,
+			region: str,
+			account_id: int,
+			**kwargs)->typing.Union['matchlists.MatchList', None]:
+		"""See `MatchList.get_matchlist`."""
+		return await matchlists.MatchList.get_matchlist(
+			region=region,
+			aiosession=self.aiosession,
+			account_id=account_id,
+			**kwargs)
+
+	async def get_timeline(self, region: str, match_id: int)->typing.Union['timelines.Timeline', None]:
+		"""See `Timeline.get_timeline`."""
+		return await timelines.Timeline.get_timeline(
+			region=region,
+			aiosession=self.aiosession,
+			match_id=match_id)
+
+	def get_timelines(
+			self,
+			region: str,
+			match_ids: typing.Iterable[int],
+			**kwargs)->typing.AsyncIterator['timelines.Timeline']:
+		"""See `Timeline.get_timelines`."""
+		return timelines.Timeline.get_timelines(
+			region=region,
+			aiosession=self.aiosession,
+			match_ids=match_ids,
+			**kwargs)
+
+	async def get_game(
+			self,
+			region: str,
+			summoner_id: int)->typing.Union['activegames.LiveMatch', None]:
+		"""See `LiveMatch.get_game`."""
+		return await activegames.LiveMatch.get_game(
+			region=region,
+			aiosession=self.aiosession,
+			summoner_id=summoner_id)
+
+	async def get_shardstatus(self, region: str)->typing.Union['sharddata.ShardStatus', None]:
+		"""See `ShardStatus.get_shardstatus`."""
+		return await sharddata.ShardStatus.get_shardstatus(
+			region=region,
+			aiosession=self.aiosession)
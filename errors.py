@@ -1,6 +1,8 @@
 class AAsheException(Exception):
     """Generic exception for the AAshe library."""
-    pass
+
+    key = None
+    # The key a bulk call failed for, see `AAshe.utils.bulk.stream`.
 
 # 400	Bad request
 # 401	Unauthorized
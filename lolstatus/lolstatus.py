@@ -2,6 +2,7 @@
 
 import AAshe.utils.request
 import AAshe.utils.ratelimit
+import AAshe.utils.singleflight
 import AAshe.sqlite
 
 import aiohttp
@@ -9,11 +10,12 @@ import aiohttp
 # This file is just to keep the methods counting on the same endpoint.
 
 
-class LolStatusEndpoint(AAshe.sqlite.MessagePrint):
-	__method_limit__ = None
+class LolStatusEndpoint:
+	method_limit = None
 
 	@classmethod
-	@AAshe.utils.ratelimit.method_limited(refresh_cooldown=3600, name="Summoner-V3", use_lock=True)
+	@AAshe.utils.singleflight.coalesced(name="LolStatus-V3")
+	@AAshe.utils.ratelimit.method_limited(refresh_cooldown=3600, name="LolStatus-V3", use_lock=True)
 	async def request_lolstatus(
 			cls,
 			region: str,
@@ -22,8 +24,21 @@ class LolStatusEndpoint(AAshe.sqlite.MessagePrint):
 			headers: dict,
 			timeout: int=10,
 			count: bool=True,
-			_cls=None):
+			_cls: AAshe.sqlite.SQLite=None)->dict:
+		"""To keep track of the calls being made.
 
+		Args:
+			region(str): Region targeted.
+			aiosession(aiohttp.ClientSession):
+			url(str): Region-less URL for the call
+			headers(dict): Headers for the call, usually an empty dictionary.
+			timeout(int): Seconds until Timeout exception is raised.
+			count(bool): If it should count on the limit.
+			_cls(AAshe.sqlite.SQLite): Logger to use.
+
+		Returns:
+			dict: Decoded response from the call.
+		"""
 		return await AAshe.utils.request.make_riot_request(
 			aiosession=aiosession,
 			url=url,
@@ -70,9 +70,14 @@ class ShardStatus(AAshe.sqlite.SQLite):
 	Represent a Shard retrieved from the Riot API.
 	"""
 
-	__table_name__ = "aashe_shard"
-	__request_cooldown__ = 0
-	__loudness__ = 4
+	table_name = "aashe_shard"
+	request_cooldown = 0
+	endpoint = AAshe.lolstatus.lolstatus.LolStatusEndpoint
+	variable_names = AAshe.sqlite.SQLiteVariableNames(
+		real=["time"],
+		text=["name", "region_tag", "hostname", "slug"],
+		text_key=["region"],
+		nested=["services", "locales"])
 
 	__slots__ = (
 		"name",  # type: str
@@ -86,27 +91,6 @@ class ShardStatus(AAshe.sqlite.SQLite):
 		"time",  # type: float
 	)
 	
-	__null__ = []
-	__null_key__ = []
-	__integer__ = []
-	__integer_key__ = []
-	__real__ = ["time"]
-	__real_key__ = []
-	__text__ = [
-		"name",
-		"region_tag",
-		"hostname",
-		"slug",
-		
-		"services",
-		"locales"
-	]
-	__text_key__ = [
-		"region"
-	]
-	__blob__ = []
-	__blob_key__ = []
-
 	def __init__(self, **kwargs):
 		for k in self.__class__.__slots__:
 			setattr(self, k, kwargs.get(k, None))
@@ -120,13 +104,17 @@ class ShardStatus(AAshe.sqlite.SQLite):
 			region: str,
 			aiosession: aiohttp.ClientSession) -> typing.Union['ShardStatus', None]:
 		"""
-			Gets a match by it's id.
+			Gets the status of the shard of a region.
+
+			With `stale_while_revalidate` set, a cached status older than
+			`request_cooldown` is still returned, and requested again in the background.
 
 			Args:
 				region: str
 					The region searched on.
 				aiosession: :class: `aiohttp.ClientSession`
 					The aiosession used for the async search.
+					None uses the pooled session of the shared `AAshe.client.AAshe`.
 
 			Returns:
 				ShardStatus:
@@ -170,45 +158,49 @@ class ShardStatus(AAshe.sqlite.SQLite):
 					not receive a timely response from the upstream server.
 
 
-			>>> AAshe.utils.ratelimit.RateLimit.__loudness__ = 0
-			>>> ShardStatus.__loudness__ = 0
 			>>> conn = sqlite3.connect("database.db")
-			>>> ShardStatus.init_database(c=conn.cursor(), conn=conn)
+			>>> ShardStatus.init_database(conn=conn)
 			>>> AAshe.utils.config.Config.initiate(api_key="RGAPI-498880b9-d3e9-4f45-98e6-b5f66721e28b", conn=conn)
 
 			>>> AAshe.utils.config.run_async(ShardStatus.get_shardstatus, region="euw1")
 			<euw1:eu:prod.euw1.lol.riotgames.com>
 		"""
-		shard = None
-		data = cls.read_all_data(region_tag=region, order_by=[cls.desc("time")])
-
-		if data:
-			if time.time() - data[0].time < cls.__request_cooldown__:
-				shard = data[0]
-				shard.services = [Service(**kwargs) for kwargs in json.loads(shard.services)]
-
-				cls.safe_print(
-					"Found shard still active in cache.",
-					title=cls.__name__,
-					colour=AAshe.sqlite.BColors.OKGREEN,
-					level=4)
-			else:
-				for d in data:
-					d.del_data(commit=False)
-				cls.commit()
+		lookup = dict(region=region.lower())
+		shard = cls.recall(max_age=cls.stale_max_age(), **lookup)
+		if shard is not None:
+			cls.debug(msg=f"Found ShardStatus({region}) in memory.")
+		else:
+			data = await cls.read_all_data_async(order_by=[cls.desc("time")], **lookup)
+
+			if data:
+				if time.time() - data[0].time < cls.stale_max_age():
+					shard = data[0]
+					shard.services = [Service(**kwargs) for kwargs in shard.services]
+					cls.remember(shard, **lookup)
+
+					cls.debug(msg=f"Found ShardStatus({region}) in cache.")
+				else:
+					await cls.bulk_delete_async(data)
 
 		if shard:
+			if cls.is_stale(shard):
+				cls.revalidate(lookup, cls.fetch_shardstatus, region=region, aiosession=aiosession)
 			return shard
 
+		return await cls.fetch_shardstatus(region=region, aiosession=aiosession)
+
+	@classmethod
+	async def fetch_shardstatus(
+			cls,
+			region: str,
+			aiosession: aiohttp.ClientSession)->typing.Union['ShardStatus', None]:
+		"""Requests the shard status from the Riot API and writes it to the cache, see `get_shardstatus`."""
+		shard = None
 		url = "https://{}.api.riotgames.com" + \
 			f"/lol/status/v3/shard-data?api_key={AAshe.utils.config.Config.get_api_key()}"
 
 		if url:
-			cls.safe_print(
-				f"Making a webrequest({url}) to shard-data",
-				title=cls.__name__,
-				colour=AAshe.sqlite.BColors.OKGREEN,
-				level=4)
+			cls.debug(msg=f"Making a webrequest to shard-data for {region}")
 
 			resp_data = await AAshe.lolstatus.lolstatus.LolStatusEndpoint.request_lolstatus(
 				aiosession=aiosession,
@@ -217,13 +209,15 @@ class ShardStatus(AAshe.sqlite.SQLite):
 				headers={},
 				_cls=cls)
 
-			kwargs = json.loads(resp_data.decode())
-			kwargs["region"] = region
+			# The response can be shared with other callers, so it's only copied from.
+			kwargs = dict(resp_data)
+			kwargs["region"] = region.lower()
 			kwargs["time"] = time.time()
 			kwargs["services"] = [Service(**kwargs) for kwargs in kwargs["services"]]
 
 			shard = cls(**kwargs)
-			shard.write_data()
+			await shard.write_data_async()
+			cls.remember(shard, region=shard.region)
 
 		return shard
 
@@ -232,11 +226,8 @@ if __name__ == "__main__":
 	#import doctest
 
 	#doctest.testmod()
-	AAshe.utils.ratelimit.RateLimit.__loudness__ = 4
-	ShardStatus.__loudness__ = 4
-
 	conn = sqlite3.connect("database.db")
-	ShardStatus.init_database(c=conn.cursor(), conn=conn)
+	ShardStatus.init_database(conn=conn)
 	AAshe.utils.config.Config.initiate(api_key="RGAPI-498880b9-d3e9-4f45-98e6-b5f66721e28b", conn=conn)
 
 	print(AAshe.utils.config.run_async(ShardStatus.get_shardstatus, region="euw1"))
@@ -0,0 +1,220 @@
+import AAshe.match.timelines
+import AAshe.match.matches
+
+import typing
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+
+class Heatmap:
+	"""
+	Positions of timelines binned into grids with `numpy.histogram2d`, a grid per group.
+
+	The positions are those of the events, or of the participants in every frame,
+	grouped by event type, team, participant or champion. They are buffered and
+	binned `flush_size` at a time, so only the grids and one buffer are held on
+	to however many timelines are added.
+
+	Example:
+		>>> heatmap = Heatmap(source="events", group_by="champion", types=("CHAMPION_KILL",), bins=128)
+		>>> heatmap.add_cache(region="euw1")
+		>>> heatmap.get_grids()[157]  # Where Yasuo got kills, x along the first axis.
+	"""
+
+	map_range = ((0, 14870), (0, 14980))
+	# The bounds of Summoner's Rift, positions out of it aren't counted.
+
+	sources = ("events", "frames")
+	groups = ("type", "team", "participant", "champion", None)
+
+	flush_size = 1 << 20
+	# Positions buffered before they are binned.
+
+	__slots__ = (
+		"source",  # type: str
+		"group_by",  # type: typing.Optional[str]
+		"types",  # type: typing.Optional[typing.Tuple[str]]
+		"edges",  # type: typing.Tuple[numpy.ndarray, numpy.ndarray]
+		"grids",  # type: typing.Dict[object, numpy.ndarray]
+		"buffer",  # type: typing.List[typing.Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]]
+		"buffered",  # type: int
+		"timelines",  # type: int
+		"skipped",  # type: int
+	)
+
+	def __init__(
+			self,
+			source: str="events",
+			group_by: typing.Optional[str]="type",
+			types: typing.Iterable[str]=None,
+			bins: typing.Union[int, typing.Tuple[int, int]]=64):
+		"""
+		Args:
+			source(str): "events" for the positions of the events, "frames" for
+				the ones of the participants in every frame.
+			group_by(str): "type" of the event, "team" (100 or 200), "participant"
+				(1 to 10), "champion" (its id) or None for a single grid. The event
+				counts for the participant that did it, the killer of a kill or
+				the creator of a ward.
+			types(typing.Iterable): Event types counted, like "CHAMPION_KILL", None counts all of them.
+			bins(int, tuple): Bins along x and y, or along both.
+
+		Raises:
+			ValueError: If the source or group isn't known, or the frames are grouped by type.
+			ImportError: If numpy isn't installed.
+		"""
+		if numpy is None:
+			raise ImportError("Heatmap needs numpy, which isn't installed.")
+		if source not in self.sources:
+			raise ValueError(f"Unknown source {source}, expected one of {self.sources}.")
+		if group_by not in self.groups:
+			raise ValueError(f"Unknown group {group_by}, expected one of {self.groups}.")
+		if source == "frames" and group_by == "type":
+			raise ValueError("The positions of the frames have no event type to be grouped by.")
+
+		x_bins, y_bins = (bins, bins) if isinstance(bins, int) else bins
+		self.source = source
+		self.group_by = group_by
+		self.types = tuple(types) if types is not None else None
+		self.edges = (
+			numpy.linspace(self.map_range[0][0], self.map_range[0][1], x_bins + 1),
+			numpy.linspace(self.map_range[1][0], self.map_range[1][1], y_bins + 1))
+		self.grids = {}
+		self.buffer = []
+		self.buffered = 0
+		self.timelines = 0
+		self.skipped = 0
+
+	def __repr__(self):
+		return "<{}:{}:{}:{}>".format(self.__class__.__name__, self.source, self.group_by, self.timelines)
+
+	def add(self, timeline: AAshe.match.timelines.Timeline, champions: typing.Dict[int, int]=None)->None:
+		"""Adds the positions of a timeline.
+
+		Args:
+			timeline(Timeline): A timeline, cached ones are read without building their frames.
+			champions(dict): The champion id of every participant id, needed to
+				group by champion, see `read_champions`. Without them the timeline
+				is skipped.
+		"""
+		if self.group_by == "champion" and not champions:
+			self.skipped += 1
+			return
+
+		if self.source == "events":
+			events = timeline.to_events()
+			records = events.records
+			mask = records["x"] >= 0
+			if self.types is not None:
+				codes = [code for code, name in enumerate(events.types) if name in self.types]
+				mask &= numpy.isin(records["type"], codes)
+			records = records[mask]
+
+			x, y = records["x"], records["y"]
+			participant_ids = numpy.where(
+				records["participantId"] > 0, records["participantId"],
+				numpy.where(records["killerId"] > 0, records["killerId"], records["creatorId"]))
+			if self.group_by == "type":
+				keys = numpy.array(events.types, dtype=object)[records["type"]]
+			else:
+				keys = participant_ids
+		else:
+			arrays = timeline.to_arrays()
+			mask = ~(numpy.isnan(arrays.x) | numpy.isnan(arrays.y))
+			x, y = arrays.x[mask], arrays.y[mask]
+			participant_ids = keys = numpy.broadcast_to(arrays.participantIds, mask.shape)[mask]
+
+		if self.group_by == "team":
+			keys = numpy.where(participant_ids <= 5, 100, 200)
+		elif self.group_by == "champion":
+			table = numpy.full(max(max(champions), int(participant_ids.max(initial=0))) + 1, -1)
+			for participant_id, champion_id in champions.items():
+				table[participant_id] = champion_id
+			keys = table[numpy.maximum(participant_ids, 0)]
+		elif self.group_by is None:
+			keys = numpy.zeros(len(x), dtype=numpy.int64)
+
+		if self.group_by in ("team", "participant", "champion"):
+			# Events of no participant, like a tower killing a champion, count for none of them.
+			counted = participant_ids > 0
+			if self.group_by == "champion":
+				counted &= keys >= 0
+			x, y, keys = x[counted], y[counted], keys[counted]
+
+		self.timelines += 1
+		self.buffer.append((x, y, keys))
+		self.buffered += len(x)
+		if self.buffered >= self.flush_size:
+			self.flush()
+
+	def add_cache(self, chunk_size: int=50, **kwargs)->int:
+		"""Adds every cached timeline matching `kwargs`, reading `chunk_size` of them at a time.
+
+		To group by champion, the champions are read from the cached matches.
+
+		Args:
+			chunk_size(int): Timelines read at once, each can be several MB.
+			**kwargs: Specifies certain values the timelines must have, like region="euw1".
+
+		Returns:
+			int: The amount of timelines added.
+		"""
+		added = self.timelines
+		for timelines in AAshe.match.timelines.Timeline.iter_data(chunk_size=chunk_size, **kwargs):
+			champions = self.read_champions(timelines) if self.group_by == "champion" else {}
+			for timeline in timelines:
+				self.add(timeline, champions=champions.get((timeline.matchId, timeline.region)))
+		self.flush()
+		return self.timelines - added
+
+	@staticmethod
+	def read_champions(
+			timelines: typing.List[AAshe.match.timelines.Timeline])->typing.Dict[tuple, typing.Dict[int, int]]:
+		"""Returns the champion id of every participant id by `(matchId, region)`, for the cached matches.
+
+		The matches are read with a query per region, only the ones of the timelines.
+		"""
+		match_ids = {}
+		for timeline in timelines:
+			match_ids.setdefault(timeline.region, set()).add(timeline.matchId)
+
+		champions = {}
+		for region, ids in match_ids.items():
+			for match in AAshe.match.matches.Match.read_all_data(matchId=sorted(ids), region=region):
+				champions[(match.matchId, match.region)] = {
+					participant.participantId: participant.championId for participant in match.participants or []}
+		return champions
+
+	def flush(self)->None:
+		"""Bins the buffered positions into the grids."""
+		if not self.buffer:
+			return
+		x = numpy.concatenate([x for x, _, _ in self.buffer])
+		y = numpy.concatenate([y for _, y, _ in self.buffer])
+		keys = numpy.concatenate([keys for _, _, keys in self.buffer])
+		self.buffer = []
+		self.buffered = 0
+
+		order = numpy.argsort(keys, kind="stable")
+		values, starts = numpy.unique(keys[order], return_index=True)
+		for value, rows in zip(values, numpy.split(order, starts[1:])):
+			grid, _, _ = numpy.histogram2d(x[rows], y[rows], bins=self.edges)
+			key = value.item() if isinstance(value, numpy.generic) else value
+			if key in self.grids:
+				self.grids[key] += grid
+			else:
+				self.grids[key] = grid
+
+	def get_grids(self)->typing.Dict[object, 'numpy.ndarray']:
+		"""Returns the grids by group, the counts of `(x bins, y bins)` arrays, a single one is under None.
+
+		Returns:
+			dict: The grids, the buffered positions binned first.
+		"""
+		self.flush()
+		if self.group_by is None:
+			return {None: self.grids.get(0, numpy.zeros((len(self.edges[0]) - 1, len(self.edges[1]) - 1)))}
+		return dict(self.grids)
@@ -2,18 +2,20 @@
 
 import AAshe.utils.request
 import AAshe.utils.ratelimit
+import AAshe.utils.singleflight
 import AAshe.sqlite
 
 import aiohttp
+import typing
 
 # This file is just to keep the methods counting on the same endpoint.
 
 
-class MatchEndpoint(AAshe.sqlite.MessagePrint):
-	__loudness__ = 4
-	__method_limit__ = None
+class MatchEndpoint:
+	method_limit = None
 
 	@classmethod
+	@AAshe.utils.singleflight.coalesced(name="Match-V3")
 	@AAshe.utils.ratelimit.method_limited(refresh_cooldown=3600, name="Match-V3", use_lock=True)
 	async def request_match(
 			cls,
@@ -21,14 +23,109 @@ class MatchEndpoint(AAshe.sqlite.MessagePrint):
 			aiosession: aiohttp.ClientSession,
 			url: str,
 			headers: dict,
-			timeout: int = 10,
-			count=True,
-			_cls=None)->bytes:
+			timeout: int=10,
+			count: bool=True,
+			_cls: AAshe.sqlite.SQLite=None)->dict:
+		"""To keep track of the calls being made.
+
+		Args:
+			region(str): Region targeted.
+			aiosession(aiohttp.ClientSession):
+			url(str): Region-less URL for the call
+			headers(dict): Headers for the call, usually an empty dictionary.
+			timeout(int): Seconds until Timeout exception is raised.
+			count(bool): If it should count on the limit.
+			_cls(AAshe.sqlite.SQLite): Logger to use.
+
+		Returns:
+			dict: Decoded response from the call.
+		"""
+		return await AAshe.utils.request.make_riot_request(
+			aiosession=aiosession,
+			url=url,
+			region=region,
+			headers=headers,
+			timeout=timeout,
+			count=count,
+			cls=_cls or cls)
+
+
+class TimelineEndpoint:
+	method_limit = None
+
+	@classmethod
+	@AAshe.utils.singleflight.coalesced(name="Timeline-V3")
+	@AAshe.utils.ratelimit.method_limited(refresh_cooldown=3600, name="Timeline-V3", use_lock=True)
+	async def request_timeline(
+			cls,
+			region: str,
+			aiosession: aiohttp.ClientSession,
+			url: str,
+			headers: dict,
+			timeout: int=10,
+			count: bool=True,
+			_cls: AAshe.sqlite.SQLite=None,
+			parse: typing.Callable[[aiohttp.StreamReader], typing.Awaitable[dict]]=None)->dict:
+		"""To keep track of the calls being made.
+
+		Args:
+			region(str): Region targeted.
+			aiosession(aiohttp.ClientSession):
+			url(str): Region-less URL for the call
+			headers(dict): Headers for the call, usually an empty dictionary.
+			timeout(int): Seconds until Timeout exception is raised.
+			count(bool): If it should count on the limit.
+			_cls(AAshe.sqlite.SQLite): Logger to use.
+			parse(typing.Callable): Parses the body from its stream, see `AAshe.utils.request.make_riot_request`.
+
+		Returns:
+			dict: Decoded response from the call.
+		"""
 		return await AAshe.utils.request.make_riot_request(
+			aiosession=aiosession,
+			url=url,
+			region=region,
+			headers=headers,
+			timeout=timeout,
+			count=count,
 			cls=_cls or cls,
+			parse=parse)
+
+
+class MatchListEndpoint:
+	method_limit = None
+
+	@classmethod
+	@AAshe.utils.singleflight.coalesced(name="MatchList-V3")
+	@AAshe.utils.ratelimit.method_limited(refresh_cooldown=3600, name="MatchList-V3", use_lock=True)
+	async def request_matchlist(
+			cls,
+			region: str,
+			aiosession: aiohttp.ClientSession,
+			url: str,
+			headers: dict,
+			timeout: int=10,
+			count: bool=True,
+			_cls: AAshe.sqlite.SQLite=None)->dict:
+		"""To keep track of the calls being made.
+
+		Args:
+			region(str): Region targeted.
+			aiosession(aiohttp.ClientSession):
+			url(str): Region-less URL for the call
+			headers(dict): Headers for the call, usually an empty dictionary.
+			timeout(int): Seconds until Timeout exception is raised.
+			count(bool): If it should count on the limit.
+			_cls(AAshe.sqlite.SQLite): Logger to use.
+
+		Returns:
+			dict: Decoded response from the call.
+		"""
+		return await AAshe.utils.request.make_riot_request(
 			aiosession=aiosession,
 			url=url,
 			region=region,
 			headers=headers,
 			timeout=timeout,
-			count=count)
\ No newline at end of file
+			count=count,
+			cls=_cls or cls)
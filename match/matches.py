@@ -1,4 +1,5 @@
 import AAshe.utils.config
+import AAshe.utils.bulk
 import AAshe.utils.request
 import AAshe.utils.ratelimit
 import AAshe.sqlite
@@ -7,10 +8,10 @@ import AAshe.match.match
 
 import asyncio
 import aiohttp
+import typing
 import sqlite3
 import time
 import json
-import copy
 import AAshe.summoner.summoners
 
 
@@ -245,9 +246,16 @@ class Match(AAshe.sqlite.SQLite):
 	Represent an finished match retrieved from the Riot API.
 	"""
 
-	__table_name__ = "aashe_matches"
-	__request_cooldown__ = 0
-	__loudness__ = 4
+	table_name = "aashe_matches"
+	request_cooldown = float("inf")
+	# A finished game never changes, so a cached match is never requested again, see `retention`.
+	variable_names = AAshe.sqlite.SQLiteVariableNames(
+		integer=["seasonId", "queueId", "mapId", "gameDuration", "gameCreation"],
+		integer_key=["matchId"],
+		real=["time"],
+		text=["gameVersion", "gameMode", "gameType", "platformId"],
+		text_key=["region"],
+		nested=["teams", "participants", "participantIdentities"])
 
 	__slots__ = (
 		"seasonId",  # type: int
@@ -261,41 +269,19 @@ class Match(AAshe.sqlite.SQLite):
 		"gameDuration",  # type: int
 		"gameCreation",  # type: int
 		
-		"participantIdentities",  # type: [ParticipantIdentity]
-		"participants",  # type: [Participant]
-		"teams",  # type: [TeamStats]
+		"_participantIdentities",  # type: [ParticipantIdentity]
+		"_participants",  # type: [Participant]
+		"_teams",  # type: [TeamStats]
 		
 		# "matchId",  # type: int
 		"time",  # type: float
 		"region"  # type: str
 	)
 
-	__null__ = []
-	__null_key__ = []
-	__integer__ = [
-		"seasonId",
-		"queueId",
-		"mapId",
-		"gameDuration",
-		"gameCreation",
-	]
-	__integer_key__ = ["matchId"]
-	__real__ = ["time"]
-	__real_key__ = []
-	__text__ = [
-		"gameVersion",
-		"gameMode",
-		"gameType",
-		"platformId",
-		"region",
-		
-		"teams",  # type: [TeamStats]
-		"participants",  # type: [Participant]
-		"participantIdentities",  # type: [ParticipantIdentity]
-	]
-	__text_key__ = []
-	__blob__ = []
-	__blob_key__ = []
+	# Built on first access, a cache hit only decodes the columns that are used.
+	participantIdentities = AAshe.sqlite.SQLiteLazy(lambda data: [ParticipantIdentity(**kw) for kw in data])
+	participants = AAshe.sqlite.SQLiteLazy(lambda data: [Participant(**kw) for kw in data])
+	teams = AAshe.sqlite.SQLiteLazy(lambda data: [TeamStats(**kw) for kw in data])
 
 	@property
 	def matchId(self) -> int:
@@ -309,6 +295,7 @@ class Match(AAshe.sqlite.SQLite):
 
 	def __init__(self, **kwargs):
 		for k in self.__class__.__slots__:
+			k = k[1:] if k.startswith("_") else k
 			setattr(self, k, kwargs.get(k, None))
 	
 	def __repr__(self):
@@ -328,6 +315,7 @@ class Match(AAshe.sqlite.SQLite):
 					The region searched on.
 				aiosession: :class: `aiohttp.ClientSession`
 					The aiosession used for the async search.
+					None uses the pooled session of the shared `AAshe.client.AAshe`.
 				summonerId: str or int
 					summoner ID to spectate.
 
@@ -373,52 +361,127 @@ class Match(AAshe.sqlite.SQLite):
 					not receive a timely response from the upstream server.
 
 
-			>>> AAshe.utils.ratelimit.RateLimit.__loudness__ = 0
-			>>> Match.__loudness__ = 0
-
 			>>> conn = sqlite3.connect("database.db")
 			>>> AAshe.utils.config.Config.initiate(api_key="RGAPI-498880b9-d3e9-4f45-98e6-b5f66721e28b", conn=conn)
-			>>> Match.init_database(c=conn.cursor(), conn=conn)
+			>>> Match.init_database(conn=conn)
 
 			>>> type(AAshe.utils.config.run_async(Match.get_match, region="euw1", match_id=3482810381)) is Match
 			True
 			>>> AAshe.utils.config.run_async(Match.get_match, region="euw1", match_id=3482810381)
 			<euw1:3482810381:CLASSIC>
 		"""
-		game = None
-		data = cls.read_all_data(matchId=int(match_id), order_by=[cls.desc("time")])
+		lookup = dict(matchId=int(match_id), region=region.lower())
+		game = cls.recall(**lookup)
+		if game is not None:
+			cls.debug(msg=f"Found Match({match_id}) in memory.")
+			return game
+
+		data = await cls.read_all_data_async(order_by=[cls.desc("time")], **lookup)
 
 		if data:
-			if time.time() - data[0].time < cls.__request_cooldown__:
+			if time.time() - data[0].time < cls.request_cooldown:
 				game = data[0]
-				
-				game.teams = [TeamStats(**kw) for kw in json.loads(game.teams)]
-				game.participants = [Participant(**kw) for kw in json.loads(game.participants)]
-				game.participantIdentities = [ParticipantIdentity(**kw) for kw in json.loads(game.participantIdentities)]
-
-				cls.safe_print(
-					"Found matchId {} in database".format(match_id),
-					title=cls.__name__,
-					colour=AAshe.sqlite.BColors.OKGREEN,
-					level=4)
+				cls.remember(game, **lookup)
+
+				cls.debug(msg=f"Found Match({match_id}) in cache.")
 			else:
-				for d in data:
-					d.del_data(commit=False)
-				cls.commit()
+				await cls.bulk_delete_async(data)
 		
 		if game:
 			return game
 		
+		return await cls.fetch_match(region=region, aiosession=aiosession, match_id=match_id)
+
+	@classmethod
+	async def get_matches(
+			cls,
+			region: str,
+			aiosession: aiohttp.ClientSession,
+			match_ids: typing.Iterable[typing.Union[str, int]],
+			*,
+			concurrency: int=None,
+			return_exceptions: bool=False)->typing.AsyncIterator['Match']:
+		"""
+		Gets several matches by their ids, yielding them as they become available.
+
+		The cache is read in batches of `AAshe.utils.bulk.chunk_size` ids, the
+		matches that are missing are then requested with at most `concurrency`
+		requests in flight.
+
+		Args:
+			region (str): The region searched on.
+			aiosession (aiohttp.ClientSession): The aiosession used for the async search,
+				None uses the pooled session of the shared `AAshe.client.AAshe`.
+			match_ids (typing.Iterable): The ids of the matches.
+			concurrency (int): Most requests in flight, None uses
+				`AAshe.utils.bulk.concurrency_for` the region.
+			return_exceptions (bool): Yield the exception of a failed request instead
+				of raising it and stopping the rest, its `key` is the match id it failed for.
+
+		Returns:
+			typing.AsyncIterator: The matches, cached ones first and otherwise in no particular order.
+
+		Raises:
+			AAsheException: The same as `get_match`, unless `return_exceptions` is set.
+		"""
+		misses = []
+		for chunk in AAshe.utils.bulk.chunks([int(match_id) for match_id in match_ids]):
+			found = await cls.read_cached_async(
+				key_name="matchId", keys=chunk, max_age=cls.request_cooldown, region=region.lower())
+			cls.debug(msg=f"Found {len(found)} of {len(chunk)} Matches in cache.")
+
+			for game in found.values():
+				yield game
+			misses.extend([match_id for match_id in chunk if match_id not in found])
+
+		# Fetched entries are committed in batches, by the writer thread with a storage, not one by one.
+		# Only the requests write to the batch, and it's flushed before an entry is yielded, so
+		# nothing is left buffered while the caller holds on to the generator.
+		batch = cls.new_batch()
+
+		async def fetch(match_id: int)->'Match':
+			with batch.use():
+				return await cls.fetch_match(region=region, aiosession=aiosession, match_id=match_id)
+
+		try:
+			async for game in AAshe.utils.bulk.stream(
+					keys=misses,
+					func=fetch,
+					concurrency=concurrency or AAshe.utils.bulk.concurrency_for(region),
+					return_exceptions=return_exceptions):
+				batch.flush()
+				yield game
+		finally:
+			batch.close()
+
+	@classmethod
+	async def fetch_match(
+			cls,
+			region: str,
+			aiosession: aiohttp.ClientSession,
+			match_id: typing.Union[str, int])->'Match':
+		"""Requests a match from the Riot API and writes it to the cache, see `get_match`.
+		
+		Concurrent fetches of a match share one, see `SQLite.fetch_once`.
+		"""
+		return await cls.fetch_once(
+			dict(matchId=int(match_id), region=region.lower()),
+			cls.load_match, region=region, aiosession=aiosession, match_id=match_id)
+
+	@classmethod
+	async def load_match(
+			cls,
+			region: str,
+			aiosession: aiohttp.ClientSession,
+			match_id: typing.Union[str, int])->'Match':
+		"""`fetch_match`, without sharing it with the concurrent fetches of the match."""
 		# Makes a web request
 		url = "https://{}.api.riotgames.com" + "/lol/match/v3/matches/{}?api_key={}".format(
 			match_id, AAshe.utils.config.Config.get_api_key())
 		
+		game = None
 		if url:
-			cls.safe_print(
-				"Making a webrequest with matchId {}".format(match_id),
-				title=cls.__name__,
-				colour=AAshe.sqlite.BColors.OKGREEN,
-				level=4)
+			cls.debug(msg=f"Making a webrequest with Match ID {match_id}")
 
 			resp_data = await AAshe.match.match.MatchEndpoint.request_match(
 				aiosession=aiosession,
@@ -427,29 +490,92 @@ class Match(AAshe.sqlite.SQLite):
 				headers={},
 				_cls=cls)
 			
-			kwargs = json.loads(resp_data.decode())
-			kwargs["matchId"] = int(match_id)
-			kwargs["region"] = region
-			kwargs["time"] = time.time()
-			kwargs["teams"] = [TeamStats(**kw) for kw in kwargs["teams"]]
-			
-			game_participants = copy.copy(kwargs["participants"])
-			kwargs["participants"] = list()
-			for kw in game_participants:
-				kw["region"] = region
-				kwargs["participants"].append(Participant(**kw))
-			
-			game_participant_identities = copy.copy(kwargs["participantIdentities"])
-			kwargs["participantIdentities"] = list()
-			for kw in game_participant_identities:
-				kw["region"] = region
-				kwargs["participantIdentities"].append(ParticipantIdentity(**kw))
-			
-			game = cls(**kwargs)
-			game.write_data()
+			game = cls.from_response(region=region, match_id=match_id, resp_data=resp_data)
+			await game.write_data_async()
+			cls.remember(game, matchId=game.matchId, region=game.region)
 		
 		return game
 
+	@classmethod
+	def from_response(cls, region: str, match_id: typing.Union[str, int], resp_data: dict)->'Match':
+		"""Builds a match from the decoded response of the Riot API."""
+		# The response can be shared with other callers, so it's only copied from.
+		kwargs = dict(resp_data)
+		kwargs["matchId"] = int(match_id)
+		kwargs["region"] = region.lower()
+		kwargs["time"] = time.time()
+		kwargs["teams"] = [TeamStats(**kw) for kw in kwargs["teams"]]
+		kwargs["participants"] = [
+			Participant(**dict(kw, region=region)) for kw in kwargs["participants"]]
+		kwargs["participantIdentities"] = [
+			ParticipantIdentity(**dict(kw, region=region)) for kw in kwargs["participantIdentities"]]
+		
+		return cls(**kwargs)
+
+
+# The normalized layout of matches, a row per participant, team and ban in tables
+# of their own, to filter on them in SQL. Enabled before `init_database` with
+# `Match.relations = normalized`, see `AAshe.sqlite.SQLiteRelation`.
+
+participant_stats = tuple([name for name in ParticipantStats.__slots__ if name != "participantId"])
+team_stats = tuple([name for name in TeamStats.__slots__ if name != "bans"])
+
+
+def participant_rows(match: Match)->typing.Iterator[tuple]:
+	"""Yields a row of `match_participants` per participant, with the identity and flattened stats."""
+	players = {identity.participantId: identity.player for identity in match.participantIdentities or []}
+	for participant in match.participants or []:
+		player = players.get(participant.participantId)
+		timeline = participant.timeline
+		stats = participant.stats
+		yield (
+			participant.participantId, participant.teamId, participant.championId,
+			participant.spell1Id, participant.spell2Id, participant.highestAchievedSeasonTier,
+			timeline.lane if timeline else None, timeline.role if timeline else None,
+			player.summonerId if player else None, player.accountId if player else None,
+			player.summonerName if player else None) + tuple([
+				getattr(stats, name) if stats else None for name in participant_stats])
+
+
+def team_rows(match: Match)->typing.Iterator[tuple]:
+	"""Yields a row of `match_teams` per team, with `win` as a bool."""
+	for team in match.teams or []:
+		yield tuple([
+			(team.win == "Win" if team.win is not None else None) if name == "win" else getattr(team, name)
+			for name in team_stats])
+
+
+def ban_rows(match: Match)->typing.Iterator[tuple]:
+	"""Yields a row of `match_bans` per ban."""
+	for team in match.teams or []:
+		for ban in team.bans or []:
+			yield team.teamId, ban.pickTurn, ban.championId
+
+
+match_participants = AAshe.sqlite.SQLiteRelation(
+	table_name="match_participants",
+	columns=[
+		("participantId", "INTEGER"), ("teamId", "INTEGER"), ("championId", "INTEGER"),
+		("spell1Id", "INTEGER"), ("spell2Id", "INTEGER"), ("highestAchievedSeasonTier", "TEXT"),
+		("lane", "TEXT"), ("role", "TEXT"),
+		("summonerId", "INTEGER"), ("accountId", "INTEGER"), ("summonerName", "TEXT")] + [
+		(name, "INTEGER") for name in participant_stats],
+	rows=participant_rows,
+	indexes=[("championId", "win"), ("summonerId",), ("accountId",)])
+
+match_teams = AAshe.sqlite.SQLiteRelation(
+	table_name="match_teams",
+	columns=[(name, "INTEGER") for name in team_stats],
+	rows=team_rows)
+
+match_bans = AAshe.sqlite.SQLiteRelation(
+	table_name="match_bans",
+	columns=[("teamId", "INTEGER"), ("pickTurn", "INTEGER"), ("championId", "INTEGER")],
+	rows=ban_rows,
+	indexes=[("championId",)])
+
+normalized = [match_participants, match_teams, match_bans]
+
 
 if __name__ == "__main__":
 	import doctest
@@ -33,12 +33,10 @@ class MatchList(AAshe.sqlite.SQLite):
 
 	Public Attributes:
 	------------
-	__table_name_: str
+	table_name: str
 		SQLite table name used inside the cache.
-	__request_cooldown__: int
+	request_cooldown: int
 		Time until a cache entry is deemed to be too old and require a refresh.
-	__loudness__:str
-		Prints various things of interest depending on current value.
 
 	Attributes:
 		matches: [MatchReference]
@@ -60,9 +58,14 @@ class MatchList(AAshe.sqlite.SQLite):
 
 	"""
 
-	__table_name__ = "aashe_history_match"
-	__request_cooldown__ = 0
-	__loudness__ = 4
+	table_name = "aashe_history_match"
+	request_cooldown = 0
+	variable_names = AAshe.sqlite.SQLiteVariableNames(
+		integer=["totalGames", "startIndex", "endIndex"],
+		integer_key=["accountId"],
+		real=["time"],
+		text_key=["region"],
+		nested=["matches"])
 
 	__slots__ = (
 		"matches",  # type: [MatchReference]
@@ -75,24 +78,6 @@ class MatchList(AAshe.sqlite.SQLite):
 		"region"  # type: str
 	)
 	
-	__null__ = []
-	__null_key__ = []
-	__integer__ = [
-		"totalGames",
-		"startIndex",
-		"endIndex",
-		"gameCreation"
-	]
-	__integer_key__ = ["accountId"]
-	__real__ = ["time"]
-	__real_key__ = []
-	__text__ = [
-		"matches"  # type: [MatchReference]
-	]
-	__text_key__ = ["region"]
-	__blob__ = []
-	__blob_key__ = []
-	
 	def __init__(self, **kwargs):
 		for k in self.__class__.__slots__:
 			setattr(self, k, kwargs.get(k, None))
@@ -182,12 +167,9 @@ class MatchList(AAshe.sqlite.SQLite):
 				The server was acting as a gateway or proxy and did
 				not receive a timely response from the upstream server.
 
-			>>> AAshe.utils.ratelimit.RateLimit.__loudness__ = 0
-			>>> MatchList.__loudness__ = 0
-
 			>>> conn = sqlite3.connect("database.db")
 			>>> AAshe.utils.config.Config.initiate(api_key="RGAPI-498880b9-d3e9-4f45-98e6-b5f66721e28b", conn=conn)
-			>>> MatchList.init_database(c=conn.cursor(), conn=conn)
+			>>> MatchList.init_database(conn=conn)
 
 			>>> type(AAshe.utils.config.run_async(MatchList.get_matchlist, region="euw1", account_id=38334548, recent=True)) is MatchList
 			True
@@ -196,33 +178,30 @@ class MatchList(AAshe.sqlite.SQLite):
 		"""
 
 		game = None
+		lookup = dict(accountId=account_id, region=region.lower())
+		# Only the match list without filters is kept in memory.
+		whole = not recent and all([value is None for value in (
+			begin_time, end_time, begin_index, end_index, champion, queue, season)])
+		
+		if whole:
+			game = cls.recall(**lookup)
+			if game is not None:
+				cls.debug(msg=f"Found MatchList({account_id}) in memory.")
+				return game
 		
 		# Searches the database (Cache)
-		data = cls.read_all_data(accountId=account_id, region=region, order_by=[cls.desc("time")])
-		if data and \
-			begin_time is None and \
-			end_time is None and \
-			begin_index is None and \
-			end_index is None and \
-			champion is None and \
-			queue is None and \
-			season is None:
+		data = await cls.read_all_data_async(order_by=[cls.desc("time")], **lookup)
+		if data and whole:
 
-			if time.time() - data[0].time < cls.__request_cooldown__:
+			if time.time() - data[0].time < cls.request_cooldown:
 				game = data[0]
 				
-				game.matches = [MatchReference(**kw) for kw in json.loads(game.matches)]
+				game.matches = [MatchReference(**kw) for kw in game.matches]
+				cls.remember(game, **lookup)
 
-				cls.safe_print(
-					"Found accountId {} in database".format(account_id),
-					title=cls.__name__,
-					subtitle=None,
-					colour=AAshe.sqlite.BColors.OKGREEN,
-					level=3)
+				cls.debug(msg=f"Found MatchList({account_id}) in cache.")
 			else:
-				for d in data:
-					d.del_data(commit=False)
-				cls.commit()
+				await cls.bulk_delete_async(data)
 		
 		if game:
 			return game
@@ -262,28 +241,26 @@ class MatchList(AAshe.sqlite.SQLite):
 		
 		url += "?" + "&".join(contents)
 
-		cls.safe_print(
-			"Making a webrequest with accountId {}".format(account_id),
-			title=cls.__name__,
-			subtitle=None,
-			colour=AAshe.sqlite.BColors.OKGREEN,
-			level=3)
+		cls.debug(msg=f"Making a webrequest with Account ID {account_id}")
 
-		resp_data = await AAshe.match.match.MatchEndpoint.request_matchlists(
+		resp_data = await AAshe.match.match.MatchListEndpoint.request_matchlist(
 			aiosession=aiosession,
 			url=url,
 			region=region,
 			headers={},
 			_cls=cls)
 
-		kwargs = json.loads(resp_data.decode())
+		# The response can be shared with other callers, so it's only copied from.
+		kwargs = dict(resp_data)
 		kwargs["accountId"] = account_id
-		kwargs["region"] = region
+		kwargs["region"] = region.lower()
 		kwargs["time"] = time.time()
 		kwargs["matches"] = [MatchReference(**kw) for kw in kwargs["matches"]]
 		
 		game = cls(**kwargs)
-		game.write_data()
+		await game.write_data_async()
+		if whole:
+			cls.remember(game, **lookup)
 		
 		return game
 
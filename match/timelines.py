@@ -1,16 +1,26 @@
+import AAshe.utils.serialization
 import AAshe.utils.config
+import AAshe.utils.bulk
 import AAshe.utils.request
 import AAshe.utils.ratelimit
 import AAshe.sqlite
 
 import AAshe.match.match
+import AAshe.client
 
 import asyncio
 import aiohttp
+import operator
+import typing
 import sqlite3
 import time
 import json
 
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
 
 class Frame(AAshe.sqlite.SQLiteSubClass):
 	__slots__ = (
@@ -25,9 +35,7 @@ class Frame(AAshe.sqlite.SQLiteSubClass):
 	def __init__(self, **kwargs):
 		super().__init__(**kwargs)
 
-		# self.participantFrames = []
-		for k in list(kwargs["participantFrames"].keys()):
-			self.participantFrames[k] = ParticipantFrame(**kwargs["participantFrames"][k])
+		self.participantFrames = {k: ParticipantFrame(**v) for k, v in kwargs["participantFrames"].items()}
 		self.events = [Event(**kw) for kw in kwargs["events"]]
 
 
@@ -104,16 +112,316 @@ class Event(AAshe.sqlite.SQLiteSubClass):
 		return "<{}:{}>".format(self.participantId, self.eventType)
 
 
+class TimelineArrays:
+	"""
+	The participant frames of a Timeline as dense `(frames, participants)` NumPy arrays.
+	
+	Participants are ordered by their id, column `i` is `participantIds[i]`. A
+	value missing from a frame, like the position of a participant that is dead,
+	is NaN, which is why every array is of floats.
+	
+	Example:
+		>>> arrays = timeline.to_arrays()
+		>>> arrays.totalGold[-1]  # The total gold of every participant in the last frame.
+		>>> arrays.difference("xp")  # Per frame, the xp of participants 1 to 5 minus 6 to 10.
+	"""
+	
+	names = ("totalGold", "currentGold", "xp", "level", "minionsKilled", "jungleMinionsKilled")
+	# The values of a participant frame with an array each, `x` and `y` come from its position.
+	
+	__slots__ = (
+		"timestamps",  # type: numpy.ndarray
+		"participantIds",  # type: numpy.ndarray
+		
+		"totalGold",  # type: numpy.ndarray
+		"currentGold",  # type: numpy.ndarray
+		"xp",  # type: numpy.ndarray
+		"level",  # type: numpy.ndarray
+		"minionsKilled",  # type: numpy.ndarray
+		"jungleMinionsKilled",  # type: numpy.ndarray
+		"x",  # type: numpy.ndarray
+		"y",  # type: numpy.ndarray
+	)
+	
+	def __init__(self, timestamps: 'numpy.ndarray', participantIds: 'numpy.ndarray', values: 'numpy.ndarray'):
+		"""
+		Args:
+			timestamps(numpy.ndarray): The timestamp of every frame.
+			participantIds(numpy.ndarray): The id of every participant.
+			values(numpy.ndarray): A `(frames, participants, len(names) + 2)` array, the
+				columns of `names` followed by x and y.
+		"""
+		self.timestamps = timestamps
+		self.participantIds = participantIds
+		for i, name in enumerate(self.names + ("x", "y")):
+			setattr(self, name, values[:, :, i])
+	
+	def __repr__(self):
+		return "<{}:{}x{}>".format(self.__class__.__name__, len(self.timestamps), len(self.participantIds))
+	
+	@classmethod
+	def from_frames(cls, frames: typing.List[typing.Union[dict, Frame]])->'TimelineArrays':
+		"""Builds the arrays in one pass over the frames, as the Riot API returns them or as `Frame` objects.
+		
+		Raises:
+			ImportError: If numpy isn't installed.
+		"""
+		if numpy is None:
+			raise ImportError("TimelineArrays needs numpy, which isn't installed.")
+		
+		empty = {}
+		if frames and not isinstance(frames[0], dict):
+			keys = sorted({key for frame in frames for key in frame.participantFrames or empty}, key=int)
+			getter = operator.attrgetter(*cls.names)
+			rows = []
+			for frame in frames:
+				participant_frames = frame.participantFrames or empty
+				for key in keys:
+					participant_frame = participant_frames.get(key)
+					if participant_frame is None:
+						rows.append((None,) * (len(cls.names) + 2))
+						continue
+					position = participant_frame.position
+					rows.append(getter(participant_frame) + ((position.x, position.y) if position else (None, None)))
+			timestamps = [frame.timestamp for frame in frames]
+		else:
+			keys = sorted({key for frame in frames for key in frame.get("participantFrames") or empty}, key=int)
+			rows = []
+			for frame in frames:
+				participant_frames = frame.get("participantFrames") or empty
+				for key in keys:
+					participant_frame = participant_frames.get(key) or empty
+					position = participant_frame.get("position") or empty
+					rows.append(
+						[participant_frame.get(name) for name in cls.names] + [position.get("x"), position.get("y")])
+			timestamps = [frame.get("timestamp") for frame in frames]
+		
+		# None becomes NaN in an array of floats.
+		values = numpy.array(rows, dtype=numpy.float64).reshape((len(frames), len(keys), len(cls.names) + 2))
+		return cls(
+			timestamps=numpy.array(timestamps, dtype=numpy.float64),
+			participantIds=numpy.array([int(key) for key in keys], dtype=numpy.int64),
+			values=values)
+	
+	def difference(self, name: str="totalGold")->'numpy.ndarray':
+		"""Returns, per frame, the sum of `name` of participants 1 to 5 minus the one of 6 to 10.
+		
+		Positive values are a lead of the blue side, team 100. Missing values count as 0.
+		"""
+		values = getattr(self, name)
+		blue = self.participantIds <= 5
+		return numpy.nansum(values[:, blue], axis=1) - numpy.nansum(values[:, ~blue], axis=1)
+
+
+class TimelineEvents:
+	"""
+	The events of a Timeline in one NumPy structured array, indexed by type, participant and time.
+	
+	The records are ordered by type, then timestamp, so the events of a type are
+	a slice and a time range within it is found by bisection. The events of a
+	participant are found through `indexes`, without reading the others.
+	
+	A record holds the `type` as a code into `types`, the index of its `frame`,
+	the `timestamp`, the ids of `id_names`, the position as `x` and `y`, the
+	`assistingParticipantIds` as a bitmask (bit `i` is participant `i`) and the
+	values of `string_names` as codes into `strings`. Ids, positions and strings
+	missing from an event are -1.
+	
+	Example:
+		>>> events = timeline.to_events()
+		>>> kills = events.query(type="CHAMPION_KILL")
+		>>> kills["x"], kills["y"]
+		>>> events.query(type="ITEM_PURCHASED", participantId=3, end=10 * 60000)["itemId"]
+	"""
+	
+	id_names = (
+		"participantId", "killerId", "victimId", "creatorId", "teamId", "itemId", "skillSlot", "beforeId", "afterId")
+	string_names = (
+		"wardType", "buildingType", "laneType", "towerType", "monsterType", "monsterSubType", "levelUpType",
+		"ascendedType", "pointCaptured")
+	indexed_names = ("participantId", "killerId", "victimId", "creatorId")
+	# The ids `query` can filter on, every event type sets one of them at least.
+	
+	__slots__ = (
+		"records",  # type: numpy.ndarray
+		"types",  # type: typing.Tuple[str]
+		"strings",  # type: typing.Tuple[str]
+		"slices",  # type: typing.Dict[str, typing.Tuple[int, int]]
+		"indexes",  # type: typing.Dict[str, typing.Dict[int, numpy.ndarray]]
+		"by_time",  # type: numpy.ndarray
+	)
+	
+	def __init__(self, records: 'numpy.ndarray', types: typing.Tuple[str], strings: typing.Tuple[str]):
+		"""
+		Args:
+			records(numpy.ndarray): The records of `dtype`, ordered by type then timestamp.
+			types(tuple): The type names the `type` codes point at.
+			strings(tuple): The values the codes of `string_names` point at.
+		"""
+		self.records = records
+		self.types = types
+		self.strings = strings
+		
+		codes = records["type"]
+		bounds = numpy.searchsorted(codes, numpy.arange(len(types) + 1))
+		self.slices = {name: (int(bounds[code]), int(bounds[code + 1])) for code, name in enumerate(types)}
+		
+		self.indexes = {}
+		for name in self.indexed_names:
+			# A stable sort keeps the rows of an id ascending, so ranges of `slices` are found by bisection.
+			ids = records[name]
+			order = numpy.argsort(ids, kind="stable")
+			values, starts = numpy.unique(ids[order], return_index=True)
+			self.indexes[name] = {
+				int(value): rows for value, rows in zip(values, numpy.split(order, starts[1:])) if value >= 0}
+		self.by_time = numpy.argsort(records["timestamp"], kind="stable")
+	
+	def __repr__(self):
+		return "<{}:{}>".format(self.__class__.__name__, len(self.records))
+	
+	def __len__(self):
+		return len(self.records)
+	
+	@classmethod
+	def dtype(cls)->'numpy.dtype':
+		"""Returns the dtype of the records."""
+		return numpy.dtype(
+			[("type", numpy.int16), ("frame", numpy.int16), ("timestamp", numpy.int64)]
+			+ [(name, numpy.int32) for name in cls.id_names]
+			+ [("x", numpy.int32), ("y", numpy.int32), ("assistingParticipantIds", numpy.int32)]
+			+ [(name, numpy.int16) for name in cls.string_names])
+	
+	@classmethod
+	def from_frames(cls, frames: typing.List[typing.Union[dict, Frame]])->'TimelineEvents':
+		"""Builds the records in one pass over the events of the frames, as documents or as `Frame` objects.
+		
+		Raises:
+			ImportError: If numpy isn't installed.
+		"""
+		if numpy is None:
+			raise ImportError("TimelineEvents needs numpy, which isn't installed.")
+		
+		dtype = cls.dtype()
+		columns = {name: i for i, name in enumerate(dtype.names)}
+		frame_column, x_column, y_column = columns.pop("frame"), columns.pop("x"), columns.pop("y")
+		columns["position"] = None
+		string_names = frozenset(cls.string_names)
+		template = [-1] * len(dtype.names)
+		template[columns["timestamp"]] = template[columns["assistingParticipantIds"]] = 0
+		
+		built = bool(frames) and not isinstance(frames[0], dict)
+		names = tuple(columns)
+		getter = operator.attrgetter(*names) if built else None
+		types = {}
+		strings = {}
+		rows = []
+		for i, frame in enumerate(frames):
+			for event in (frame.events if built else frame.get("events")) or ():
+				row = template.copy()
+				row[frame_column] = i
+				# Only the values a document has are read, most events have a few of them.
+				for name, value in zip(names, getter(event)) if built else event.items():
+					column = columns.get(name, -1)
+					if value is None or column == -1:
+						continue
+					if name in string_names:
+						value = strings.setdefault(value, len(strings))
+					elif name == "type":
+						value = types.setdefault(value, len(types))
+					elif name == "position":
+						# `Event` keeps the position as it was in the document.
+						if isinstance(value, dict):
+							row[x_column], row[y_column] = value.get("x", -1), value.get("y", -1)
+						else:
+							row[x_column], row[y_column] = value.x, value.y
+						continue
+					elif name == "assistingParticipantIds":
+						mask = 0
+						for participant_id in value:
+							mask |= 1 << participant_id
+						value = mask
+					row[column] = value
+				rows.append(tuple(row))
+		
+		records = numpy.array(rows, dtype=dtype)
+		
+		# The codes are renumbered in the order of the values, the records sorted by type.
+		ordered_types, ordered_strings = sorted(types, key=str), sorted(strings, key=str)
+		if len(records):
+			codes = numpy.zeros(len(types), dtype=numpy.int16)
+			codes[[types[kind] for kind in ordered_types]] = numpy.arange(len(types))
+			records["type"] = codes[records["type"]]
+			
+			# The last code stays -1 for values missing.
+			codes = numpy.full(len(strings) + 1, -1, dtype=numpy.int16)
+			codes[[strings[value] for value in ordered_strings]] = numpy.arange(len(strings))
+			for name in cls.string_names:
+				records[name] = codes[records[name]]
+		records = records[numpy.lexsort((records["timestamp"], records["type"]))]
+		
+		return cls(records=records, types=tuple(ordered_types), strings=tuple(ordered_strings))
+	
+	def query(self, type: str=None, start: int=None, end: int=None, **ids)->'numpy.ndarray':
+		"""Returns the records of the events matching every filter, ordered by type then timestamp.
+		
+		Args:
+			type(str): Event type, like "CHAMPION_KILL", None matches every type.
+			start(int): Timestamp in milliseconds the events are at or after.
+			end(int): Timestamp in milliseconds the events are before.
+			**ids: Ids of `indexed_names` the events have, like participantId=3.
+		
+		Returns:
+			numpy.ndarray: The records, a copy.
+		
+		Raises:
+			KeyError: If an id isn't one of `indexed_names`.
+		"""
+		lo, hi = 0, len(self.records)
+		if type is not None:
+			lo, hi = self.slices.get(type, (0, 0))
+			timestamps = self.records["timestamp"][lo:hi]
+			if start is not None or end is not None:
+				lo, hi = (
+					lo + (int(numpy.searchsorted(timestamps, start)) if start is not None else 0),
+					lo + (int(numpy.searchsorted(timestamps, end)) if end is not None else len(timestamps)))
+		
+		rows = None
+		for name, value in ids.items():
+			found = self.indexes[name].get(value)
+			if found is None:
+				return self.records[:0]
+			found = found[numpy.searchsorted(found, lo):numpy.searchsorted(found, hi)]
+			rows = found if rows is None else numpy.intersect1d(rows, found, assume_unique=True)
+		
+		if rows is None:
+			if type is not None or (start is None and end is None):
+				return self.records[lo:hi].copy()
+			# Without a type the records aren't in time order, `by_time` is.
+			timestamps = self.records["timestamp"][self.by_time]
+			rows = numpy.sort(self.by_time[
+				(numpy.searchsorted(timestamps, start) if start is not None else 0):
+				(numpy.searchsorted(timestamps, end) if end is not None else len(timestamps))])
+		elif type is None and (start is not None or end is not None):
+			timestamps = self.records["timestamp"][rows]
+			if start is not None:
+				rows, timestamps = rows[timestamps >= start], timestamps[timestamps >= start]
+			if end is not None:
+				rows = rows[timestamps < end]
+		
+		return self.records[rows]
+
+
 class Timeline(AAshe.sqlite.SQLite):
 	"""
 	Timeline with frames of a played game.
 	"""
 
 	table_name = "aashe_timelines"
-	request_cooldown__ = 0
+	request_cooldown = float("inf")
+	# A finished game never changes, so a cached timeline is never requested again, see `retention`.
 	
 	__slots__ = (
-		"frames",  # type: [Frame]
+		"_frames",  # type: [Frame]
 		"frameInterval",  # type: int
 		
 		"matchId",  # type: int
@@ -125,16 +433,49 @@ class Timeline(AAshe.sqlite.SQLite):
 		integer=["frameInterval"],
 		integer_key=["matchId"],
 		real=["time"],
-		text=["frames"],
-		text_key=["region"])
+		text_key=["region"],
+		nested=["frames"])
+	
+	# Built on first access, a cache hit only decodes the frames if they are used.
+	frames = AAshe.sqlite.SQLiteLazy(lambda data: [Frame(**kw) for kw in data])
+	
+	stream_responses = False
+	# Parse the responses as they arrive with ijson, see `parse_response`, which needs it installed.
 	
 	def __init__(self, **kwargs):
 		for k in self.__class__.__slots__:
+			k = k[1:] if k.startswith("_") else k
 			setattr(self, k, kwargs.get(k, None))
 	
 	def __repr__(self):
 		return "<{}:{}:{}>".format(self.region, self.matchId, self.frameInterval)
 	
+	def to_arrays(self)->TimelineArrays:
+		"""Returns the participant frames as NumPy arrays, see `TimelineArrays`.
+		
+		Frames read from the cache that weren't accessed yet are decoded to build
+		the arrays, without building the `Frame` objects.
+		
+		Raises:
+			ImportError: If numpy isn't installed.
+		"""
+		return TimelineArrays.from_frames(self.read_frames())
+	
+	def to_events(self)->TimelineEvents:
+		"""Returns the events of all frames as a `TimelineEvents`, like `to_arrays` builds its arrays.
+		
+		Raises:
+			ImportError: If numpy isn't installed.
+		"""
+		return TimelineEvents.from_frames(self.read_frames())
+	
+	def read_frames(self)->typing.List[typing.Union[dict, Frame]]:
+		"""Returns the frames, decoded without building the `Frame` objects if they weren't accessed yet."""
+		lazy = self.__class__.__dict__["frames"]
+		if lazy.is_raw(self):
+			return AAshe.utils.serialization.decode(getattr(self, lazy.slot).data) or []
+		return self.frames or []
+	
 	@classmethod
 	async def get_timeline(cls, region, aiosession, match_id: int or str):
 		"""
@@ -142,7 +483,8 @@ class Timeline(AAshe.sqlite.SQLite):
 
 		Args:
 			region (str): The region searched on.
-			aiosession (aiohttp.ClientSession): The aiosession used for the async search.
+			aiosession (aiohttp.ClientSession): The aiosession used for the async search,
+				None uses the pooled session of the shared `AAshe.client.AAshe`.
 			match_id (int): Match ID to get Timeline for.
 
 		Returns:
@@ -251,76 +593,187 @@ class Timeline(AAshe.sqlite.SQLite):
 			<euw1:38334548:0>
 		"""
 
-		game = None
-		
-		data = cls.read_all_data(matchId=int(match_id), region=region, order_by=[cls.desc("time")])
+		lookup = dict(matchId=int(match_id), region=region.lower())
+		game = cls.recall(**lookup)
+		if game is not None:
+			cls.debug(msg=f"Found Timeline({match_id}) in memory.")
+			return game
+
+		data = await cls.read_all_data_async(order_by=[cls.desc("time")], **lookup)
 		if data:
-			if time.time() - data[0].time < cls.__request_cooldown__:
+			if time.time() - data[0].time < cls.request_cooldown:
 				game = data[0]
+				cls.remember(game, **lookup)
 
-				game.frames = [Frame(**kw) for kw in json.loads(game.frames)]
-
-				cls.safe_print(
-					"Found matchId {} in database".format(match_id),
-					title=cls.__name__,
-					subtitle=None,
-					colour=AAshe.sqlite.BColors.OKGREEN,
-					level=3)
+				cls.debug(msg=f"Found Timeline({match_id}) in cache.")
 			else:
-				for d in data:
-					d.del_data(commit=False)
-				cls.commit()
+				await cls.bulk_delete_async(data)
 		
 		if game:
 			return game
 		
+		return await cls.fetch_timeline(region=region, aiosession=aiosession, match_id=match_id)
+
+	@classmethod
+	async def get_timelines(
+			cls,
+			region: str,
+			aiosession: aiohttp.ClientSession,
+			match_ids: typing.Iterable[typing.Union[str, int]],
+			*,
+			concurrency: int=None,
+			return_exceptions: bool=False)->typing.AsyncIterator['Timeline']:
+		"""
+		Gets the Timelines of several matches, yielding them as they become available.
+
+		Args:
+			region (str): The region searched on.
+			aiosession (aiohttp.ClientSession): The aiosession used for the async search,
+				None uses the pooled session of the shared `AAshe.client.AAshe`.
+			match_ids (typing.Iterable): Match IDs to get Timelines for.
+			concurrency (int): Most requests in flight, None uses
+				`AAshe.utils.bulk.concurrency_for` the region.
+			return_exceptions (bool): Yield the exception of a failed request instead
+				of raising it and stopping the rest, its `key` is the match id it failed for.
+
+		Returns:
+			typing.AsyncIterator: The Timelines, cached ones first and otherwise in no particular order.
+
+		Raises:
+			AAsheException: The same as `get_timeline`, unless `return_exceptions` is set.
+		"""
+		misses = []
+		for chunk in AAshe.utils.bulk.chunks([int(match_id) for match_id in match_ids]):
+			found = await cls.read_cached_async(
+				key_name="matchId", keys=chunk, max_age=cls.request_cooldown, region=region.lower())
+			cls.debug(msg=f"Found {len(found)} of {len(chunk)} Timelines in cache.")
+
+			for game in found.values():
+				yield game
+			misses.extend([match_id for match_id in chunk if match_id not in found])
+
+		# Fetched entries are committed in batches, by the writer thread with a storage, not one by one.
+		# Only the requests write to the batch, and it's flushed before an entry is yielded, so
+		# nothing is left buffered while the caller holds on to the generator.
+		batch = cls.new_batch()
+
+		async def fetch(match_id: int)->'Timeline':
+			with batch.use():
+				return await cls.fetch_timeline(region=region, aiosession=aiosession, match_id=match_id)
+
+		try:
+			async for game in AAshe.utils.bulk.stream(
+					keys=misses,
+					func=fetch,
+					concurrency=concurrency or AAshe.utils.bulk.concurrency_for(region),
+					return_exceptions=return_exceptions):
+				batch.flush()
+				yield game
+		finally:
+			batch.close()
+
+	@classmethod
+	async def fetch_timeline(
+			cls,
+			region: str,
+			aiosession: aiohttp.ClientSession,
+			match_id: typing.Union[str, int])->'Timeline':
+		"""Requests a Timeline from the Riot API and writes it to the cache, see `get_timeline`.
+		
+		Concurrent fetches of a Timeline share one, see `SQLite.fetch_once`.
+		"""
+		return await cls.fetch_once(
+			dict(matchId=int(match_id), region=region.lower()),
+			cls.load_timeline, region=region, aiosession=aiosession, match_id=match_id)
+
+	@classmethod
+	async def load_timeline(
+			cls,
+			region: str,
+			aiosession: aiohttp.ClientSession,
+			match_id: typing.Union[str, int])->'Timeline':
+		"""`fetch_timeline`, without sharing it with the concurrent fetches of the Timeline."""
 		# Makes a web request
 		url = "https://{}.api.riotgames.com" + "/lol/match/v3/timelines/by-match/{}?api_key={}".format(
 			match_id,
 			AAshe.utils.config.Config.get_api_key())
 		
+		game = None
 		if url:
-			cls.safe_print(
-				"Making a webrequest with matchId {}".format(match_id),
-				title=cls.__name__,
-				subtitle=None,
-				colour=AAshe.sqlite.BColors.OKGREEN,
-				level=3)
-
-			resp_data = await AAshe.match.match.MatchEndpoint.request_timeline(
+			cls.debug(msg=f"Making a webrequest with Match ID {match_id}")
+
+			resp_data = await AAshe.match.match.TimelineEndpoint.request_timeline(
 				aiosession=aiosession,
 				url=url,
 				region=region,
-				headers={})
+				headers={},
+				_cls=cls,
+				parse=cls.parse_response if cls.stream_responses else None)
 			
-			kwargs = json.loads(resp_data.decode())
-			kwargs["matchId"] = int(match_id)
-			kwargs["region"] = region
-			kwargs["time"] = time.time()
-			kwargs["frames"] = [Frame(**kw) for kw in kwargs["frames"]]
-			
-			game = cls(**kwargs)
-			game.write_data()
+			game = cls.from_response(region=region, match_id=match_id, resp_data=resp_data)
+			await game.write_data_async()
+			cls.remember(game, matchId=game.matchId, region=game.region)
 		
 		return game
 
+	@classmethod
+	async def parse_response(cls, stream: aiohttp.StreamReader)->dict:
+		"""Parses a response of the Riot API from its stream as it arrives.
+		
+		The response is parsed once, and every frame is encoded for the cache as
+		soon as it's parsed, to the `list_writer` of the codec, which keeps them
+		in a temporary file past its `spill_bytes`. The body, the decoded
+		document and the built frames are never held at once, the frames are
+		built on first access, like the ones of a cache hit.
+		
+		Returns:
+			dict: The document, the frames as they are written to the cache.
+		
+		Raises:
+			ImportError: If ijson isn't installed.
+		"""
+		writer = AAshe.utils.serialization.get_codec(cls.codec).list_writer()
+		document = {}
+		
+		try:
+			await AAshe.utils.serialization.stream_items(stream=stream, handlers={
+				"frames.item": writer.append,
+				"frameInterval": lambda value: document.update(frameInterval=value)})
+		except BaseException:
+			writer.close()
+			raise
+		
+		document["frames"] = AAshe.sqlite.SQLiteLazy.Raw(writer.finish())
+		return document
+	
+	@classmethod
+	def from_response(cls, region: str, match_id: typing.Union[str, int], resp_data: dict)->'Timeline':
+		"""Builds a Timeline from the decoded response of the Riot API, or the one of `parse_response`."""
+		# The response can be shared with other callers, so it's only copied from.
+		kwargs = dict(resp_data)
+		kwargs["matchId"] = int(match_id)
+		kwargs["region"] = region.lower()
+		kwargs["time"] = time.time()
+		if not isinstance(kwargs["frames"], AAshe.sqlite.SQLiteLazy.Raw):
+			kwargs["frames"] = [Frame(**kw) for kw in kwargs["frames"]]
+		
+		return cls(**kwargs)
+
 
-async def async_main(aiosession: aiohttp.ClientSession):
-	game = await Timeline.get_timeline(region="euw1", aiosession=aiosession, match_id=3482810381)
-	print(game)
-	pass
+async def async_main():
+	async with AAshe.client.AAshe() as client:
+		game = await client.get_timeline(region="euw1", match_id=3482810381)
+		print(game)
 
 
 def main():
 	loop = asyncio.get_event_loop()
-	aiosession = aiohttp.ClientSession(loop=loop)
 	
 	conn = sqlite3.connect("database.db")
 	AAshe.utils.config.Config.initiate(api_key="RGAPI-498880b9-d3e9-4f45-98e6-b5f66721e28b", conn=conn)
-	Timeline.init_database(c=conn.cursor(), conn=conn)
+	Timeline.init_database(conn=conn)
 
-	loop.run_until_complete(async_main(aiosession=aiosession))  # suebegedei
-	loop.run_forever()
+	loop.run_until_complete(async_main())
 
 
 if __name__ == "__main__":
@@ -107,10 +107,10 @@ class LiveMatch(AAshe.sqlite.SQLite):
 		integer=["gameStartTime", "mapId", "gameLength", "gameQueueConfigId", "summonerId"],
 		integer_key=["gameId"],
 		real=["time"],
-		text=[
-			"region", "platformId", "gameMode", "gameType",
-			"bannedChampions", "observers", "participants"],
-		text_key=["region"])
+		text=["platformId", "gameMode", "gameType"],
+		text_key=["region"],
+		nested=["bannedChampions", "observers", "participants"])
+	indexes = [("region", "summonerId", "time DESC")]
 
 	__slots__ = (
 		"gameId",  # type: int
@@ -149,7 +149,8 @@ class LiveMatch(AAshe.sqlite.SQLite):
 
 		Args:
 			region (str): The region searched on.
-			aiosession (aiohttp.ClientSession): The aiosession used for the async search.
+			aiosession (aiohttp.ClientSession): The aiosession used for the async search,
+				None uses the pooled session of the shared `AAshe.client.AAshe`.
 			summoner_id (int): summoner ID to spectate.
 
 		Returns:
@@ -194,23 +195,28 @@ class LiveMatch(AAshe.sqlite.SQLite):
 		"""
 		game = None
 		
-		data = cls.read_all_data(summonerId=summoner_id, order_by=[cls.desc("time")])
+		lookup = dict(summonerId=summoner_id, region=region.lower())
+		game = cls.recall(**lookup)
+		if game is not None:
+			cls.debug(msg="Found search in memory")
+			return game
+		
+		data = await cls.read_all_data_async(order_by=[cls.desc("time")], **lookup)
 		if data:
 			if time.time() - data[0].time < cls.request_cooldown:
 				game = data[0]
-				game.bannedChampions = [BannedChampion(**kw) for kw in json.loads(game.bannedChampions)]
-				game_participants = copy.copy(json.loads(game.participants))
+				game.bannedChampions = [BannedChampion(**kw) for kw in game.bannedChampions]
+				game_participants = copy.copy(game.participants)
 				game.participants = list()
 				for kw in game_participants:
 					kw["region"] = region
 					game.participants.append(GameParticipant(**kw))
-				game.observers = Observer(**json.loads(game.observers))
+				game.observers = Observer(**game.observers)
+				cls.remember(game, **lookup)
 				
 				cls.debug(msg="Found search in database")
 			else:
-				for d in data:
-					d.del_data(commit=False)
-				cls.commit()
+				await cls.bulk_delete_async(data)
 		
 		if game:
 			return game
@@ -225,28 +231,28 @@ class LiveMatch(AAshe.sqlite.SQLite):
 				aiosession=aiosession,
 				url=url,
 				region=region,
-				headers={})  # type: bytes
+				headers={},
+				_cls=cls)  # type: dict
 			
-			kwargs = json.loads(resp_data.decode())
+			# The response can be shared with other callers, so it's only copied from.
+			kwargs = dict(resp_data)
 			
 			if "status" in kwargs:
 				return None
 			
 			kwargs["summonerId"] = summoner_id
-			kwargs["region"] = region
+			kwargs["region"] = region.lower()
 			kwargs["time"] = time.time()
 			
 			kwargs["bannedChampions"] = [BannedChampion(**kw) for kw in kwargs["bannedChampions"]]
 			kwargs["observers"] = Observer(**kwargs["observers"])
 
-			game_participants = copy.copy(kwargs["participants"])
-			kwargs["participants"] = list()
-			for kw in game_participants:
-				kw["region"] = region
-				kwargs["participants"].append(GameParticipant(**kw))
+			kwargs["participants"] = [
+				GameParticipant(**dict(kw, region=region)) for kw in kwargs["participants"]]
 				
 			game = cls(**kwargs)
-			game.write_data()
+			await game.write_data_async()
+			cls.remember(game, **lookup)
 		
 		return game
 
@@ -2,6 +2,7 @@
 
 import AAshe.utils.request
 import AAshe.utils.ratelimit
+import AAshe.utils.singleflight
 import AAshe.sqlite
 
 import aiohttp
@@ -10,9 +11,10 @@ import aiohttp
 
 
 class SpectatorEndpoint:
-	__method_limit__ = None
+	method_limit = None
 
 	@classmethod
+	@AAshe.utils.singleflight.coalesced(name="Spectator-V3")
 	@AAshe.utils.ratelimit.method_limited(refresh_cooldown=3600, name="Spectator-V3", use_lock=True)
 	async def request_spectator(
 			cls,
@@ -22,7 +24,7 @@ class SpectatorEndpoint:
 			headers: dict,
 			timeout: int=10,
 			count: bool=True,
-			_cls: AAshe.sqlite.SQLite=None)->bytes:
+			_cls: AAshe.sqlite.SQLite=None)->dict:
 		"""To keep track of the calls being made.
 
 		Args:
@@ -30,13 +32,12 @@ class SpectatorEndpoint:
 			aiosession(aiohttp.ClientSession):
 			url(str): Region-less URL for the call
 			headers(dict): Headers for the call, usually an empty dictionary.
-			# Searches the database (Cache)
-		timeout(int): Seconds until Timeout exception is raised.
+			timeout(int): Seconds until Timeout exception is raised.
 			count(bool): If it should count on the limit.
 			_cls(AAshe.sqlite.SQLite): Logger to use.
 
 		Returns:
-			bytes: Response from the call.
+			dict: Decoded response from the call.
 		"""
 
 		return await AAshe.utils.request.make_riot_request(
@@ -1,10 +1,199 @@
+import concurrent.futures
+import collections
+import contextlib
+import contextvars
 import traceback
+import functools
+import threading
+import asyncio
+import queue
+import time
 import sqlite3
 import json
 import sys
 import typing
 import logging
 
+import AAshe.utils.serialization
+import AAshe.utils.bulk
+import AAshe.utils.singleflight
+import AAshe.utils.ratelimit
+
+
+upsert_supported = sqlite3.sqlite_version_info >= (3, 24, 0)
+# INSERT ... ON CONFLICT DO UPDATE, older versions probe for the keys before writing.
+
+local = threading.local()
+# The connection of a storage thread, and the cursors kept per thread.
+
+refreshes = AAshe.utils.singleflight.SingleFlight(name="Revalidate")
+# The background requests of stale entries in flight, see `SQLite.revalidate`.
+
+fetches = AAshe.utils.singleflight.SingleFlight(name="Fetch")
+# The requests of missing entries in flight with their build and write, see `SQLite.fetch_once`.
+
+batches = contextvars.ContextVar("batches", default={})
+# The `SQLiteBatch` writes of each class are buffered in, in the current context. Replaced, never changed.
+
+
+class SQLiteProfile:
+	"""
+	PRAGMAs set on every connection opened by `connect`.
+	
+	`page_size` and `auto_vacuum` only apply to a new database file, they can't
+	be changed once the file is in WAL mode.
+	"""
+	
+	__slots__ = (
+		"name",  # type: str
+		"journal_mode",  # type: str
+		"synchronous",  # type: str
+		"mmap_size",  # type: int
+		"cache_size",  # type: int
+		"temp_store",  # type: str
+		"page_size",  # type: int
+		"auto_vacuum",  # type: str
+	)
+	
+	def __init__(
+			self,
+			name: str,
+			journal_mode: str="WAL",
+			synchronous: str="NORMAL",
+			mmap_size: int=0,
+			cache_size: int=-2000,
+			temp_store: str="DEFAULT",
+			page_size: int=4096,
+			auto_vacuum: str="NONE"):
+		self.name = name
+		self.journal_mode = journal_mode
+		self.synchronous = synchronous
+		self.mmap_size = mmap_size
+		# Negative sizes are in KiB, positive ones in pages.
+		self.cache_size = cache_size
+		self.temp_store = temp_store
+		self.page_size = page_size
+		# INCREMENTAL lets `SQLite.vacuum` give free pages back to the file system.
+		self.auto_vacuum = auto_vacuum
+	
+	def __repr__(self):
+		return "<{0.name}:{0.journal_mode}:{0.synchronous}>".format(self)
+	
+	def apply(self, conn: sqlite3.Connection)->None:
+		"""Sets the PRAGMAs on `conn`."""
+		conn.execute(f"PRAGMA page_size={int(self.page_size)}")
+		conn.execute(f"PRAGMA auto_vacuum={self.auto_vacuum}")
+		conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+		conn.execute(f"PRAGMA synchronous={self.synchronous}")
+		conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+		conn.execute(f"PRAGMA cache_size={int(self.cache_size)}")
+		conn.execute(f"PRAGMA temp_store={self.temp_store}")
+
+
+profiles = {
+	# A commit is durable once the WAL is checkpointed, a power loss can undo the
+	# last commits but never corrupts the database. Reads are served from mmap.
+	"throughput": SQLiteProfile(
+		name="throughput", journal_mode="WAL", synchronous="NORMAL", mmap_size=256 * 1024 * 1024,
+		cache_size=-64 * 1024, temp_store="MEMORY", page_size=8192, auto_vacuum="INCREMENTAL"),
+	# Every commit is synced to disk before it returns.
+	"durable": SQLiteProfile(
+		name="durable", journal_mode="WAL", synchronous="FULL", mmap_size=0,
+		cache_size=-8 * 1024, temp_store="DEFAULT", page_size=4096, auto_vacuum="INCREMENTAL"),
+}  # type: typing.Dict[str, SQLiteProfile]
+
+
+def connect(path: str, profile: typing.Union[str, SQLiteProfile]="throughput", timeout: float=30.0)->sqlite3.Connection:
+	"""Opens a connection to `path` with the PRAGMAs of `profile`.
+	
+	Args:
+		path(str): The database file.
+		profile(str, SQLiteProfile): A profile or the name of one in `profiles`.
+		timeout(float): Seconds to wait for a lock held by another connection.
+	
+	Returns:
+		sqlite3.Connection: The connection.
+	"""
+	if not isinstance(profile, SQLiteProfile):
+		profile = profiles[profile]
+	conn = sqlite3.connect(path, timeout=timeout)
+	profile.apply(conn)
+	return conn
+
+
+def sizeof(value: object)->int:
+	"""Estimates the bytes `value` takes, with what its lists, dicts and `SQLiteSubClass` objects hold."""
+	size = sys.getsizeof(value)
+	if isinstance(value, SQLiteSubClass):
+		for k in value.__class__.__slots__:
+			size += sizeof(getattr(value, k, None))
+	elif type(value) is list:
+		for o in value:
+			size += sizeof(o)
+	elif type(value) is dict:
+		for k, v in value.items():
+			size += sizeof(k) + sizeof(v)
+	return size
+
+
+class SQLiteConnector:
+	"""
+	Opens one connection per thread to a database file, with the PRAGMAs of a profile.
+	"""
+	
+	__slots__ = (
+		"path",  # type: str
+		"profile",  # type: typing.Union[str, SQLiteProfile]
+		"timeout",  # type: float
+		"local",  # type: threading.local
+		"writer",  # type: concurrent.futures.ThreadPoolExecutor
+	)
+	
+	connectors = {}  # type: typing.Dict[tuple, SQLiteConnector]
+	
+	def __init__(self, path: str, profile: typing.Union[str, SQLiteProfile]="throughput", timeout: float=30.0):
+		self.path = path
+		self.profile = profile
+		self.timeout = timeout
+		self.local = threading.local()
+		# Started by `write` on first use.
+		self.writer = None
+	
+	def __repr__(self):
+		return "<{}:{}>".format(self.path, self.profile)
+	
+	@classmethod
+	def get(cls, path: str, profile: typing.Union[str, SQLiteProfile]="throughput")->'SQLiteConnector':
+		"""Returns the connector of `path` and `profile`, so classes sharing a file share the connections."""
+		connector = cls.connectors.get((path, profile))
+		if connector is None:
+			connector = cls.connectors[(path, profile)] = cls(path=path, profile=profile)
+		return connector
+	
+	def connection(self)->sqlite3.Connection:
+		"""Returns the connection of the current thread, opening it on first use."""
+		conn = getattr(self.local, "conn", None)
+		if conn is None:
+			conn = self.local.conn = connect(path=self.path, profile=self.profile, timeout=self.timeout)
+		return conn
+	
+	async def write(self, func: typing.Callable, *args, **kwargs)->object:
+		"""Runs `func(*args, **kwargs)` on the writer thread of the connector, off the event loop.
+		
+		The classes sharing the connector write there one at a time, instead of
+		waiting for the lock of the database on threads of their own.
+		"""
+		if self.writer is None:
+			self.writer = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="AAshe-sqlite-writer")
+		return await asyncio.get_running_loop().run_in_executor(self.writer, functools.partial(func, *args, **kwargs))
+	
+	def close(self)->None:
+		"""Closes the connection of the current thread, the next use opens a new one."""
+		conn = getattr(self.local, "conn", None)
+		if conn is not None:
+			self.local.conn = None
+			conn.close()
+
 
 class SQLiteSubClass:
 	"""
@@ -44,6 +233,71 @@ class SQLiteSubClass:
 		return v
 
 
+class SQLiteLazy:
+	"""
+	A nested column of a SQLite class that is decoded and built on first access.
+
+	The value is kept in the slot named after the attribute with a leading "_".
+	Entries read from the database hold the column as it was stored until the
+	attribute is accessed, and write it back as it is if it never was.
+
+	Example:
+		>>> class Match(SQLite):
+		...     __slots__ = ("_teams", ...)
+		...     teams = SQLiteLazy(lambda data: [TeamStats(**kw) for kw in data])
+	"""
+
+	class Raw:
+		"""The column of an entry, as it is stored."""
+		__slots__ = ("data",)
+
+		def __init__(self, data: typing.Union[str, bytes, None]):
+			self.data = data
+
+	__slots__ = (
+		"build",  # type: typing.Callable[[object], object]
+		"name",  # type: str
+		"slot",  # type: str
+	)
+
+	def __init__(self, build: typing.Callable[[object], object]):
+		self.build = build
+		self.name = None
+		self.slot = None
+
+	def __repr__(self):
+		return "<{}:{}>".format(self.__class__.__name__, self.name)
+
+	def __set_name__(self, owner: type, name: str):
+		self.name = name
+		self.slot = "_" + name
+
+	def __get__(self, instance: 'SQLite', owner: type)->object:
+		if instance is None:
+			return self
+
+		value = getattr(instance, self.slot)
+		if type(value) is SQLiteLazy.Raw:
+			raw = value
+			value = AAshe.utils.serialization.decode(raw.data)
+			if value is not None:
+				value = self.build(value)
+			setattr(instance, self.slot, value)
+
+			# The entry was measured with the column, it takes what was built now.
+			memory = owner.__dict__.get("_memory")
+			if memory is not None and id(instance) in memory.objects:
+				memory.grow(_object=instance)
+		return value
+
+	def __set__(self, instance: 'SQLite', value: object):
+		setattr(instance, self.slot, value)
+
+	def is_raw(self, instance: 'SQLite')->bool:
+		"""Returns if the attribute of `instance` wasn't built yet."""
+		return type(getattr(instance, self.slot)) is SQLiteLazy.Raw
+
+
 class SQLiteVariableNames:
 	"""Represents the values variables used to write to a database."""
 	
@@ -52,24 +306,25 @@ class SQLiteVariableNames:
 		"_integer", "_integer_key",
 		"_real", "_real_key",
 		"_text", "_text_key",
-		"_blob", "_blob_key"
+		"_blob", "_blob_key",
+		"_nested"
 	]
 	
 	@property
 	def null(self):
-		return self.null
+		return self._null
 	
 	@property
 	def null_key(self):
-		return self.null_key
+		return self._null_key
 	
 	@property
 	def integer(self):
-		return self.null
+		return self._integer
 	
 	@property
 	def integer_key(self):
-		return self.null_key
+		return self._integer_key
 	
 	@property
 	def real(self):
@@ -89,19 +344,25 @@ class SQLiteVariableNames:
 	
 	@property
 	def blob(self):
-		return self.blob
+		return self._blob
 	
 	@property
 	def blob_key(self):
 		return self._blob_key
 	
+	@property
+	def nested(self):
+		"""Columns holding lists, dicts or `SQLiteSubClass` values, written with the codec of the class."""
+		return self._nested
+	
 	def __init__(
 			self,
 			null: list=None, null_key: list=None,
 			integer: list=None, integer_key: list=None,
 			real: list=None, real_key: list=None,
 			text: list=None, text_key: list=None,
-			blob: list=None, blob_key: list=None):
+			blob: list=None, blob_key: list=None,
+			nested: list=None):
 		
 		self._null = null if null else []
 		self._null_key = null_key if null_key else []
@@ -113,6 +374,7 @@ class SQLiteVariableNames:
 		self._text_key = text_key if text_key else []
 		self._blob = blob if blob else []
 		self._blob_key = blob_key if blob_key else []
+		self._nested = nested if nested else []
 	
 	def non_keys(self):
 		names = list()
@@ -121,6 +383,7 @@ class SQLiteVariableNames:
 		names.extend(self.real)
 		names.extend(self.text)
 		names.extend(self.blob)
+		names.extend(self.nested)
 		return names
 		
 	def keys(self):
@@ -133,6 +396,907 @@ class SQLiteVariableNames:
 		return names
 
 
+class SQLiteQueries:
+	"""
+	The statements of a SQLite class, built once from its `variable_names`.
+	
+	Statements that depend on the call, like the filters of `read_all_data`,
+	are built the first time their shape is used and kept after that.
+	"""
+	
+	max_shapes = 256
+	# Kept select statements per class, an IN (...) filter has one per length.
+	
+	__slots__ = (
+		"table_name",  # type: str
+		"args_names",  # type: typing.Tuple[str]
+		"keys_names",  # type: typing.Tuple[str]
+		"names",  # type: typing.Tuple[str]
+		
+		"probe",  # type: str
+		"insert",  # type: str
+		"update",  # type: str
+		"upsert",  # type: typing.Optional[str]
+		"delete",  # type: str
+		"delete_names",  # type: typing.Tuple[str]
+		"shapes",  # type: typing.Dict[tuple, str]
+	)
+	
+	def __init__(self, table_name: str, args_names: typing.List[str], keys_names: typing.List[str]):
+		self.table_name = table_name
+		self.args_names = tuple(args_names)
+		self.keys_names = tuple(keys_names)
+		self.names = self.args_names + self.keys_names
+		
+		# NULL keys are compared with IS, an entry with one is updated like the others.
+		where = " WHERE {}".format(" AND ".join([
+			key_name + " IS (?)" for key_name in self.keys_names])) if self.keys_names else ""
+		
+		self.probe = "SELECT 1 FROM {}{} LIMIT 1".format(table_name, where)
+		self.insert = "INSERT INTO {}({}) VALUES ({})".format(
+			table_name, ", ".join(self.names), ", ".join(["?" for _ in self.names]))
+		self.update = "UPDATE {} SET {}{}".format(
+			table_name, ", ".join([args_name + "=(?)" for args_name in self.args_names]), where)
+		
+		# An entry is deleted by its keys, and the time it was written if there is one so an entry
+		# written again meanwhile is kept. Without keys every column has to match.
+		if self.keys_names:
+			self.delete_names = self.keys_names + (("time",) if "time" in self.args_names else ())
+		else:
+			self.delete_names = self.names
+		self.delete = "DELETE FROM {} WHERE {}".format(
+			table_name, " AND ".join([name + " IS (?)" for name in self.delete_names]))
+		
+		# Needs the unique constraint on the keys, there is nothing to conflict on without keys.
+		# NULL keys don't conflict either, so entries with one are written with `probe` instead.
+		if not self.keys_names:
+			self.upsert = None
+		elif self.args_names:
+			self.upsert = "{} ON CONFLICT({}) DO UPDATE SET {}".format(
+				self.insert, ", ".join(self.keys_names),
+				", ".join(["{0}=excluded.{0}".format(args_name) for args_name in self.args_names]))
+		else:
+			self.upsert = "{} ON CONFLICT({}) DO NOTHING".format(self.insert, ", ".join(self.keys_names))
+		self.shapes = {}
+	
+	def __repr__(self):
+		return "<{}:{}>".format(self.table_name, len(self.shapes))
+	
+	@staticmethod
+	def where(conditions: typing.Tuple[typing.Tuple[str, typing.Optional[int]]])->str:
+		"""Returns the WHERE clause for `(name, count)` pairs, a count of None compares with `=`."""
+		if not conditions:
+			return ""
+		return " WHERE {}".format(" AND ".join([
+			name + "=(?)" if count is None else "{} IN ({})".format(name, ", ".join(["?"] * count))
+			for name, count in conditions]))
+	
+	def select(
+			self,
+			names: typing.Tuple[str],
+			conditions: typing.Tuple[typing.Tuple[str, typing.Optional[int]]]=(),
+			order_by: typing.Tuple[str]=(),
+			limit: int=None)->str:
+		"""Returns the SELECT statement of the given shape.
+		
+		Args:
+			names(tuple): Selected variable names.
+			conditions(tuple): `(name, count)` pairs, see `where`.
+			order_by(tuple): The queries of `SQLite.Order`.
+			limit(int): Limit how many entries should be returned.
+		
+		Returns:
+			str: The statement.
+		"""
+		shape = (names, conditions, order_by, limit)
+		query = self.shapes.get(shape)
+		if query is None:
+			query = "SELECT {} FROM {}{}".format(", ".join(names), self.table_name, self.where(conditions))
+			if order_by:
+				query += " ORDER BY {}".format(", ".join(order_by))
+			if limit:
+				query += " LIMIT {}".format(limit)
+			
+			if len(self.shapes) >= self.max_shapes:
+				self.shapes.clear()
+			self.shapes[shape] = query
+		return query
+	
+	def chunk(self, conditions: typing.Tuple[typing.Tuple[str, typing.Optional[int]]], size: int)->str:
+		"""Returns the SELECT statement of a chunk of `SQLite.iter_data`.
+		
+		It selects the rowid followed by every column of `size` entries at most,
+		bound with the arguments of `conditions` then the rowid to start after.
+		"""
+		shape = ("chunk", conditions, size)
+		query = self.shapes.get(shape)
+		if query is None:
+			where = self.where(conditions)
+			query = "SELECT rowid, {} FROM {}{} {} rowid > (?) ORDER BY rowid LIMIT {}".format(
+				", ".join(self.names), self.table_name, where, "AND" if where else "WHERE", size)
+			
+			if len(self.shapes) >= self.max_shapes:
+				self.shapes.clear()
+			self.shapes[shape] = query
+		return query
+	
+	def delete_many(self, count: int)->str:
+		"""Returns the DELETE statement for `count` entries sharing all keys but the first.
+		
+		The first key is matched with `IN (...)` and the others with `IS`, which
+		searches the unique index of the keys, a row value `IN` would scan the table.
+		With a time column only entries written at the latest given time or before are deleted.
+		
+		Args:
+			count(int): The amount of values of the first key.
+		
+		Returns:
+			str: The statement, bound with the values of the first key, the
+				other keys, then the latest time.
+		"""
+		shape = ("delete", count)
+		query = self.shapes.get(shape)
+		if query is None:
+			conditions = ["{} IN ({})".format(self.keys_names[0], ", ".join(["?"] * count))]
+			conditions.extend([name + " IS (?)" for name in self.keys_names[1:]])
+			if "time" in self.delete_names:
+				conditions.append("time <= (?)")
+			query = "DELETE FROM {} WHERE {}".format(self.table_name, " AND ".join(conditions))
+			
+			if len(self.shapes) >= self.max_shapes:
+				self.shapes.clear()
+			self.shapes[shape] = query
+		return query
+
+
+class SQLiteRelation:
+	"""
+	A table of rows derived from the entries of a SQLite class, like a row per
+	participant of a match, so they can be filtered on in SQL.
+
+	Every row starts with the keys of the entry it comes from. The rows of an
+	entry are written again with it, in the same transaction, and a trigger on
+	the table of the class deletes them with the entry, whichever way the entry
+	is deleted. Declared in `SQLite.relations`, before `SQLite.init_database`.
+
+	Example:
+		>>> picks = SQLiteRelation(
+		...     table_name="match_picks",
+		...     columns=[("participantId", "INTEGER"), ("championId", "INTEGER")],
+		...     rows=lambda match: [(p.participantId, p.championId) for p in match.participants or []],
+		...     indexes=[("championId",)])
+		>>> Match.relations = [picks]
+	"""
+
+	__slots__ = (
+		"table_name",  # type: str
+		"columns",  # type: typing.Tuple[typing.Tuple[str, str]]
+		"names",  # type: typing.Tuple[str]
+		"rows",  # type: typing.Callable[[SQLite], typing.Iterable[tuple]]
+		"indexes",  # type: typing.Tuple[typing.Tuple[str]]
+		"shapes",  # type: typing.Dict[tuple, str]
+	)
+
+	def __init__(
+			self,
+			table_name: str,
+			columns: typing.Iterable[typing.Tuple[str, str]],
+			rows: typing.Callable[['SQLite'], typing.Iterable[tuple]],
+			indexes: typing.Iterable[typing.Tuple[str]]=()):
+		"""
+		Args:
+			table_name(str): The table of the rows.
+			columns(typing.Iterable): `(name, type)` of the columns following the keys, like ("championId", "INTEGER").
+			rows(typing.Callable): Returns the rows of an entry, the values of `columns` without the keys.
+			indexes(typing.Iterable): Indexes created besides the one on the keys, each a tuple of columns.
+		"""
+		self.table_name = table_name
+		self.columns = tuple([tuple(column) for column in columns])
+		self.names = tuple([name for name, _ in self.columns])
+		self.rows = rows
+		self.indexes = tuple([tuple(columns) for columns in indexes])
+		self.shapes = {}
+
+	def __repr__(self):
+		return "<{}:{}>".format(self.__class__.__name__, self.table_name)
+
+	def create(self, cls: typing.Type['SQLite'])->typing.List[str]:
+		"""Returns the queries for creating the table, its indexes and the trigger deleting its rows.
+
+		Raises:
+			ValueError: If the class has no keys, or a column is named like one.
+		"""
+		queries = cls.get_queries()
+		if not queries.keys_names:
+			raise ValueError(f"{self.table_name} needs the keys of {queries.table_name}, which has none.")
+		if set(self.names) & set(queries.keys_names):
+			raise ValueError(f"The columns of {self.table_name} can't be named like the keys of {queries.table_name}.")
+
+		key_types = {}
+		for column_type, names in (
+				("NULL", cls.variable_names.null_key), ("INTEGER", cls.variable_names.integer_key),
+				("REAL", cls.variable_names.real_key), ("TEXT", cls.variable_names.text_key),
+				("BLOB", cls.variable_names.blob_key)):
+			key_types.update({name: column_type for name in names})
+
+		create_names = [f"{name} {key_types[name]}" for name in queries.keys_names]
+		create_names.extend([f"{name} {column_type}" for name, column_type in self.columns])
+		statements = ["CREATE TABLE IF NOT EXISTS {}({})".format(self.table_name, ", ".join(create_names))]
+
+		for columns in (queries.keys_names,) + self.indexes:
+			index_name = "_".join([self.table_name] + [column.split()[0] for column in columns])
+			statements.append("CREATE INDEX IF NOT EXISTS {} ON {}({})".format(
+				index_name, self.table_name, ", ".join(columns)))
+
+		statements.append("CREATE TRIGGER IF NOT EXISTS {0}_delete AFTER DELETE ON {1} BEGIN {2}; END".format(
+			self.table_name, queries.table_name, "DELETE FROM {} WHERE {}".format(
+				self.table_name, " AND ".join(["{0} IS OLD.{0}".format(name) for name in queries.keys_names]))))
+		return statements
+
+	def cached(self, shape: tuple, build: typing.Callable[[], str])->str:
+		"""Returns the statement of `shape`, built with `build` the first time."""
+		query = self.shapes.get(shape)
+		if query is None:
+			query = build()
+			if len(self.shapes) >= SQLiteQueries.max_shapes:
+				self.shapes.clear()
+			self.shapes[shape] = query
+		return query
+
+	def write(self, cls: typing.Type['SQLite'], objects: typing.List['SQLite'])->int:
+		"""Replaces the rows of `objects` with the ones `rows` returns, without committing.
+
+		Returns:
+			int: The amount of rows written.
+		"""
+		queries = cls.get_queries()
+		delete = self.cached(shape=(queries, "delete"), build=lambda: "DELETE FROM {} WHERE {}".format(
+			self.table_name, " AND ".join([name + " IS (?)" for name in queries.keys_names])))
+		insert = self.cached(shape=(queries, "insert"), build=lambda: "INSERT INTO {}({}) VALUES ({})".format(
+			self.table_name, ", ".join(queries.keys_names + self.names),
+			", ".join(["?"] * (len(queries.keys_names) + len(self.names)))))
+
+		keys = [_object.get_keys() for _object in objects]
+		rows = [tuple(key) + tuple(row) for _object, key in zip(objects, keys) for row in self.rows(_object)]
+
+		cursor = cls.cursor()
+		cursor.executemany(delete, keys)
+		if rows:
+			cls.logger.debug("-> QUERY : %s , %s rows", insert, len(rows))
+			cursor.executemany(insert, rows)
+		return len(rows)
+
+	def split(self, kwargs: dict)->typing.Tuple[dict, dict]:
+		"""Splits filters into the ones on the columns of the relation and the ones on the entries."""
+		related = {name: value for name, value in kwargs.items() if name in self.names}
+		return {name: value for name, value in kwargs.items() if name not in related}, related
+
+	def select_entries(
+			self,
+			queries: SQLiteQueries,
+			conditions: typing.Tuple[typing.Tuple[str, typing.Optional[int]]],
+			related: typing.Tuple[typing.Tuple[str, typing.Optional[int]]],
+			order_by: typing.Tuple[str]=(),
+			limit: int=None)->str:
+		"""Returns the SELECT statement of `SQLite.read_related`.
+
+		The entries are filtered by `conditions`, then by their keys being among
+		the ones of the rows matching `related`, which SQLite evaluates once
+		with the indexes of the relation.
+
+		Returns:
+			str: The statement, bound with the arguments of `conditions` then `related`.
+		"""
+		def build()->str:
+			where = SQLiteQueries.where(conditions)
+			query = "SELECT {} FROM {}{} {} ({}) IN (SELECT {} FROM {}{})".format(
+				", ".join(queries.names), queries.table_name, where, "AND" if where else "WHERE",
+				", ".join(queries.keys_names), ", ".join(queries.keys_names), self.table_name,
+				SQLiteQueries.where(related))
+			if order_by:
+				query += " ORDER BY {}".format(", ".join(order_by))
+			if limit:
+				query += " LIMIT {}".format(limit)
+			return query
+
+		return self.cached(shape=(queries, "entries", conditions, related, order_by, limit), build=build)
+
+	def select_rows(
+			self,
+			queries: SQLiteQueries,
+			related: typing.Tuple[typing.Tuple[str, typing.Optional[int]]],
+			keys: typing.Tuple[typing.Tuple[str, typing.Optional[int]]],
+			conditions: typing.Tuple[typing.Tuple[str, typing.Optional[int]]],
+			limit: int=None)->str:
+		"""Returns the SELECT statement of `SQLite.read_relation`.
+
+		Filters on the keys are applied to the rows directly, the entries are
+		only joined when `conditions` filters on their other columns.
+
+		Returns:
+			str: The statement selecting the keys and columns, bound with the
+				arguments of `related`, `keys` then `conditions`.
+		"""
+		def build()->str:
+			names = queries.keys_names + self.names
+			query = "SELECT {} FROM {} r".format(", ".join(["r." + name for name in names]), self.table_name)
+			if conditions:
+				query += " JOIN {} e ON {}".format(queries.table_name, " AND ".join([
+					"e.{0} = r.{0}".format(name) for name in queries.keys_names]))
+			query += SQLiteQueries.where(
+				tuple([("r." + name, count) for name, count in related + keys]) +
+				tuple([("e." + name, count) for name, count in conditions]))
+			if limit:
+				query += " LIMIT {}".format(limit)
+			return query
+
+		return self.cached(shape=(queries, "rows", related, keys, conditions, limit), build=build)
+
+
+class SQLiteBatch:
+	"""
+	Writes buffered by `SQLite.batch`, written with `SQLite.bulk_write`.
+	
+	The batch only buffers the writes of the context it is used in, see `use`,
+	the task that entered it and the tasks started within it, never the writes
+	of unrelated tasks of the same class.
+	
+	The timer of `flush_interval` writes the objects where the class writes off
+	the event loop, see `flush_async`.
+	"""
+	
+	__slots__ = (
+		"cls",  # type: typing.Type[SQLite]
+		"objects",  # type: typing.List[SQLite]
+		"flush_size",  # type: int
+		"flush_interval",  # type: float
+		"flushed",  # type: float
+		"timer",  # type: typing.Optional[asyncio.TimerHandle]
+		"flushing",  # type: typing.Set[asyncio.Task]
+		"closed",  # type: bool
+	)
+	
+	def __init__(self, cls: typing.Type['SQLite'], flush_size: int, flush_interval: float):
+		self.cls = cls
+		self.objects = []
+		self.flush_size = flush_size
+		self.flush_interval = flush_interval
+		self.flushed = time.monotonic()
+		self.timer = None
+		# The flushes of the timer still running.
+		self.flushing = set()
+		self.closed = False
+	
+	def __repr__(self):
+		return "<{}:{}/{}>".format(self.cls.__name__, len(self.objects), self.flush_size)
+	
+	@contextlib.contextmanager
+	def use(self)->typing.Iterator['SQLiteBatch']:
+		"""Buffers the writes of its class in the current context in this batch, until the context exits."""
+		token = batches.set({**batches.get(), self.cls: self})
+		try:
+			yield self
+		finally:
+			batches.reset(token)
+	
+	def add(self, _object: 'SQLite')->None:
+		"""Buffers `_object`, flushing if the batch is full or closed.
+		
+		On an event loop the first object buffered starts a timer flushing it
+		`flush_interval` seconds later, without one it is flushed on the first
+		write that comes after that.
+		"""
+		self.objects.append(_object)
+		if self.closed or len(self.objects) >= self.flush_size:
+			self.flush()
+			return
+		
+		try:
+			loop = asyncio.get_running_loop()
+		except RuntimeError:
+			loop = None
+		
+		if loop is None:
+			if time.monotonic() - self.flushed >= self.flush_interval:
+				self.flush()
+		elif self.timer is None:
+			self.timer = loop.call_later(self.flush_interval, self.start_flush)
+	
+	def take(self)->list:
+		"""Returns the buffered objects and empties the buffer."""
+		if self.timer is not None:
+			self.timer.cancel()
+			self.timer = None
+		objects, self.objects = self.objects, []
+		self.flushed = time.monotonic()
+		return objects
+	
+	def flush(self)->int:
+		"""Writes and commits the buffered objects.
+		
+		Returns:
+			int: The amount of objects written.
+		"""
+		objects = self.take()
+		if not objects:
+			return 0
+		return self.cls.bulk_write(objects)
+	
+	def start_flush(self)->None:
+		"""Runs `flush_async` in a task, called by the timer."""
+		self.timer = None
+		task = asyncio.ensure_future(self.flush_async())
+		self.flushing.add(task)
+		task.add_done_callback(self.flushing.discard)
+	
+	def write(self, objects: list, commit: bool=True)->typing.Optional[Exception]:
+		"""`SQLite.bulk_write` returning its exception instead of raising it."""
+		try:
+			self.cls.bulk_write(objects, commit=commit)
+		except Exception as exception:
+			return exception
+		return None
+	
+	async def flush_async(self)->int:
+		"""Writes the buffered objects on the writer thread of the storage or of the connector of the class.
+		
+		Without either they are written on the event loop. Objects that fail on a
+		`sqlite3.OperationalError`, like a locked database, are buffered again
+		unless the batch is closed, the others are logged and dropped.
+		
+		Returns:
+			int: The amount of objects written.
+		"""
+		cls = self.cls
+		objects = self.take()
+		if not objects:
+			return 0
+		
+		try:
+			if cls.storage is not None:
+				# The writer commits.
+				exception = await cls.storage.write(self.write, objects, commit=False)
+			elif cls.connector is not None:
+				exception = await cls.connector.write(self.write, objects)
+			else:
+				exception = self.write(objects)
+		except Exception as raised:
+			# The commit of the writer failed.
+			exception = raised
+		if exception is None:
+			return len(objects)
+		
+		failed = getattr(exception, "objects", objects)
+		if isinstance(exception, sqlite3.OperationalError) and not self.closed:
+			cls.warning(msg=f"Writing {len(failed)} {cls.__name__} failed, {exception!r}, they are buffered again.")
+			for _object in failed:
+				self.add(_object)
+		else:
+			cls.logger.error(
+				msg=f"Writing {len(failed)} {cls.__name__} failed, {exception!r}, they are dropped: "
+				+ ", ".join([str(_object.get_keys()) for _object in failed]))
+		return len(objects) - len(failed)
+	
+	def close(self)->int:
+		"""Flushes the batch, the writes still coming to it after that are written at once.
+		
+		Returns:
+			int: The amount of objects written.
+		"""
+		self.closed = True
+		return self.flush()
+
+
+class SQLiteMemory:
+	"""
+	The in-process tier of the cache of a SQLite class, consulted by the getters
+	before the database.
+
+	Entries are kept by the values they were looked up by, and are valid for
+	the `max_age` of the lookup from their `time`, the `request_cooldown` of the
+	class for the getters. The least recently used are evicted once the entries
+	take more than `max_bytes`, estimated with `SQLite.memory_size`.
+
+	An entry kept under several lookups is counted once, and it's measured again
+	when it builds a lazy attribute while it's kept, see `grow`.
+	"""
+	
+	__slots__ = (
+		"cls",  # type: typing.Type[SQLite]
+		"max_bytes",  # type: int
+		"entries",  # type: collections.OrderedDict
+		"objects",  # type: typing.Dict[int, list]
+		"size",  # type: int
+		"lock",  # type: threading.Lock
+		"hits",  # type: int
+		"misses",  # type: int
+		"evictions",  # type: int
+		"expirations",  # type: int
+	)
+	
+	def __init__(self, cls: typing.Type['SQLite'], max_bytes: int):
+		self.cls = cls
+		self.max_bytes = max_bytes
+		self.entries = collections.OrderedDict()
+		# The entries by the id of the object, with its size and the amount of lookups it's kept under.
+		self.objects = {}
+		self.size = 0
+		# The readers of a storage look entries up from their own threads.
+		self.lock = threading.Lock()
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self.expirations = 0
+	
+	def __repr__(self):
+		return "<{}:{}:{}/{}>".format(self.cls.__name__, len(self.entries), self.size, self.max_bytes)
+	
+	@staticmethod
+	def key(lookup: dict)->tuple:
+		return tuple(sorted(lookup.items()))
+	
+	def get(self, lookup: dict, max_age: float)->typing.Union['SQLite', None]:
+		"""Returns the entry looked up by `lookup` if it's younger than `max_age` seconds."""
+		key = self.key(lookup)
+		with self.lock:
+			_object = self.entries.get(key)
+			if _object is None:
+				self.misses += 1
+				return None
+			
+			if time.time() - _object.time >= max_age:
+				self.release(key)
+				self.expirations += 1
+				self.misses += 1
+				return None
+			
+			self.entries.move_to_end(key)
+			self.hits += 1
+			return _object
+	
+	def put(self, lookup: dict, _object: 'SQLite')->None:
+		"""Keeps `_object` as the entry looked up by `lookup`, evicting the least recently used ones if needed.
+		
+		It's sized under the lock, so concurrent puts of the same object charge it once.
+		"""
+		key = self.key(lookup)
+		with self.lock:
+			if self.entries.get(key) is _object:
+				self.entries.move_to_end(key)
+				return
+			
+			kept = self.objects.get(id(_object))
+			size = _object.memory_size() if kept is None else None
+			if size is not None and size > self.max_bytes:
+				return
+			if key in self.entries:
+				self.release(key)
+			
+			if kept is None:
+				self.objects[id(_object)] = [_object, size, 1]
+				self.size += size
+			else:
+				kept[2] += 1
+			self.entries[key] = _object
+			self.evict()
+	
+	def grow(self, _object: 'SQLite')->None:
+		"""Measures `_object` again if it's kept, like when it builds a lazy attribute.
+		
+		It's measured whole rather than charged the difference, a put that measured
+		it with the attribute already built isn't charged for it twice.
+		"""
+		with self.lock:
+			kept = self.objects.get(id(_object))
+			if kept is not None and kept[0] is _object:
+				size = _object.memory_size()
+				self.size += size - kept[1]
+				kept[1] = size
+				self.evict()
+	
+	def release(self, key: tuple)->None:
+		"""Drops the entry of `key`, and its object once no other lookup keeps it. Needs the lock."""
+		_object = self.entries.pop(key)
+		kept = self.objects[id(_object)]
+		kept[2] -= 1
+		if not kept[2]:
+			del self.objects[id(_object)]
+			self.size -= kept[1]
+	
+	def evict(self)->None:
+		"""Drops the least recently used entries until they fit in `max_bytes`. Needs the lock."""
+		while self.size > self.max_bytes and self.entries:
+			self.release(next(iter(self.entries)))
+			self.evictions += 1
+	
+	def clear(self)->None:
+		"""Drops every entry, the counters are kept."""
+		with self.lock:
+			self.entries.clear()
+			self.objects.clear()
+			self.size = 0
+	
+	def stats(self)->dict:
+		"""Returns the counters, the amount of entries and the bytes they take."""
+		with self.lock:
+			return {
+				"hits": self.hits, "misses": self.misses,
+				"evictions": self.evictions, "expirations": self.expirations,
+				"entries": len(self.entries), "objects": len(self.objects),
+				"bytes": self.size, "max_bytes": self.max_bytes}
+
+
+class SQLiteMaintenance:
+	"""
+	Purges the entries of a SQLite class past its `retention` and compacts the
+	database in the background, every `interval` seconds.
+	
+	Every step is one short transaction, run on the writer thread of the storage
+	of the class, or of its connector. A connection given to `init_database` only
+	works on the thread that opened it, so without either the steps run on the
+	event loop between requests, which waits for one batch at most.
+	
+	The index on `time` the purge needs is created by the first run, if the
+	class had no `retention` when its table was created.
+	"""
+	
+	__slots__ = (
+		"cls",  # type: typing.Type[SQLite]
+		"interval",  # type: float
+		"task",  # type: asyncio.Task
+		"runs",  # type: int
+		"purged",  # type: int
+		"reclaimed",  # type: int
+		"report",  # type: dict
+		"indexed",  # type: bool
+	)
+	
+	def __init__(self, cls: typing.Type['SQLite'], interval: float):
+		self.cls = cls
+		self.interval = interval
+		self.task = None
+		self.runs = 0
+		self.purged = 0
+		self.reclaimed = 0
+		# The outcome of the last run, see `run_once`.
+		self.report = None
+		self.indexed = False
+	
+	def __repr__(self):
+		return "<{}:{}s:{}>".format(self.cls.__name__, self.interval, self.runs)
+	
+	def start(self)->asyncio.Task:
+		"""Runs the maintenance every `interval` seconds on the running loop, starting now."""
+		if self.task is None or self.task.done():
+			self.task = asyncio.ensure_future(self.run())
+		return self.task
+	
+	def stop(self)->None:
+		if self.task is not None:
+			self.task.cancel()
+	
+	async def run(self)->None:
+		while True:
+			try:
+				await self.run_once()
+			except sqlite3.Error as exception:
+				self.cls.warning(msg=f"Maintenance of {self.cls.__name__} failed, {exception!r}")
+			await asyncio.sleep(self.interval)
+	
+	async def step(self, func: typing.Callable, **kwargs)->object:
+		"""Runs `func(**kwargs)` where the class writes without blocking the loop, see the class."""
+		cls = self.cls
+		if cls.storage is not None:
+			# The writer commits.
+			return await cls.storage.write(func, commit=False, **kwargs)
+		if cls.connector is not None:
+			return await cls.connector.write(func, **kwargs)
+		
+		result = func(**kwargs)
+		await asyncio.sleep(0)
+		return result
+	
+	async def run_once(self)->dict:
+		"""Purges the entries past `retention` in batches, then compacts the database.
+		
+		Returns:
+			dict: The entries purged, the bytes given back to the file system and the
+				bytes that are free in the file but weren't given back.
+		"""
+		cls = self.cls
+		started = time.perf_counter()
+		
+		purged = 0
+		if cls.retention is not None:
+			if not self.indexed:
+				await self.step(cls.create_time_index)
+				self.indexed = True
+			before = time.time() - cls.retention
+			while True:
+				count = await self.step(cls.purge_expired, before=before, limit=cls.maintenance_batch_size)
+				purged += count
+				if count < cls.maintenance_batch_size:
+					break
+		
+		reclaimed = 0
+		while True:
+			freed = await self.step(cls.vacuum, pages=cls.maintenance_vacuum_pages)
+			reclaimed += freed
+			if not freed:
+				break
+		free = await self.step(cls.optimize)
+		
+		self.runs += 1
+		self.purged += purged
+		self.reclaimed += reclaimed
+		self.report = {
+			"purged": purged, "reclaimed": reclaimed, "free": free,
+			"seconds": time.perf_counter() - started}
+		cls.info(
+			msg=f"Maintenance of {cls.__name__}: purged {purged} entries, reclaimed {reclaimed} bytes, "
+			f"{free} bytes free in {self.report['seconds']:.2f}s.")
+		return self.report
+
+
+class AsyncStorage:
+	"""
+	Runs the queries of SQLite classes on threads, keeping them off the event loop.
+	
+	Writes are queued to a single writer thread, which commits every group of
+	writes it finds queued in one transaction. Each write runs in a savepoint,
+	a write that raises is rolled back alone and the rest of its group is committed. Reads are run by a pool of reader
+	threads. Every thread has its own connection to `path`, the WAL mode of the
+	profiles keeps the readers from being blocked by the writer. It needs a database file, an
+	in-memory database isn't shared between connections.
+	
+	Example:
+		storage = AAshe.sqlite.AsyncStorage(path="database.db")
+		storage.init_database(Match, Timeline, Summoner)
+	"""
+	
+	logger = logging.getLogger(__name__)
+	
+	max_group = 500
+	# Writes committed together at most.
+	
+	__slots__ = (
+		"path",  # type: str
+		"profile",  # type: typing.Union[str, SQLiteProfile]
+		"timeout",  # type: float
+		"writes",  # type: queue.Queue
+		"writer",  # type: threading.Thread
+		"readers",  # type: concurrent.futures.ThreadPoolExecutor
+	)
+	
+	def __init__(
+			self,
+			path: str,
+			readers: int=4,
+			timeout: float=30.0,
+			profile: typing.Union[str, SQLiteProfile]="throughput"):
+		self.path = path
+		self.profile = profile
+		self.timeout = timeout
+		
+		self.writes = queue.Queue()
+		self.writer = threading.Thread(target=self.run_writer, name="AAshe-sqlite-writer", daemon=True)
+		self.writer.start()
+		self.readers = concurrent.futures.ThreadPoolExecutor(
+			max_workers=readers, thread_name_prefix="AAshe-sqlite-reader", initializer=self.open_local)
+	
+	def __repr__(self):
+		return "<{}:{} queued>".format(self.path, self.writes.qsize())
+	
+	def connect(self)->sqlite3.Connection:
+		"""Opens a connection to the database with the PRAGMAs of `profile`."""
+		return connect(path=self.path, profile=self.profile, timeout=self.timeout)
+	
+	def open_local(self)->None:
+		"""Opens the connection used by the SQLite classes on the current thread."""
+		local.conn = self.connect()
+	
+	def init_database(self, *classes: typing.Type['SQLite'])->None:
+		"""Creates the tables of `classes` and has their *_async methods use this storage.
+		
+		Args:
+			*classes: The SQLite classes.
+		"""
+		conn = self.connect()
+		for cls in classes:
+			cls.init_database(conn=conn)
+			cls.storage = self
+	
+	async def read(self, func: typing.Callable, *args, **kwargs)->object:
+		"""Runs `func(*args, **kwargs)` on a reader thread."""
+		loop = asyncio.get_running_loop()
+		return await loop.run_in_executor(self.readers, functools.partial(func, *args, **kwargs))
+	
+	async def write(self, func: typing.Callable, *args, **kwargs)->object:
+		"""Runs `func(*args, **kwargs)` on the writer thread, returning once it is committed.
+		
+		`func` must not commit, if it raises none of its writes are committed.
+		"""
+		future = asyncio.get_running_loop().create_future()
+		self.writes.put((future, functools.partial(func, *args, **kwargs)))
+		return await future
+	
+	@staticmethod
+	def resolve(future: asyncio.Future, result: object=None, exception: BaseException=None)->None:
+		"""Sets the outcome of a write on the loop the write is awaited in."""
+		def set_outcome():
+			if future.cancelled():
+				return
+			if exception is not None:
+				future.set_exception(exception)
+			else:
+				future.set_result(result)
+		
+		try:
+			future.get_loop().call_soon_threadsafe(set_outcome)
+		except RuntimeError:
+			# The loop is closed, nobody is waiting for the write anymore.
+			AsyncStorage.logger.warning(msg="The loop of a write is closed, its outcome is dropped.")
+	
+	def run_writer(self)->None:
+		"""Writes queued writes until `close`, committing every group."""
+		self.open_local()
+		while True:
+			jobs = [self.writes.get()]
+			while len(jobs) < self.max_group and jobs[-1] is not None:
+				try:
+					jobs.append(self.writes.get_nowait())
+				except queue.Empty:
+					break
+			
+			done = []
+			for job in jobs:
+				if job is None:
+					continue
+				future, func = job
+				try:
+					done.append((future, self.run_job(func)))
+				except Exception as exception:
+					self.resolve(future, exception=exception)
+			
+			try:
+				local.conn.commit()
+			except sqlite3.Error as exception:
+				self.logger.critical(msg=f"Commit of {len(done)} writes failed, {exception!r}")
+				local.conn.rollback()
+				for future, _ in done:
+					self.resolve(future, exception=exception)
+			else:
+				for future, result in done:
+					self.resolve(future, result=result)
+			
+			if jobs[-1] is None:
+				break
+		
+		local.conn.close()
+	
+	@staticmethod
+	def run_job(func: typing.Callable)->object:
+		"""Runs a write in a savepoint of the transaction of its group, rolling it back if it raises."""
+		conn = local.conn
+		if not conn.in_transaction:
+			conn.execute("BEGIN")
+		conn.execute("SAVEPOINT aashe_write")
+		try:
+			result = func()
+		except BaseException:
+			conn.execute("ROLLBACK TO aashe_write")
+			conn.execute("RELEASE aashe_write")
+			raise
+		conn.execute("RELEASE aashe_write")
+		return result
+	
+	def close(self)->None:
+		"""Writes what is queued and stops the threads."""
+		self.writes.put(None)
+		self.writer.join()
+		self.readers.shutdown(wait=True)
+
+
 class SQLite:
 	"""
 	Represents a SQLite writable object.
@@ -154,6 +1318,44 @@ class SQLite:
 	table_name = None
 	conn = None  # type: sqlite3.Connection
 	variable_names = None  # type: SQLiteVariableNames
+	indexes = []  # type: typing.List[typing.Tuple[str]]
+	# Secondary indexes created by `init_database`, each a tuple of columns like ("region", "name", "time DESC").
+	relations = []  # type: typing.List[SQLiteRelation]
+	# Tables of rows derived from the entries, created by `init_database`, see `SQLiteRelation`.
+	
+	batch_flush_size = 500
+	batch_flush_interval = 1.0
+	# Defaults of `batch`, the objects and seconds a batch holds on to writes at most.
+	
+	codec = "json"  # type: typing.Union[str, AAshe.utils.serialization.Codec]
+	# Writes the `nested` columns, see `AAshe.utils.serialization.codecs`. Changing it
+	# doesn't need the table to be rewritten, every codec reads what the others wrote.
+	
+	stale_while_revalidate = 0.0
+	# Seconds past `request_cooldown` the getters that support it still return an entry,
+	# while it's requested again in the background, 0 disables it, see `revalidate`.
+	endpoint = None  # type: type
+	# The endpoint class whose `method_limit` the requests of the getters count on.
+	
+	retention = None  # type: float
+	# Seconds after their `time` entries are purged by the maintenance, None keeps them.
+	maintenance_batch_size = 1000
+	maintenance_vacuum_pages = 2048
+	# Entries purged and pages given back per transaction by the maintenance.
+	maintenance = None  # type: SQLiteMaintenance
+	# Set by `start_maintenance`.
+	
+	migrate_duplicates = False
+	# If `init_database` deletes the duplicate entries of a key, keeping the one written last, to add
+	# the unique constraint on the keys to a table created before it, see `migrate_keys`.
+	
+	memory_max_bytes = 64 * 1024 ** 2
+	# Bytes the in-process tier of the cache keeps at most, 0 disables it, see `SQLiteMemory`.
+	
+	connector = None  # type: SQLiteConnector
+	# Opens a connection per thread, set by `init_database` with a path.
+	storage = None  # type: AsyncStorage
+	# Runs the *_async methods off the event loop, set by `AsyncStorage.init_database`.
 	
 	@classmethod
 	def set_logger_level(cls, level: int):
@@ -202,8 +1404,8 @@ class SQLite:
 
 		"""
 		args_names, keys_names = cls.get_names()
-		args_names = [arg.lower for arg in args_names]
-		keys_names = [key.lower for key in keys_names]
+		args_names = [arg.lower() for arg in args_names]
+		keys_names = [key.lower() for key in keys_names]
 		if name.lower() in args_names or name.lower() in keys_names:
 			return cls.Ascending(query="{} ASC".format(name))
 		raise ValueError("Name not recognized.")
@@ -231,8 +1433,8 @@ class SQLite:
 
 		"""
 		args_names, keys_names = cls.get_names()
-		args_names = [arg.lower for arg in args_names]
-		keys_names = [key.lower for key in keys_names]
+		args_names = [arg.lower() for arg in args_names]
+		keys_names = [key.lower() for key in keys_names]
 		if name.lower() in args_names or name.lower() in keys_names:
 			return cls.Descending(query="{} DESC".format(name))
 		raise ValueError("Name not recognized.")
@@ -240,7 +1442,17 @@ class SQLite:
 	@classmethod
 	def commit(cls):
 		"""Commits the recent journal to the database."""
-		cls.conn.commit()
+		cls.connection().commit()
+
+	@classmethod
+	def connection(cls)->sqlite3.Connection:
+		"""Returns the connection of the running storage thread, the thread's one of `connector` or `conn`."""
+		conn = getattr(local, "conn", None)
+		if conn is not None:
+			return conn
+		if cls.connector is not None:
+			return cls.connector.connection()
+		return cls.conn
 
 	@classmethod
 	def get_names(cls)->typing.Tuple[typing.List[str], typing.List[str]]:
@@ -249,6 +1461,31 @@ class SQLite:
 		keys_names = cls.variable_names.keys()
 
 		return args_names, keys_names
+
+	@classmethod
+	def get_queries(cls)->'SQLiteQueries':
+		"""Returns the statements of the class, built on first use."""
+		queries = cls.__dict__.get("_queries")
+		if queries is None:
+			args_names, keys_names = cls.get_names()
+			queries = SQLiteQueries(
+				table_name=cls.table_name or cls.__name__, args_names=args_names, keys_names=keys_names)
+			cls._queries = queries
+		return queries
+
+	@classmethod
+	def cursor(cls)->sqlite3.Cursor:
+		"""Returns the cursor kept for `connection()`, a new one is only opened when the connection changes."""
+		conn = cls.connection()
+		cursors = getattr(local, "cursors", None)
+		if cursors is None:
+			cursors = local.cursors = {}
+		
+		cursor = cursors.get(cls)
+		if cursor is None or cursor.connection is not conn:
+			cursor = conn.cursor()
+			cursors[cls] = cursor
+		return cursor
 	
 	def prepare_value(self, value: typing.Union[list, dict, object])->typing.Union[list, dict, object]:
 		"""Prepares a value for writing.
@@ -287,27 +1524,47 @@ class SQLite:
 			tuple(list, list, list, list)
 
 		"""
-		args_names, keys_names = self.__class__.get_names()
-		
+		queries = self.__class__.get_queries()
+		nested = self.variable_names.nested
+		codec = AAshe.utils.serialization.get_codec(self.codec)
+
 		args = list()
-		for arg in args_names:
-			value = self.prepare_value(value=getattr(self, arg, None))
-			if isinstance(getattr(self, arg, None), list) or \
-				isinstance(getattr(self, arg, None), dict) or \
-				isinstance(getattr(self, arg, None), SQLiteSubClass):
-				value = json.dumps(value)
+		for arg in queries.args_names:
+			lazy = getattr(self.__class__, arg, None)
+			if isinstance(lazy, SQLiteLazy) and lazy.is_raw(self):
+				args.append(getattr(self, lazy.slot).data)
+				continue
+
+			value = getattr(self, arg, None)
+			if arg in nested:
+				value = None if value is None else codec.encode(self.prepare_value(value=value))
+			elif isinstance(value, (list, dict, SQLiteSubClass)):
+				value = json.dumps(self.prepare_value(value=value))
 			args.append(value)
 
+		return list(queries.args_names), args, list(queries.keys_names), self.get_keys()
+
+	def get_keys(self)->typing.List[object]:
+		"""Returns the values of the keys, as `get_values` does without encoding the other columns."""
 		keys = list()
-		for key in keys_names:
-			value = self.prepare_value(value=getattr(self, key, None))
-			if isinstance(getattr(self, key, None), list) or \
-				isinstance(getattr(self, key, None), dict) or \
-				isinstance(getattr(self, key, None), SQLiteSubClass):
-				value = json.dumps(value)
+		for key in self.__class__.get_queries().keys_names:
+			value = getattr(self, key, None)
+			if isinstance(value, (list, dict, SQLiteSubClass)):
+				value = json.dumps(self.prepare_value(value=value))
 			keys.append(value)
+		return keys
 
-		return args_names, args, keys_names, keys
+	@classmethod
+	def read_value(cls, name: str, value: object)->object:
+		"""Returns what the column `name` read as `value` is set to.
+		
+		Nested columns are decoded, or kept as they are for a `SQLiteLazy` attribute.
+		"""
+		if name not in cls.variable_names.nested:
+			return value
+		if isinstance(getattr(cls, name, None), SQLiteLazy):
+			return SQLiteLazy.Raw(value)
+		return AAshe.utils.serialization.decode(value)
 
 	def read_data(self, **kwargs):
 		"""Reads data from the database assuming keys are set if they are in use.
@@ -331,21 +1588,19 @@ class SQLite:
 				keys_names.append(key)
 				keys.append(kwargs.get(key))
 
-		query = "SELECT {} FROM {}".format(", ".join(args_names), self.table_name or self.__class__.__name__)
+		query = self.get_queries().select(
+			names=tuple(args_names), conditions=tuple([(key_name, None) for key_name in keys_names]))
 
-		if keys_names:
-
-			query += " WHERE {}".format(" AND ".join([key_name + "=(?)" for key_name in keys_names]))
-		
-		self.logger.debug(msg="-> QUERY : {} , {}".format(query, keys))
-		self.conn.cursor().execute(query, keys)
+		self.logger.debug("-> QUERY : %s , %s", query, keys)
+		cursor = self.cursor()
+		cursor.execute(query, keys)
 
-		data = self.conn.cursor().fetchone()
+		data = cursor.fetchone()
 
 		if data:
-			self.logger.debug(msg="-> DATA {}".format(data))
+			self.logger.debug("-> DATA %s", data)
 			for i, name in enumerate(args_names):
-				setattr(self, name, data[i])
+				setattr(self, name, self.read_value(name=name, value=data[i]))
 
 			return True
 
@@ -355,6 +1610,74 @@ class SQLite:
 
 			return False
 
+	@classmethod
+	def select_conditions(cls, **kwargs)->typing.Tuple[tuple, typing.List[object]]:
+		"""Returns the `(name, count)` conditions of `SQLiteQueries.where` and their arguments for `kwargs`."""
+		conditions = []
+		args = []
+		for key_name, value in kwargs.items():
+			if isinstance(value, (list, tuple, set, frozenset)):
+				conditions.append((key_name, len(value)))
+				args.extend(value)
+			else:
+				conditions.append((key_name, None))
+				args.append(value)
+		return tuple(conditions), args
+
+	@classmethod
+	def select_query(
+			cls,
+			order_by: typing.List['SQLite.Order']=None,
+			limit: int=None, **kwargs)->typing.Tuple[str, typing.List[object]]:
+		"""Returns the statement and arguments `read_all_data` runs for the same arguments.
+
+		Raises:
+			ValueError: If `order_by` isn't a list of orders.
+		"""
+		queries = cls.get_queries()
+		conditions, args = cls.select_conditions(**kwargs)
+
+		query = queries.select(
+			names=queries.names,
+			conditions=conditions,
+			order_by=cls.order_queries(order_by),
+			limit=limit)
+
+		return query, args
+
+	@classmethod
+	def order_queries(cls, order_by: typing.List['SQLite.Order']=None)->typing.Tuple[str]:
+		"""Returns the ORDER BY terms of `order_by`.
+
+		Raises:
+			ValueError: If `order_by` isn't a list of orders.
+		"""
+		if order_by:
+			
+			if not isinstance(order_by, list):
+				raise ValueError("order_by type must be list.")
+			
+			for order in order_by:
+				if not isinstance(order, cls.Order):
+					raise ValueError(f"Incorrect value was passed to into order_by. ({order_by})")
+
+		return tuple([order.query for order in order_by or ()])
+
+	@classmethod
+	def query_plan(
+			cls,
+			order_by: typing.List['SQLite.Order']=None,
+			limit: int=None, **kwargs)->typing.List[str]:
+		"""Returns the EXPLAIN QUERY PLAN of `read_all_data` for the same arguments.
+
+		A line starting with "SCAN" means every entry of the table is read.
+
+		Returns:
+			list: The details of the plan, e.g. "SEARCH aashe_matches USING INDEX ...".
+		"""
+		query, args = cls.select_query(order_by=order_by, limit=limit, **kwargs)
+		return [row[-1] for row in cls.cursor().execute("EXPLAIN QUERY PLAN " + query, args).fetchall()]
+
 	@classmethod
 	def read_all_data(
 			cls,
@@ -365,106 +1688,677 @@ class SQLite:
 		Args:
 			order_by(list): Specifies how the results should be ordered.
 			limit(int): Limit how many entries should be returned.
-			**kwargs: Specifies certain values the result must have.
+			**kwargs: Specifies certain values the result must have, a list,
+				tuple or set matches any of its values.
 		"""
+		batch = cls.get_batch()
+		if batch is not None:
+			batch.flush()
+
+		query, args = cls.select_query(order_by=order_by, limit=limit, **kwargs)
+
+		cls.logger.debug("-> QUERY : %s , %s", query, args)
+		cursor = cls.cursor()
+		cursor.execute(query, args)
+
+		return cls.read_rows(cursor.fetchall())
+
+	@classmethod
+	def read_rows(cls, data: typing.List[tuple])->typing.List['SQLite']:
+		"""Returns the objects of rows holding every column, in the order of `SQLiteQueries.names`."""
+		queries = cls.get_queries()
+		entries = list()
+		nested = {i for i, arg in enumerate(queries.names) if arg in cls.variable_names.nested}
+
+		for entry in data:
+			_object = cls()
+			for i, arg in enumerate(queries.names):
+				setattr(_object, arg, cls.read_value(name=arg, value=entry[i]) if i in nested else entry[i])
+			entries.append(_object)
+		return entries
+
+	@classmethod
+	def get_relation(cls, relation: typing.Union[str, SQLiteRelation])->SQLiteRelation:
+		"""Returns the relation of `relations` that is `relation`, or has it as its table name.
+
+		Raises:
+			ValueError: If the class has no such relation.
+		"""
+		for declared in cls.relations:
+			if declared is relation or declared.table_name == relation:
+				return declared
+		raise ValueError(f"{relation} isn't one of the relations of {cls.__name__}.")
+
+	@classmethod
+	def related_query(
+			cls,
+			relation: typing.Union[str, SQLiteRelation],
+			order_by: typing.List['SQLite.Order']=None,
+			limit: int=None, **kwargs)->typing.Tuple[str, typing.List[object]]:
+		"""Returns the statement and arguments `read_related` runs for the same arguments."""
+		relation = cls.get_relation(relation)
+		entries, related = relation.split(kwargs)
+		conditions, args = cls.select_conditions(**entries)
+		related_conditions, related_args = cls.select_conditions(**related)
+
+		query = relation.select_entries(
+			queries=cls.get_queries(),
+			conditions=conditions,
+			related=related_conditions,
+			order_by=cls.order_queries(order_by),
+			limit=limit)
+
+		return query, args + related_args
+
+	@classmethod
+	def read_related(
+			cls,
+			relation: typing.Union[str, SQLiteRelation],
+			order_by: typing.List['SQLite.Order']=None,
+			limit: int=None, **kwargs)->['SQLite']:
+		"""Reads the entries with a row of `relation` matching the filters.
 		
-		args_names, keys_names = cls.get_names()
-		args_names.extend(keys_names)
+		The filters on the columns of the relation select its rows, the other
+		ones the entries, both in SQL with the indexes of their table.
+		
+		Args:
+			relation(str, SQLiteRelation): One of `relations`, or its table name.
+			order_by(list): Specifies how the results should be ordered.
+			limit(int): Limit how many entries should be returned.
+			**kwargs: Specifies certain values the entries or their rows must
+				have, a list, tuple or set matches any of its values.
+		
+		Example:
+			>>> Match.read_related("match_participants", championId=157, win=True, queueId=420)
+		"""
+		batch = cls.get_batch()
+		if batch is not None:
+			batch.flush()
+
+		query, args = cls.related_query(relation, order_by=order_by, limit=limit, **kwargs)
 
-		query = "SELECT {} FROM {}".format(", ".join(args_names), cls.table_name or cls.__name__)
+		cls.logger.debug("-> QUERY : %s , %s", query, args)
+		return cls.read_rows(cls.cursor().execute(query, args).fetchall())
+
+	@classmethod
+	def read_relation(
+			cls,
+			relation: typing.Union[str, SQLiteRelation],
+			limit: int=None, **kwargs)->typing.List[dict]:
+		"""Reads the rows of `relation` matching the filters, without reading the entries.
+		
+		Filters on the keys and the columns of the relation are applied to its
+		rows, the table of the entries is only joined for filters on their other columns.
 		
-		args = None
+		Args:
+			relation(str, SQLiteRelation): One of `relations`, or its table name.
+			limit(int): Limit how many rows should be returned.
+			**kwargs: Specifies certain values the rows or their entries must
+				have, a list, tuple or set matches any of its values.
+		
+		Returns:
+			list: The rows, dicts of the keys and columns of the relation.
 		
-		if kwargs:
+		Example:
+			>>> rows = Match.read_relation("match_participants", championId=157, queueId=420)
+			>>> sum([row["win"] for row in rows]) / len(rows)
+		"""
+		batch = cls.get_batch()
+		if batch is not None:
+			batch.flush()
+
+		relation = cls.get_relation(relation)
+		queries = cls.get_queries()
+		entries, related = relation.split(kwargs)
+		related_conditions, related_args = cls.select_conditions(**related)
+		keys_conditions, keys_args = cls.select_conditions(
+			**{name: value for name, value in entries.items() if name in queries.keys_names})
+		conditions, args = cls.select_conditions(
+			**{name: value for name, value in entries.items() if name not in queries.keys_names})
+
+		query = relation.select_rows(
+			queries=queries, related=related_conditions, keys=keys_conditions, conditions=conditions, limit=limit)
+		args = related_args + keys_args + args
+
+		cls.logger.debug("-> QUERY : %s , %s", query, args)
+		names = queries.keys_names + relation.names
+		return [dict(zip(names, row)) for row in cls.cursor().execute(query, args).fetchall()]
 
-			query += " WHERE {}".format(" AND ".join([key_name + "=(?)" for key_name in list(kwargs.keys())]))
-			args = list(kwargs.values())
+	@classmethod
+	def write_relations(cls, chunk_size: int=None, commit: bool=True, **kwargs)->int:
+		"""Writes the rows of `relations` again for the entries matching `kwargs`.
 		
-		if order_by:
-			
-			if not isinstance(order_by, list):
-				raise ValueError("order_by type must be list.")
-			
-			for order in order_by:
-				if not isinstance(order, cls.Order):
-					raise ValueError(f"Incorrect value was passed to into order_by. ({order_by})")
-			
-			query += " ORDER BY {}".format(", ".join([order.query for order in order_by]))
+		Entries written before a relation was declared have no rows in it until then.
 		
-		if limit:
-			query += " LIMIT {}".format(limit)
+		Args:
+			chunk_size(int): Entries read and written at once, see `iter_data`.
+			commit(bool): Commit the journal to the database when finished.
+			**kwargs: Specifies certain values the entries must have, like `read_all_data`.
+		
+		Returns:
+			int: The amount of entries.
+		"""
+		count = 0
+		for entries in cls.iter_data(chunk_size=chunk_size, **kwargs):
+			for relation in cls.relations:
+				relation.write(cls=cls, objects=entries)
+			count += len(entries)
+		if commit:
+			cls.commit()
+		return count
 
-		if kwargs:
-			cls.logger.debug(msg="-> QUERY : {} , {}".format(query, args))
-			cls.conn.cursor().execute(query, args)
+	@classmethod
+	def iter_data(cls, chunk_size: int=None, **kwargs)->typing.Iterator[typing.List['SQLite']]:
+		"""Reads the entries matching `kwargs` in chunks, holding on to one chunk at a time.
+		
+		The chunks follow the rowid, each one is read with a query starting after
+		the last rowid of the one before, so reading the whole table stays as
+		cheap at the end as at the start.
+		
+		Args:
+			chunk_size(int): Entries per chunk, None uses `AAshe.utils.bulk.chunk_size`.
+			**kwargs: Specifies certain values the result must have, like `read_all_data`.
+		
+		Returns:
+			typing.Iterator: The entries, a list per chunk.
+		"""
+		queries = cls.get_queries()
+
+		batch = cls.get_batch()
+		if batch is not None:
+			batch.flush()
+
+		conditions, args = cls.select_conditions(**kwargs)
+		query = queries.chunk(conditions=conditions, size=chunk_size or AAshe.utils.bulk.chunk_size)
+		last = -2 ** 63
+		while True:
+			cls.logger.debug("-> QUERY : %s , %s", query, args + [last])
+			data = cls.cursor().execute(query, args + [last]).fetchall()
+			if not data:
+				return
+			last = data[-1][0]
+			yield cls.read_rows([entry[1:] for entry in data])
 
-		else:
-			cls.logger.debug(msg="-> QUERY : {}".format(query))
-			cls.conn.cursor().execute(query)
+	@classmethod
+	def stale_max_age(cls)->float:
+		"""Returns the seconds an entry is returned for, stale or not."""
+		return cls.request_cooldown + cls.stale_while_revalidate
+
+	@classmethod
+	def is_stale(cls, _object: 'SQLite')->bool:
+		"""Returns if `_object` is older than `request_cooldown`, and should be requested again."""
+		return time.time() - _object.time >= cls.request_cooldown
+
+	@classmethod
+	def request_delay(cls, region: str)->float:
+		"""Returns the seconds a request of the getters to `region` would wait for the rate limits now."""
+		limits = [AAshe.utils.ratelimit.RateLimit.key_limit, getattr(cls.endpoint, "method_limit", None)]
+		return max([limit.delay(region=region) for limit in limits if limit is not None], default=0.0)
 
-		data = cls.conn.cursor().fetchall()
+	@classmethod
+	async def fetch_once(cls, lookup: dict, func: typing.Callable, *args, **kwargs)->object:
+		"""Awaits `func(*args, **kwargs)`, which requests, builds and writes the entry of `lookup`.
 		
-		if data:
-			entries = list()
+		The callers fetching the same entry at the same time share the call, and
+		get the same object, the entry is built and written once.
+		
+		Args:
+			lookup(dict): The values the entry is read by, with its region.
+			func(typing.Callable): Coroutine function requesting, building and writing the entry, like `Match.load_match`.
 
-			for entry in data:
-				_object = cls()
-				for i, arg in enumerate(args_names):
-					setattr(_object, arg, entry[i])
-				entries.append(_object)
-			return entries
-		return []
+		Returns:
+			object: The result of the shared call.
+		"""
+		return await fetches.do((cls.__name__, SQLiteMemory.key(lookup)), func, *args, **kwargs)
 
-	def write_data(self, commit: bool=True)->bool:
-		"""Writes to the database, or updates the entry with the the same keys.
+	@classmethod
+	def revalidate(cls, lookup: dict, func: typing.Callable, *args, **kwargs)->bool:
+		"""Requests the stale entry of `lookup` again in the background with `func(*args, **kwargs)`.
+		
+		Only one request of an entry is in flight at a time. None is started while
+		a request to the region would wait for the rate limits, the stale entry
+		is returned until there is room for one.
 		
 		Args:
-			commit(bool): If it should commit the journal to the database when finished.
+			lookup(dict): The values the entry was read by, with its region.
+			func(typing.Callable): Coroutine function requesting and writing the entry, like `fetch_summoner`.
 
 		Returns:
-			bool: If it managed to write it.
+			bool: If a request of the entry is in flight.
 		"""
-		args_names, args, keys_names, keys = self.get_values()
+		key = (cls.__name__, SQLiteMemory.key(lookup))
+		if key in refreshes.calls:
+			return True
 
-		query = "SELECT * FROM {}".format(self.table_name or self.__class__.__name__)
+		delay = cls.request_delay(region=lookup["region"])
+		if delay > 0:
+			cls.debug(msg=f"Not refreshing {cls.__name__}{lookup}, the rate limits are {delay:.2f}s ahead.")
+			return False
 
-		if keys_names:
-			query += " WHERE {}".format(" AND ".join([key_name + "=(?)" for key_name in keys_names]))
+		task = refreshes.start(key, func, *args, **kwargs)
+		task.add_done_callback(functools.partial(cls.revalidated, lookup))
+		return True
+
+	@classmethod
+	def revalidated(cls, lookup: dict, task: asyncio.Future)->None:
+		if not task.cancelled() and task.exception() is not None:
+			cls.warning(msg=f"Refreshing {cls.__name__}{lookup} failed: {task.exception()!r}")
+
+	@classmethod
+	def get_memory(cls)->typing.Union['SQLiteMemory', None]:
+		"""Returns the in-process tier of the cache of the class, None if it's disabled."""
+		memory = cls.__dict__.get("_memory")
+		if memory is None and cls.memory_max_bytes:
+			memory = cls._memory = SQLiteMemory(cls=cls, max_bytes=cls.memory_max_bytes)
+		return memory
+
+	@classmethod
+	def recall(cls, max_age: float=None, **lookup)->typing.Union['SQLite', None]:
+		"""Returns the entry kept in memory for `lookup`, if it's still valid.
 		
-		self.logger.debug(msg="-> QUERY : {} , {}".format(query, keys))
-		self.conn.cursor().execute(query, keys)
+		Args:
+			max_age(float): Seconds an entry is valid for, None is `request_cooldown`.
+			**lookup: The values the entry was remembered by, like the arguments of `read_all_data`.
+		"""
+		memory = cls.get_memory()
+		if memory is None:
+			return None
+		return memory.get(lookup=lookup, max_age=cls.request_cooldown if max_age is None else max_age)
 
-		if self.conn.cursor().fetchone():
+	@classmethod
+	def remember(cls, _object: 'SQLite', **lookup)->None:
+		"""Keeps `_object` in memory as the entry for `lookup`, see `recall`."""
+		memory = cls.get_memory()
+		if memory is not None and _object is not None:
+			memory.put(lookup=lookup, _object=_object)
+
+	def memory_size(self)->int:
+		"""Estimates the bytes the entry takes, lazy attributes that weren't built by the column they hold."""
+		size = sys.getsizeof(self)
+		for name in self.get_queries().names:
+			lazy = getattr(self.__class__, name, None)
+			if isinstance(lazy, SQLiteLazy) and lazy.is_raw(self):
+				size += sizeof(getattr(self, lazy.slot).data)
+			else:
+				size += sizeof(getattr(self, name, None))
+		return size
 
-			query = "UPDATE {} SET {}".format(
-				self.table_name or self.__class__.__name__,
-				", ".join([args_name + "=(?)" for args_name in args_names]))
+	@classmethod
+	def recall_keys(
+			cls,
+			key_name: str,
+			keys: typing.List[object],
+			max_age: float,
+			kwargs: dict)->typing.Tuple[typing.Dict[object, 'SQLite'], typing.List[object]]:
+		"""Returns the entries of `keys` kept in memory by their key, and the keys that weren't."""
+		memory = cls.get_memory()
+		if memory is None:
+			return {}, list(keys)
+
+		entries = {}
+		for key in keys:
+			_object = memory.get(lookup=dict(kwargs, **{key_name: key}), max_age=max_age)
+			if _object is not None:
+				entries[key] = _object
+		return entries, [key for key in keys if key not in entries]
 
-			if keys_names:
-				query += " WHERE {}".format(" AND ".join([key_name + "=(?)" for key_name in keys_names]))
+	@classmethod
+	def remember_keys(cls, key_name: str, entries: typing.Dict[object, 'SQLite'], kwargs: dict)->None:
+		memory = cls.get_memory()
+		if memory is not None:
+			for key, _object in entries.items():
+				memory.put(lookup=dict(kwargs, **{key_name: key}), _object=_object)
 
-			args.extend(keys)
+	@classmethod
+	def read_cached(
+			cls,
+			key_name: str,
+			keys: typing.List[object],
+			max_age: float,
+			**kwargs)->typing.Dict[object, 'SQLite']:
+		"""Reads the newest entry of each key in `keys` with one query.
 
-			self.logger.debug(msg=f"-> QUERY : {query} , {args}")
-			self.conn.cursor().execute(query, args)
+		The entries kept in memory aren't read, and the ones read are kept, see
+		`recall`. Entries older than `max_age` seconds are deleted, like the single
+		getters do.
 
-		else:
+		Args:
+			key_name(str): The variable name `keys` are values of.
+			keys(list): The keys to read, see `AAshe.utils.bulk.chunk_size`.
+			max_age(float): Seconds an entry is valid for, usually `request_cooldown`.
+			**kwargs: Specifies certain values the result must have.
 
-			args_names.extend(keys_names)
-			args.extend(keys)
+		Returns:
+			dict: The entries that are still valid by their key.
+		"""
+		entries, keys = cls.recall_keys(key_name=key_name, keys=keys, max_age=max_age, kwargs=kwargs)
+		if not keys:
+			return entries
+
+		data = cls.read_all_data(**dict(kwargs, **{key_name: keys}))
+		found, expired = cls.split_expired(data=data, key_name=key_name, max_age=max_age)
+		cls.remember_keys(key_name=key_name, entries=found, kwargs=kwargs)
+
+		if expired:
+			cls.bulk_delete(expired)
+
+		entries.update(found)
+		return entries
+
+	@classmethod
+	def split_expired(
+			cls,
+			data: typing.List['SQLite'],
+			key_name: str,
+			max_age: float)->typing.Tuple[typing.Dict[object, 'SQLite'], typing.List['SQLite']]:
+		"""Splits entries into the valid one per key and the expired ones, the first valid entry of a key wins."""
+		entries = {}
+		expired = []
+		now = time.time()
+
+		for entry in data:
+			key = getattr(entry, key_name)
+			if now - entry.time < max_age:
+				entries.setdefault(key, entry)
+			elif key not in entries:
+				expired.append(entry)
+
+		return entries, expired
 
-			query = "INSERT INTO {}({}) VALUES ({})".format(
-				self.table_name or self.__class__.__name__, ", ".join(args_names),
-				", ".join(["?" for _ in args_names]))
+	@classmethod
+	async def read_all_data_async(
+			cls,
+			order_by: typing.List['SQLite.Order']=None,
+			limit: int=None, **kwargs)->['SQLite']:
+		"""`read_all_data` on a reader thread of `storage`, or directly without a storage."""
+		if cls.storage is None:
+			return cls.read_all_data(order_by=order_by, limit=limit, **kwargs)
+		return await cls.storage.read(cls.read_all_data, order_by=order_by, limit=limit, **kwargs)
 
-			self.logger.debug(msg=f"-> QUERY : {query} , {args}")
-			self.conn.cursor().execute(query, args)
+	@classmethod
+	async def read_related_async(
+			cls,
+			relation: typing.Union[str, SQLiteRelation],
+			order_by: typing.List['SQLite.Order']=None,
+			limit: int=None, **kwargs)->['SQLite']:
+		"""`read_related` on a reader thread of `storage`, or directly without a storage."""
+		if cls.storage is None:
+			return cls.read_related(relation, order_by=order_by, limit=limit, **kwargs)
+		return await cls.storage.read(cls.read_related, relation, order_by=order_by, limit=limit, **kwargs)
+
+	@classmethod
+	async def read_relation_async(
+			cls,
+			relation: typing.Union[str, SQLiteRelation],
+			limit: int=None, **kwargs)->typing.List[dict]:
+		"""`read_relation` on a reader thread of `storage`, or directly without a storage."""
+		if cls.storage is None:
+			return cls.read_relation(relation, limit=limit, **kwargs)
+		return await cls.storage.read(cls.read_relation, relation, limit=limit, **kwargs)
+
+	@classmethod
+	async def read_cached_async(
+			cls,
+			key_name: str,
+			keys: typing.List[object],
+			max_age: float,
+			**kwargs)->typing.Dict[object, 'SQLite']:
+		"""`read_cached` with the read on a reader thread and the deletes on the writer thread of `storage`."""
+		if cls.storage is None:
+			return cls.read_cached(key_name=key_name, keys=keys, max_age=max_age, **kwargs)
+
+		entries, keys = cls.recall_keys(key_name=key_name, keys=keys, max_age=max_age, kwargs=kwargs)
+		if not keys:
+			return entries
+
+		data = await cls.read_all_data_async(**dict(kwargs, **{key_name: keys}))
+		found, expired = cls.split_expired(data=data, key_name=key_name, max_age=max_age)
+		cls.remember_keys(key_name=key_name, entries=found, kwargs=kwargs)
+		if expired:
+			await cls.bulk_delete_async(expired)
+
+		entries.update(found)
+		return entries
+
+	async def write_data_async(self, commit: bool=True)->bool:
+		"""`write_data` on the writer thread of `storage`, which commits once its queue is drained."""
+		if self.storage is None:
+			return self.write_data(commit=commit)
+		await self.storage.write(self.execute_write)
+		return True
+
+	async def del_data_async(self, commit: bool=True)->None:
+		"""`del_data` on the writer thread of `storage`, which commits once its queue is drained."""
+		if self.storage is None:
+			return self.del_data(commit=commit)
+		await self.storage.write(self.del_data, commit=False)
+
+	@classmethod
+	async def bulk_delete_async(cls, objects: typing.Iterable['SQLite'])->int:
+		"""`bulk_delete` on the writer thread of `storage`, which commits once its queue is drained."""
+		if cls.storage is None:
+			return cls.bulk_delete(objects)
+		return await cls.storage.write(cls.bulk_delete, list(objects), commit=False)
+
+	@classmethod
+	async def bulk_write_async(cls, objects: typing.Iterable['SQLite'])->int:
+		"""`bulk_write` on the writer thread of `storage`."""
+		if cls.storage is None:
+			return cls.bulk_write(objects)
+		return await cls.storage.write(cls.bulk_write, list(objects), commit=False)
+
+	@classmethod
+	async def commit_async(cls)->None:
+		"""Commits the recent journal, the writer thread of `storage` commits on its own."""
+		if cls.storage is None:
+			cls.commit()
+
+	def write_data(self, commit: bool=True)->bool:
+		"""Writes to the database, or updates the entry with the the same keys.
+		
+		The rows of `relations` are replaced in the same transaction.
+		
+		Args:
+			commit(bool): If it should commit the journal to the database when finished.
+
+		Returns:
+			bool: If it managed to write it.
+		"""
+		batch = self.get_batch()
+		if batch is not None:
+			batch.add(self)
+			return True
+
+		self.execute_write()
 
 		if commit:
 			self.commit()
 
 		return True
 
+	def execute_write(self)->None:
+		"""Executes the statements of `write_data` without committing or batching."""
+		args_names, args, keys_names, keys = self.get_values()
+		queries = self.get_queries()
+		cursor = self.cursor()
+
+		if queries.upsert and upsert_supported and None not in keys:
+			query = queries.upsert
+		else:
+			self.logger.debug("-> QUERY : %s , %s", queries.probe, keys)
+			cursor.execute(queries.probe, keys)
+
+			if cursor.fetchone():
+				query = queries.update
+			else:
+				query = queries.insert
+
+		args.extend(keys)
+
+		if not self.relations:
+			self.logger.debug("-> QUERY : %s , %s", query, args)
+			cursor.execute(query, args)
+			return
+
+		# The rows of a relation are built by its `rows`, which can raise anything,
+		# the entry is only written along with them.
+		conn = self.connection()
+		if not conn.in_transaction:
+			conn.execute("BEGIN")
+		conn.execute("SAVEPOINT aashe_entry")
+		try:
+			self.logger.debug("-> QUERY : %s , %s", query, args)
+			cursor.execute(query, args)
+			for relation in self.relations:
+				relation.write(cls=self.__class__, objects=[self])
+		except BaseException:
+			conn.execute("ROLLBACK TO aashe_entry")
+			conn.execute("RELEASE aashe_entry")
+			raise
+		conn.execute("RELEASE aashe_entry")
+
+	@classmethod
+	def bulk_write(cls, objects: typing.Iterable['SQLite'], commit: bool=True)->int:
+		"""Writes several objects with one `executemany`, updating entries with the same keys.
+		
+		The objects are written in a savepoint with the rows of `relations`. If
+		that fails, it's rolled back and the objects are written one by one, each
+		in a savepoint of its own like `write_data`, so an object that fails
+		doesn't take the others or the writes pending on the connection with it.
+		
+		Args:
+			objects(typing.Iterable): Objects of this class.
+			commit(bool): Commit the journal to the database when finished.
+		
+		Returns:
+			int: The amount of objects written.
+		
+		Raises:
+			Exception: The first exception of the objects that failed, once the
+				others are written, with the failed objects as its `objects`.
+		"""
+		objects = list(objects)
+		if not objects:
+			return 0
+		
+		queries = cls.get_queries()
+		if queries.upsert and upsert_supported:
+			conn = cls.connection()
+			if not conn.in_transaction:
+				conn.execute("BEGIN")
+			conn.execute("SAVEPOINT aashe_bulk")
+			try:
+				cls.execute_bulk_write(objects)
+			except Exception as exception:
+				conn.execute("ROLLBACK TO aashe_bulk")
+				conn.execute("RELEASE aashe_bulk")
+				if isinstance(exception, sqlite3.OperationalError):
+					# The database is locked or the like, it fails for every object.
+					exception.objects = objects
+					raise
+				cls.logger.debug(msg=f"Writing {len(objects)} objects at once failed, {exception!r}")
+			else:
+				conn.execute("RELEASE aashe_bulk")
+				if commit:
+					cls.commit()
+				return len(objects)
+		
+		failed = []
+		exceptions = []
+		for _object in objects:
+			try:
+				_object.execute_write()
+			except Exception as exception:
+				failed.append(_object)
+				exceptions.append(exception)
+		
+		if commit:
+			cls.commit()
+		
+		if exceptions:
+			exceptions[0].objects = failed
+			raise exceptions[0]
+		return len(objects)
+	
+	@classmethod
+	def execute_bulk_write(cls, objects: typing.List['SQLite'])->None:
+		"""Executes the statements of `bulk_write` at once, without a savepoint or committing."""
+		queries = cls.get_queries()
+		rows = []
+		upserted = []
+		null_keys = []
+		for _object in objects:
+			args_names, args, keys_names, keys = _object.get_values()
+			if None in keys:
+				null_keys.append(_object)
+				continue
+			args.extend(keys)
+			rows.append(args)
+			upserted.append(_object)
+		
+		cls.logger.debug("-> QUERY : %s , %s rows", queries.upsert, len(rows))
+		cls.cursor().executemany(queries.upsert, rows)
+		# The rows of a relation are built by its `rows`, which can raise anything.
+		for relation in cls.relations:
+			relation.write(cls=cls, objects=upserted)
+		# A NULL key doesn't conflict, these are looked up one by one.
+		for _object in null_keys:
+			_object.execute_write()
+	
+	@classmethod
+	def new_batch(cls, flush_size: int=None, flush_interval: float=None)->'SQLiteBatch':
+		"""Returns a batch of this class, not in use yet, see `SQLiteBatch.use`.
+		
+		Args:
+			flush_size(int): Objects buffered at most, None uses `batch_flush_size`.
+			flush_interval(float): Seconds an object is buffered at most, None uses `batch_flush_interval`.
+		"""
+		return SQLiteBatch(
+			cls=cls,
+			flush_size=flush_size or cls.batch_flush_size,
+			flush_interval=flush_interval if flush_interval is not None else cls.batch_flush_interval)
+	
+	@classmethod
+	def get_batch(cls)->typing.Optional['SQLiteBatch']:
+		"""Returns the batch the writes of this class are buffered in, in the current context."""
+		return batches.get().get(cls)
+	
+	@classmethod
+	@contextlib.contextmanager
+	def batch(cls, flush_size: int=None, flush_interval: float=None)->typing.Iterator['SQLiteBatch']:
+		"""Buffers `write_data` of this class and writes the buffer with `bulk_write`.
+		
+		The buffer is written once it holds `flush_size` objects, `flush_interval`
+		seconds after the first object was buffered, before every read of the
+		class and when the context exits. Nested calls share the outermost batch.
+		
+		Only the writes of the current context are buffered, the ones of the
+		task that entered it and of the tasks started within it.
+		
+		Args:
+			flush_size(int): Objects buffered at most, None uses `batch_flush_size`.
+			flush_interval(float): Seconds an object is buffered at most, None uses `batch_flush_interval`.
+		
+		Returns:
+			typing.Iterator: The batch, within the context.
+		
+		Example:
+			with Match.batch(flush_size=1000):
+				for game in games:
+					game.write_data()
+		"""
+		batch = cls.get_batch()
+		if batch is not None:
+			yield batch
+			return
+		
+		batch = cls.new_batch(flush_size=flush_size, flush_interval=flush_interval)
+		try:
+			with batch.use():
+				yield batch
+		finally:
+			batch.close()
+
 	def insert_data(self, commit=True, abort_if_key_are_none=False)->bool:
 		"""Inserts
 		
@@ -484,15 +2378,12 @@ class SQLite:
 					self.logger.warning(msg=f"Aborted insertion due to {keys_names[i]} being None.")
 					return False
 
-		args_names.extend(keys_names)
 		args.extend(keys)
 
-		query = "INSERT INTO {}({}) VALUES ({})".format(
-			self.table_name or self.__class__.__name__,
-			", ".join(args_names),  ", ".join(["?" for _ in args_names]))
+		query = self.get_queries().insert
 
-		self.logger.debug(msg=f"-> QUERY : {query} , {args}")
-		self.conn.cursor().execute(query, args)
+		self.logger.debug("-> QUERY : %s , %s", query, args)
+		self.cursor().execute(query, args)
 
 		if commit:
 			self.commit()
@@ -500,7 +2391,10 @@ class SQLite:
 		return True
 
 	def del_data(self, commit=True)->None:
-		"""Deletes the entries that matches ALL attributes of the current instance.
+		"""Deletes the entry of the current instance, found by its keys.
+		
+		Only the entry written at the `time` of the instance is deleted, for a
+		class with a time column. Without keys ALL attributes have to match.
 		
 		Args:
 			commit(bool): Commit the journal to the database when finished.
@@ -509,21 +2403,72 @@ class SQLite:
 			None
 			
 		"""
-		args_names, args, keys_names, keys = self.get_values()
-
-		args_names.extend(keys_names)
-		args.extend(keys)
+		queries = self.get_queries()
+		if queries.keys_names:
+			args = self.get_keys()
+			if "time" in queries.delete_names:
+				args.append(getattr(self, "time", None))
+		else:
+			args_names, args, keys_names, keys = self.get_values()
+			args.extend(keys)
 
-		query = "DELETE FROM {} WHERE {}".format(
-			self.table_name or self.__class__.__name__,
-			" AND ".join([arg_name + "=(?)" for arg_name in args_names]))
+		query = queries.delete
 
-		self.logger.debug(msg=f"-> QUERY : {query}, {args}")
-		self.conn.cursor().execute(query, args)
+		self.logger.debug("-> QUERY : %s, %s", query, args)
+		self.cursor().execute(query, args)
 
 		if commit:
 			self.commit()
 
+	@classmethod
+	def bulk_delete(cls, objects: typing.Iterable['SQLite'], commit: bool=True)->int:
+		"""Deletes the entries of several objects, like `del_data` does for each of them.
+		
+		The objects are grouped by all keys but the first and deleted with one
+		`delete_many` statement per `AAshe.utils.bulk.chunk_size` of them. Objects
+		with a key of None, and every object of a class without keys, are deleted
+		one by one.
+		
+		Args:
+			objects(typing.Iterable): Objects of this class.
+			commit(bool): Commit the journal to the database when finished.
+		
+		Returns:
+			int: The amount of entries deleted.
+		"""
+		queries = cls.get_queries()
+		batch = cls.get_batch()
+		if batch is not None:
+			batch.flush()
+		
+		cursor = cls.cursor()
+		deleted = 0
+		groups = collections.defaultdict(list)
+		for _object in objects:
+			keys = _object.get_keys()
+			if not keys or None in keys:
+				_object.del_data(commit=False)
+				deleted += cursor.rowcount
+			else:
+				groups[tuple(keys[1:])].append((keys[0], getattr(_object, "time", None)))
+		
+		for rest, entries in groups.items():
+			for chunk in AAshe.utils.bulk.chunks(entries):
+				args = [key for key, _ in chunk]
+				args.extend(rest)
+				if "time" in queries.delete_names:
+					args.append(max([written or 0.0 for _, written in chunk]))
+				
+				query = queries.delete_many(count=len(chunk))
+				cls.logger.debug("-> QUERY : %s , %s keys", query, len(chunk))
+				cursor.execute(query, args)
+				deleted += cursor.rowcount
+		
+		if commit:
+			cls.commit()
+		
+		return deleted
+
 	def print_data(self)->None:
 		"""Prints all the data from the instance.
 		
@@ -553,38 +2498,218 @@ class SQLite:
 		create_names.extend([f"{entry} REAL" for entry in cls.variable_names.real])
 		create_names.extend([f"{entry} TEXT" for entry in cls.variable_names.text])
 		create_names.extend([f"{entry} BLOB" for entry in cls.variable_names.blob])
+		column_type = AAshe.utils.serialization.get_codec(cls.codec).column_type
+		create_names.extend([f"{entry} {column_type}" for entry in cls.variable_names.nested])
 		
 		create_names.extend([f"{entry} NULL" for entry in cls.variable_names.null_key])
 		create_names.extend([f"{entry} INTEGER" for entry in cls.variable_names.integer_key])
 		create_names.extend([f"{entry} REAL" for entry in cls.variable_names.real_key])
 		create_names.extend([f"{entry} TEXT" for entry in cls.variable_names.text_key])
 		create_names.extend([f"{entry} BLOB" for entry in cls.variable_names.blob_key])
+		
+		keys_names = cls.variable_names.keys()
+		if keys_names:
+			create_names.append("UNIQUE({})".format(", ".join(keys_names)))
 	
 		query = "CREATE TABLE IF NOT EXISTS {}({})".format(cls.table_name or cls.__name__, ", ".join(create_names))
 
 		return query
 
 	@classmethod
-	def init_database(cls, conn: sqlite3.Connection, commit:bool =True)->None:
+	def create_indexes(cls)->typing.List[str]:
+		"""Returns the queries for creating the indexes declared in `indexes`."""
+		table_name = cls.table_name or cls.__name__
+		queries = []
+		indexes = list(cls.indexes)
+		if cls.retention is not None:
+			# Purged by `time`, otherwise created by the maintenance once it's set.
+			indexes.append(("time",))
+		for columns in indexes:
+			index_name = "_".join([table_name] + [column.split()[0] for column in columns])
+			queries.append("CREATE INDEX IF NOT EXISTS {} ON {}({})".format(index_name, table_name, ", ".join(columns)))
+		return queries
+
+	@classmethod
+	def init_database(
+			cls,
+			conn: sqlite3.Connection=None,
+			commit: bool=True,
+			*,
+			path: str=None,
+			profile: typing.Union[str, SQLiteProfile]="throughput")->None:
 		"""Writes the needed templates to the database, also saves the database connection for further usage.
 		
 		Args:
-			conn(sqlite3.Connection): Connection to the sqlite3 database used
-			commit(bool):
+			conn(sqlite3.Connection): Connection to the sqlite3 database used, used as it is.
+			commit(bool): Commit the journal to the database when finished.
+			path(str): Instead of `conn`, the database file to open a connection per thread to.
+			profile(str, SQLiteProfile): The PRAGMAs of the connections to `path`,
+				see `AAshe.sqlite.profiles`.
 
 		Returns:
 			None
 
 		"""
+		if path is not None:
+			cls.connector = SQLiteConnector.get(path=path, profile=profile)
+			conn = cls.connector.connection()
+		else:
+			cls.connector = None
 		cls.conn = conn
+		# Rebuilt on first use, in case the table or variable names were changed.
+		cls._queries = None
+		cls._memory = None
 		
 		query = cls.create_table()
 		cls.logger.debug(msg=f"-> QUERY : {query}")
-		cls.conn.cursor().execute(query)
+		cls.cursor().execute(query)
+		cls.migrate_keys()
+
+		for query in cls.create_indexes():
+			cls.logger.debug(msg=f"-> QUERY : {query}")
+			cls.cursor().execute(query)
+
+		for relation in cls.relations:
+			for query in relation.create(cls):
+				cls.logger.debug(msg=f"-> QUERY : {query}")
+				cls.cursor().execute(query)
 
 		if commit:
 			cls.commit()
 
+	@classmethod
+	def create_time_index(cls, commit: bool=True)->None:
+		"""Creates the index on `time` the purge of the entries past `retention` uses, if it's missing."""
+		table_name = cls.table_name or cls.__name__
+		query = f"CREATE INDEX IF NOT EXISTS {table_name}_time ON {table_name}(time)"
+		cls.logger.debug(msg=f"-> QUERY : {query}")
+		cls.cursor().execute(query)
+		if commit:
+			cls.commit()
+
+	@classmethod
+	def purge_expired(cls, before: float, limit: int, commit: bool=True)->int:
+		"""Deletes at most `limit` entries written before `before`, a UNIX time.
+		
+		Args:
+			before(float): Entries with an older `time` are deleted.
+			limit(int): Most entries deleted.
+			commit(bool): Commit the journal to the database when finished.
+
+		Returns:
+			int: The amount of entries deleted.
+		"""
+		table_name = cls.table_name or cls.__name__
+		query = f"DELETE FROM {table_name} WHERE rowid IN (SELECT rowid FROM {table_name} WHERE time < ? LIMIT ?)"
+		cls.logger.debug("-> QUERY : %s , %s", query, (before, limit))
+		cursor = cls.cursor()
+		cursor.execute(query, (before, limit))
+		if commit:
+			cls.commit()
+		return cursor.rowcount
+
+	@classmethod
+	def vacuum(cls, pages: int, commit: bool=True)->int:
+		"""Gives at most `pages` free pages of the database back to the file system.
+		
+		Only a database created with auto_vacuum=INCREMENTAL, like the ones of
+		`profiles`, gives pages back.
+
+		Returns:
+			int: The bytes the database shrank by.
+		"""
+		conn = cls.connection()
+		page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+		page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+		conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+		if commit:
+			cls.commit()
+		return (page_count - conn.execute("PRAGMA page_count").fetchone()[0]) * page_size
+
+	@classmethod
+	def optimize(cls, commit: bool=True)->int:
+		"""Lets SQLite refresh the statistics of the indexes it plans queries with.
+
+		Returns:
+			int: The bytes that are free in the database but weren't given back.
+		"""
+		conn = cls.connection()
+		conn.execute("PRAGMA optimize").fetchall()
+		if commit:
+			cls.commit()
+		return conn.execute("PRAGMA freelist_count").fetchone()[0] * conn.execute("PRAGMA page_size").fetchone()[0]
+
+	@classmethod
+	def start_maintenance(cls, interval: float=3600.0)->'SQLiteMaintenance':
+		"""Starts purging the entries past `retention` and compacting the database in the background.
+		
+		Needs a running event loop, see `SQLiteMaintenance`.
+		
+		Args:
+			interval(float): Seconds between two runs.
+
+		Returns:
+			SQLiteMaintenance: The running maintenance, also kept as `maintenance`.
+		"""
+		if cls.__dict__.get("maintenance") is not None:
+			cls.maintenance.stop()
+		if cls.storage is None and cls.connector is None:
+			cls.warning(
+				msg=f"The maintenance of {cls.__name__} runs on the event loop, "
+				f"give init_database a path or use an AsyncStorage to run it on a thread.")
+		cls.maintenance = SQLiteMaintenance(cls=cls, interval=interval)
+		cls.maintenance.start()
+		return cls.maintenance
+
+	@classmethod
+	def migrate_keys(cls)->int:
+		"""Adds the unique constraint on the keys to a table created before it was declared.
+		
+		A table with duplicate entries of a key only gets it with `migrate_duplicates`,
+		which deletes them first, keeping the one written last. Otherwise the
+		duplicates are kept and the entries are written without upserts, looking
+		up their keys first, like on SQLite versions without them.
+		
+		Returns:
+			int: The amount of duplicate entries removed.
+		"""
+		queries = cls.get_queries()
+		if not queries.keys_names:
+			return 0
+		
+		cursor = cls.cursor()
+		for index in cursor.execute(f"PRAGMA index_list({queries.table_name})").fetchall():
+			_, index_name, unique = index[:3]
+			columns = [info[2] for info in cursor.execute(f"PRAGMA index_info({index_name})").fetchall()]
+			if unique and set(columns) == set(queries.keys_names):
+				return 0
+		
+		keys = ", ".join(queries.keys_names)
+		# NULL keys are grouped together, like `probe` compares them.
+		duplicates = "FROM {0} WHERE rowid NOT IN (SELECT MAX(rowid) FROM {0} GROUP BY {1})".format(
+			queries.table_name, keys)
+		count = cursor.execute(f"SELECT COUNT(*) {duplicates}").fetchone()[0]
+		if count and not cls.migrate_duplicates:
+			cls.warning(
+				msg=f"{queries.table_name} has {count} duplicate entries of its keys ({keys}), "
+				f"they are kept and written without upserts. Set {cls.__name__}.migrate_duplicates "
+				f"to delete them, keeping the ones written last, and add the unique keys.")
+			queries.upsert = None
+			return 0
+		
+		if count:
+			cls.warning(msg=f"Deleting {count} duplicate entries of the keys ({keys}) of {queries.table_name}.")
+			query = f"DELETE {duplicates}"
+			cls.logger.debug(msg=f"-> QUERY : {query}")
+			cursor.execute(query)
+		
+		query = "CREATE UNIQUE INDEX IF NOT EXISTS {0}_keys ON {0}({1})".format(queries.table_name, keys)
+		cls.logger.debug(msg=f"-> QUERY : {query}")
+		cursor.execute(query)
+		
+		cls.warning(msg=f"Added unique keys ({keys}) to {queries.table_name}.")
+		return count
+
 	
 def init_table(c: sqlite3.Cursor, conn: sqlite3.Connection, new_table, commit=True):
 	c.execute(new_table.create_table)
@@ -151,7 +151,7 @@ class Status(SQLite):
 		print("Making web request!")
 		resp_data = await cls.request_status(aiosession=aiosession, url=url, region=region, headers={})
 		
-		kwargs = json.loads(resp_data.decode())
+		kwargs = resp_data
 		kwargs["region"] = region
 		kwargs["time"] = time.time()
 		kwargs["services"] = [Service(**kw) for kw in kwargs["services"]]
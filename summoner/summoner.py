@@ -2,6 +2,7 @@
 
 import AAshe.utils.request
 import AAshe.utils.ratelimit
+import AAshe.utils.singleflight
 import AAshe.sqlite
 
 import aiohttp
@@ -13,6 +14,7 @@ class SummonerEndpoint:
 	method_limit = None
 
 	@classmethod
+	@AAshe.utils.singleflight.coalesced(name="Summoner-V3")
 	@AAshe.utils.ratelimit.method_limited(refresh_cooldown=3600, name="Summoner-V3", use_lock=True)
 	async def request_summoner(
 			cls,
@@ -22,7 +24,7 @@ class SummonerEndpoint:
 			headers: dict,
 			timeout: int=10,
 			count: bool=True,
-			_cls: AAshe.sqlite.SQLite=None)->bytes:
+			_cls: AAshe.sqlite.SQLite=None)->dict:
 		"""To keep track of the calls being made.
 		
 		Args:
@@ -35,7 +37,7 @@ class SummonerEndpoint:
 			_cls(AAshe.sqlite.SQLite): Logger to use.
 
 		Returns:
-			bytes: Response from the call.
+			dict: Decoded response from the call.
 		"""
 		return await AAshe.utils.request.make_riot_request(
 			aiosession=aiosession,
@@ -5,6 +5,7 @@ import time
 import json
 
 import AAshe.utils.config as config
+import AAshe.utils.bulk
 import AAshe.utils.request
 import AAshe.utils.ratelimit
 import AAshe.sqlite
@@ -37,6 +38,8 @@ class Summoner(AAshe.sqlite.SQLite):
 		real=["time"],
 		text=["name"],
 		text_key=["region"])
+	indexes = [("region", "name", "time DESC"), ("region", "accountId", "time DESC")]
+	endpoint = AAshe.summoner.summoner.SummonerEndpoint
 	
 	__slots__ = (
 		"profileIconId",  # type: int
@@ -80,9 +83,13 @@ class Summoner(AAshe.sqlite.SQLite):
 		If more than one of these is filled, the priority is
 		summoner_id > account_id > summoner_name
 
+		With `stale_while_revalidate` set, a cached summoner older than
+		`request_cooldown` is still returned, and requested again in the background.
+
 		Args:
 			region (str): The region searched on.
-			aiosession (aiohttp.ClientSession): The aiosession used for the async search.
+			aiosession (aiohttp.ClientSession): The aiosession used for the async search,
+				None uses the pooled session of the shared `AAshe.client.AAshe`.
 			summoner_name (str): If this is not None, it will search by name.
 			summoner_id (int): If this is not None, it will search by summoner ID.
 			account_id (int): If this is not None, it will search by account ID.
@@ -143,29 +150,155 @@ class Summoner(AAshe.sqlite.SQLite):
 		
 		data = None
 		summoner = None
-		
-		if summoner_id is not None:
-			data = cls.read_all_data(id=summoner_id, region=region.lower(), order_by=[cls.desc("time")])
-
-		elif account_id is not None:
-			data = cls.read_all_data(account_id=account_id, region=region.lower(), order_by=[cls.desc("time")])
+		lookup = cls.summoner_lookup(
+			region=region, summoner_name=summoner_name, summoner_id=summoner_id, account_id=account_id)
 
-		elif summoner_name is not None:
-			data = cls.read_all_data(name=summoner_name.lower(), region=region.lower(), order_by=[cls.desc("time")])
+		if lookup is not None:
+			summoner = cls.recall(max_age=cls.stale_max_age(), **lookup)
+			if summoner is not None:
+				cls.debug(msg=f"Found Summoner({summoner.id}) in memory.")
+			else:
+				data = await cls.read_all_data_async(order_by=[cls.desc("time")], **lookup)
 
 		if data:
-			if time.time() - data[0].time < cls.request_cooldown:
+			if time.time() - data[0].time < cls.stale_max_age():
 				summoner = data[0]
+				cls.remember_summoner(summoner)
 				
 				cls.debug(msg=f"Found Summoner({summoner.id}) in cache.")
 			else:
-				for d in data:
-					d.del_data(commit=False)
-				cls.commit()
+				await cls.bulk_delete_async(data)
 		
 		if summoner:
+			if cls.is_stale(summoner):
+				cls.revalidate(
+					lookup, cls.fetch_summoner, region=region, aiosession=aiosession,
+					summoner_name=summoner_name, summoner_id=summoner_id, account_id=account_id)
 			return summoner
 		
+		return await cls.fetch_summoner(
+			region=region,
+			aiosession=aiosession,
+			summoner_name=summoner_name,
+			summoner_id=summoner_id,
+			account_id=account_id)
+
+	@classmethod
+	async def get_summoners(
+			cls,
+			region: str,
+			aiosession: aiohttp.ClientSession,
+			summoner_ids: typing.Iterable[int],
+			*,
+			concurrency: int=None,
+			return_exceptions: bool=False)->typing.AsyncIterator['Summoner']:
+		"""
+		Gets several summoners by Summoner ID, yielding them as they become available.
+
+		Args:
+			region (str): The region searched on.
+			aiosession (aiohttp.ClientSession): The aiosession used for the async search,
+				None uses the pooled session of the shared `AAshe.client.AAshe`.
+			summoner_ids (typing.Iterable): The Summoner IDs.
+			concurrency (int): Most requests in flight, None uses
+				`AAshe.utils.bulk.concurrency_for` the region.
+			return_exceptions (bool): Yield the exception of a failed request instead
+				of raising it and stopping the rest, its `key` is the Summoner ID it failed for.
+
+		Returns:
+			typing.AsyncIterator: The summoners, cached ones first and otherwise in no particular order.
+
+		Raises:
+			AAsheException: The same as `get_summoner`, unless `return_exceptions` is set.
+		"""
+		misses = []
+		for chunk in AAshe.utils.bulk.chunks([int(summoner_id) for summoner_id in summoner_ids]):
+			found = await cls.read_cached_async(
+				key_name="id", keys=chunk, max_age=cls.stale_max_age(), region=region.lower())
+			cls.debug(msg=f"Found {len(found)} of {len(chunk)} Summoners in cache.")
+
+			for summoner in found.values():
+				if cls.is_stale(summoner):
+					cls.revalidate(
+						dict(id=summoner.id, region=region.lower()), cls.fetch_summoner,
+						region=region, aiosession=aiosession, summoner_id=summoner.id)
+				yield summoner
+			misses.extend([summoner_id for summoner_id in chunk if summoner_id not in found])
+
+		# Fetched entries are committed in batches, by the writer thread with a storage, not one by one.
+		# Only the requests write to the batch, and it's flushed before an entry is yielded, so
+		# nothing is left buffered while the caller holds on to the generator.
+		batch = cls.new_batch()
+
+		async def fetch(summoner_id: int)->'Summoner':
+			with batch.use():
+				return await cls.fetch_summoner(region=region, aiosession=aiosession, summoner_id=summoner_id)
+
+		try:
+			async for summoner in AAshe.utils.bulk.stream(
+					keys=misses,
+					func=fetch,
+					concurrency=concurrency or AAshe.utils.bulk.concurrency_for(region),
+					return_exceptions=return_exceptions):
+				batch.flush()
+				yield summoner
+		finally:
+			batch.close()
+
+	@classmethod
+	def remember_summoner(cls, summoner: 'Summoner')->None:
+		"""Keeps `summoner` in memory for each lookup of `get_summoner`."""
+		for lookup in (dict(id=summoner.id), dict(accountId=summoner.accountId), dict(name=summoner.name)):
+			cls.remember(summoner, region=summoner.region, **lookup)
+
+	@staticmethod
+	def summoner_lookup(
+			region: str,
+			summoner_name: str=None,
+			summoner_id: int=None,
+			account_id: int=None)->typing.Union[dict, None]:
+		"""Returns the values a summoner is read by, the first of summoner_id > account_id > summoner_name given."""
+		if summoner_id is not None:
+			return dict(id=summoner_id, region=region.lower())
+		elif account_id is not None:
+			return dict(accountId=account_id, region=region.lower())
+		elif summoner_name is not None:
+			return dict(name=summoner_name.lower(), region=region.lower())
+		return None
+
+	@classmethod
+	async def fetch_summoner(
+			cls,
+			region: str,
+			aiosession: aiohttp.ClientSession,
+			*,
+			summoner_name: str=None,
+			summoner_id: int=None,
+			account_id: int=None)->typing.Union['Summoner', None]:
+		"""Requests a summoner from the Riot API and writes it to the cache, see `get_summoner`.
+		
+		Concurrent fetches of a summoner share one, see `SQLite.fetch_once`.
+		"""
+		lookup = cls.summoner_lookup(
+			region=region, summoner_name=summoner_name, summoner_id=summoner_id, account_id=account_id)
+		if lookup is None:
+			return None
+		return await cls.fetch_once(
+			lookup, cls.load_summoner, region=region, aiosession=aiosession,
+			summoner_name=summoner_name, summoner_id=summoner_id, account_id=account_id)
+
+	@classmethod
+	async def load_summoner(
+			cls,
+			region: str,
+			aiosession: aiohttp.ClientSession,
+			*,
+			summoner_name: str=None,
+			summoner_id: int=None,
+			account_id: int=None)->typing.Union['Summoner', None]:
+		"""`fetch_summoner`, without sharing it with the concurrent fetches of the summoner."""
+		summoner = None
+
 		if summoner_id is not None:
 			url = "https://{}.api.riotgames.com" + "/lol/summoner/v3/summoners/{}?api_key={}".format(
 				summoner_id, config.Config.get_api_key())
@@ -186,15 +319,17 @@ class Summoner(AAshe.sqlite.SQLite):
 			
 		if url:
 			resp_data = await AAshe.summoner.summoner.SummonerEndpoint.\
-				request_summoner(aiosession=aiosession, url=url, region=region, headers={}, _cls=cls)  # type: bytes
+				request_summoner(aiosession=aiosession, url=url, region=region, headers={}, _cls=cls)  # type: dict
 			
-			kwargs = json.loads(resp_data.decode())
+			# The response can be shared with other callers, so it's only copied from.
+			kwargs = dict(resp_data)
 			kwargs["region"] = region.lower()
 			kwargs["time"] = time.time()
 			kwargs["name"] = kwargs["name"].lower()
 			
 			summoner = cls(**kwargs)
-			summoner.write_data()
+			await summoner.write_data_async()
+			cls.remember_summoner(summoner)
 		
 		return summoner  # type: typing.Union[Summoner, None]
 
@@ -0,0 +1,128 @@
+"""
+Makes the checkout importable as `AAshe`, whatever its directory is named, and
+gives the tests the documents of the Riot API they build models from.
+"""
+import importlib.util
+import pathlib
+import random
+import sys
+
+import pytest
+
+root = pathlib.Path(__file__).resolve().parent.parent
+
+if importlib.util.find_spec("AAshe") is None:
+	spec = importlib.util.spec_from_loader("AAshe", loader=None, is_package=True)
+	package = importlib.util.module_from_spec(spec)
+	package.__path__ = [str(root)]
+	sys.modules["AAshe"] = package
+
+import AAshe.match.matches as matches
+import AAshe.match.timelines as timelines
+
+EVENT_TYPES = ("ITEM_PURCHASED", "SKILL_LEVEL_UP", "WARD_PLACED", "CHAMPION_KILL", "BUILDING_KILL")
+
+
+def match_data(match_id: int)->dict:
+	"""Returns a match-v3 document of ten participants, the same for a match id on every call."""
+	rng = random.Random(match_id)
+	participants, identities = [], []
+	for participant_id in range(1, 11):
+		participants.append({
+			"participantId": participant_id,
+			"teamId": 100 if participant_id <= 5 else 200,
+			"championId": 10 * match_id + participant_id,
+			"spell1Id": 4,
+			"spell2Id": rng.choice((7, 11, 12, 14)),
+			"highestAchievedSeasonTier": "GOLD",
+			"stats": {
+				"participantId": participant_id, "win": participant_id <= 5,
+				"kills": rng.randrange(20), "deaths": rng.randrange(20), "assists": rng.randrange(20),
+				"goldEarned": rng.randrange(5000, 20000), "champLevel": rng.randrange(1, 19)},
+			"timeline": {"participantId": participant_id, "lane": "MIDDLE", "role": "SOLO"}})
+		identities.append({
+			"participantId": participant_id,
+			"player": {
+				"platformId": "EUW1", "summonerName": f"player {match_id} {participant_id}",
+				"accountId": 1000 * match_id + participant_id, "summonerId": 1000 * match_id + participant_id}})
+
+	teams = [{
+		"teamId": team_id, "win": "Win" if team_id == 100 else "Fail", "towerKills": rng.randrange(12),
+		"bans": [{"championId": rng.randrange(1, 500), "pickTurn": turn} for turn in range(1, 4)]}
+		for team_id in (100, 200)]
+
+	return {
+		"gameId": match_id, "platformId": "EUW1", "gameCreation": 1500000000000 + match_id,
+		"gameDuration": rng.randrange(1200, 2400), "queueId": 420, "mapId": 11, "seasonId": 9,
+		"gameVersion": "7.16.195.7908", "gameMode": "CLASSIC", "gameType": "MATCHED_GAME",
+		"teams": teams, "participants": participants, "participantIdentities": identities}
+
+
+def timeline_data(match_id: int, minutes: int=5, events_per_frame: int=12)->dict:
+	"""Returns a timeline-v3 document with a frame per minute, the same for a match id on every call."""
+	rng = random.Random(match_id)
+	frames = []
+	for minute in range(minutes + 1):
+		participant_frames = {}
+		for participant_id in range(1, 11):
+			participant_frames[str(participant_id)] = {
+				"participantId": participant_id,
+				"position": {"x": rng.randrange(0, 14870), "y": rng.randrange(0, 14980)},
+				"currentGold": rng.randrange(0, 3000), "totalGold": 500 + minute * 100 * participant_id,
+				"level": min(18, 1 + minute // 2), "xp": minute * 10 * participant_id,
+				"minionsKilled": minute * participant_id, "jungleMinionsKilled": rng.randrange(0, 50)}
+
+		events = []
+		for _ in range(events_per_frame if minute else 0):
+			event_type = rng.choice(EVENT_TYPES)
+			event = {
+				"type": event_type, "timestamp": (minute - 1) * 60000 + rng.randrange(60000),
+				"participantId": rng.randrange(1, 11)}
+			if event_type == "ITEM_PURCHASED":
+				event["itemId"] = rng.randrange(1000, 4000)
+			elif event_type == "SKILL_LEVEL_UP":
+				event.update({"skillSlot": rng.randrange(1, 5), "levelUpType": "NORMAL"})
+			elif event_type == "WARD_PLACED":
+				event.update({"wardType": "YELLOW_TRINKET", "creatorId": event.pop("participantId")})
+			else:
+				event.update({
+					"killerId": event.pop("participantId"), "victimId": rng.randrange(1, 11),
+					"assistingParticipantIds": rng.sample(range(1, 11), 2),
+					"position": {"x": rng.randrange(0, 14870), "y": rng.randrange(0, 14980)}})
+				if event_type == "BUILDING_KILL":
+					event.update({"teamId": 100, "buildingType": "TOWER_BUILDING", "laneType": "MID_LANE"})
+			events.append(event)
+
+		frames.append({"timestamp": minute * 60000, "participantFrames": participant_frames, "events": events})
+
+	return {"frames": frames, "frameInterval": 60000}
+
+
+@pytest.fixture
+def match_document():
+	"""Returns `match_data`, the document of a match id."""
+	return match_data
+
+
+@pytest.fixture
+def timeline_document():
+	"""Returns `timeline_data`, the document of the timeline of a match id."""
+	return timeline_data
+
+
+@pytest.fixture
+def build_match():
+	"""Returns a function building the Match of a match id, with `values` in place of the ones of its document."""
+	def build(match_id: int, region: str="euw1", **values)->matches.Match:
+		return matches.Match.from_response(
+			region=region, match_id=match_id, resp_data=dict(match_data(match_id), **values))
+	return build
+
+
+@pytest.fixture
+def build_timeline():
+	"""Returns a function building the Timeline of a match id, the arguments are the ones of `timeline_data`."""
+	def build(match_id: int, region: str="euw1", **kwargs)->timelines.Timeline:
+		return timelines.Timeline.from_response(
+			region=region, match_id=match_id, resp_data=timeline_data(match_id, **kwargs))
+	return build
@@ -0,0 +1,176 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+import AAshe.sqlite
+import AAshe.match.matches as matches
+
+Match = matches.Match
+
+
+def rows(match: Match)->list:
+	if match.gameDuration < 0:
+		raise ValueError("no rows")
+	return [(match.gameDuration,)]
+
+
+@pytest.fixture
+def committed(tmp_path, monkeypatch):
+	"""Gives Match a database file, returns a function counting the matches committed to it."""
+	path = str(tmp_path / "cache.db")
+	monkeypatch.setattr(Match, "memory_max_bytes", 0)
+	Match.init_database(conn=sqlite3.connect(path))
+	other = sqlite3.connect(path)
+
+	def count()->int:
+		return other.execute(f"SELECT COUNT(*) FROM {Match.table_name}").fetchone()[0]
+
+	yield count
+	other.close()
+	Match.conn.close()
+
+
+def test_batch_only_covers_its_task(committed, build_match):
+	async def main():
+		entered = asyncio.Event()
+		release = asyncio.Event()
+
+		async def batched():
+			with Match.batch(flush_interval=60):
+				build_match(1).write_data()
+				entered.set()
+				await release.wait()
+
+		task = asyncio.ensure_future(batched())
+		await entered.wait()
+		# An unrelated task writes while the batch is open.
+		await build_match(2).write_data_async()
+		assert committed() == 1
+		release.set()
+		await task
+		assert committed() == 2
+
+	asyncio.run(main())
+
+
+def test_flush_interval_is_a_timer(committed, build_match):
+	async def main():
+		with Match.batch(flush_interval=0.05) as batch:
+			build_match(1).write_data()
+			assert committed() == 0
+			# No other write comes, the timer flushes it.
+			await asyncio.sleep(0.1)
+			assert committed() == 1
+			assert not batch.objects
+
+	asyncio.run(main())
+
+
+def test_getter_flushes_before_yielding(committed, monkeypatch, build_match):
+	async def fetch_match(region: str, aiosession: object, match_id: int)->Match:
+		await asyncio.sleep(0.001 * match_id)
+		game = build_match(match_id)
+		await game.write_data_async()
+		return game
+
+	monkeypatch.setattr(Match, "fetch_match", staticmethod(fetch_match))
+
+	async def main():
+		games = Match.get_matches(region="euw1", aiosession=None, match_ids=range(1, 11), concurrency=2)
+		first = await games.__anext__()
+		# The caller holds on to the generator, what was fetched is already written.
+		assert committed() >= 1
+		assert Match.get_batch() is None
+		build_match(100).write_data()
+		assert committed() >= 2
+		rest = [game async for game in games]
+		assert len(rest) == 9 and first.matchId not in [game.matchId for game in rest]
+		assert committed() == 11
+
+	asyncio.run(main())
+
+
+def test_closed_batch_writes_at_once(committed, build_match):
+	async def main():
+		tasks = []
+		with Match.batch(flush_interval=60):
+			async def late():
+				await asyncio.sleep(0.05)
+				build_match(2).write_data()
+
+			# Started within the batch, but writing after it exited.
+			tasks.append(asyncio.ensure_future(late()))
+			build_match(1).write_data()
+		assert committed() == 1
+		await tasks[0]
+		assert committed() == 2
+
+	asyncio.run(main())
+
+
+def test_timer_flush_drops_failed_objects(committed, monkeypatch, build_match, caplog):
+	monkeypatch.setattr(Match, "relations", [
+		AAshe.sqlite.SQLiteRelation(table_name="match_rows", columns=[("duration", "INTEGER")], rows=rows)])
+	Match.init_database(conn=Match.conn)
+
+	async def main():
+		with Match.batch(flush_interval=0.05) as batch:
+			build_match(1, gameDuration=1).write_data()
+			build_match(2, gameDuration=-1).write_data()
+			await asyncio.sleep(0.1)
+			assert not batch.objects and not batch.flushing
+
+	asyncio.run(main())
+	assert committed() == 1
+	assert "they are dropped: [2, 'euw1']" in caplog.text
+
+
+def test_timer_flush_buffers_locked_writes_again(committed, monkeypatch, build_match):
+	bulk_write = Match.bulk_write.__func__
+	calls = []
+
+	def locked(cls, objects: list, commit: bool=True)->int:
+		calls.append(len(objects))
+		if len(calls) == 1:
+			raise sqlite3.OperationalError("database is locked")
+		return bulk_write(cls, objects, commit=commit)
+
+	monkeypatch.setattr(Match, "bulk_write", classmethod(locked))
+
+	async def main():
+		with Match.batch(flush_interval=0.05) as batch:
+			build_match(1).write_data()
+			await asyncio.sleep(0.08)
+			assert committed() == 0 and len(batch.objects) == 1
+			await asyncio.sleep(0.05)
+			assert committed() == 1
+
+	asyncio.run(main())
+	assert calls == [1, 1]
+
+
+def test_timer_flush_runs_on_the_writer_of_the_connector(tmp_path, monkeypatch, build_match):
+	monkeypatch.setattr(Match, "memory_max_bytes", 0)
+	Match.init_database(path=str(tmp_path / "cache.db"))
+	threads = []
+	bulk_write = Match.bulk_write.__func__
+
+	def recorded(cls, objects: list, commit: bool=True)->int:
+		threads.append(threading.current_thread().name)
+		return bulk_write(cls, objects, commit=commit)
+
+	monkeypatch.setattr(Match, "bulk_write", classmethod(recorded))
+
+	async def main():
+		with Match.batch(flush_interval=0.01):
+			build_match(1).write_data()
+			await asyncio.sleep(0.1)
+
+	try:
+		asyncio.run(main())
+	finally:
+		Match.connector = None
+		Match.conn.close()
+	assert len(threads) == 1 and threads[0].startswith("AAshe-sqlite-writer")
@@ -0,0 +1,101 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+import AAshe.errors as errors
+import AAshe.utils.bulk as bulk
+import AAshe.match.matches as matches
+
+Match = matches.Match
+
+
+async def lookup(key: int)->int:
+	await asyncio.sleep(0.001 * (key % 3))
+	if key % 4 == 0:
+		raise errors.DataNotFound()
+	return key * 10
+
+
+def collect(**kwargs)->list:
+	async def main()->list:
+		return [result async for result in bulk.stream(**kwargs)]
+	return asyncio.run(main())
+
+
+def test_exceptions_carry_their_key():
+	results = collect(keys=range(1, 21), func=lookup, concurrency=4, return_exceptions=True)
+
+	failed = sorted([result.key for result in results if isinstance(result, errors.DataNotFound)])
+	assert failed == [4, 8, 12, 16, 20]
+	assert sorted([result for result in results if isinstance(result, int)]) == [
+		key * 10 for key in range(1, 21) if key % 4]
+
+
+def test_raised_exception_carries_its_key():
+	with pytest.raises(errors.DataNotFound) as raised:
+		collect(keys=[1, 2, 4], func=lookup, concurrency=1)
+	assert raised.value.key == 4
+
+
+class Interrupted(BaseException):
+	pass
+
+
+def test_base_exceptions_do_not_hang_the_stream():
+	async def interrupted(key: int)->int:
+		if key == 2:
+			raise Interrupted()
+		return await lookup(key)
+
+	async def main()->list:
+		return [result async for result in bulk.stream(keys=[1, 2, 3], func=interrupted, concurrency=2)]
+
+	with pytest.raises(Interrupted):
+		asyncio.run(asyncio.wait_for(main(), timeout=5))
+
+
+@pytest.fixture
+def cached(tmp_path, monkeypatch, build_match):
+	"""Caches the matches 1 and 2, returns the match ids fetch_match is called for instead of requesting them."""
+	monkeypatch.setattr(Match, "memory_max_bytes", 0)
+	Match.init_database(conn=sqlite3.connect(str(tmp_path / "cache.db")))
+	Match.bulk_write([build_match(1), build_match(2)], commit=True)
+	fetched = []
+
+	async def fetch_match(region: str, aiosession, match_id: int)->Match:
+		fetched.append(match_id)
+		await asyncio.sleep(0.001 * (match_id % 3))
+		if match_id % 4 == 0:
+			raise errors.DataNotFound()
+		return build_match(match_id, region=region)
+
+	monkeypatch.setattr(Match, "fetch_match", fetch_match)
+	yield fetched
+	Match.conn.close()
+
+
+def get_matches(match_ids: list, **kwargs)->list:
+	async def main()->list:
+		return [game async for game in Match.get_matches(region="euw1", aiosession=None, match_ids=match_ids, **kwargs)]
+	return asyncio.run(main())
+
+
+def test_get_matches_yields_cached_matches_first(cached):
+	games = get_matches([3, 1, 5, 2], concurrency=2)
+
+	assert [game.matchId for game in games[:2]] == [1, 2]
+	assert sorted([game.matchId for game in games[2:]]) == [3, 5]
+	assert sorted(cached) == [3, 5]
+
+
+def test_get_matches_with_a_failed_request(cached):
+	games = get_matches([1, 3, 4, 5], concurrency=2, return_exceptions=True)
+
+	failed = [game for game in games if isinstance(game, errors.DataNotFound)]
+	assert [game.key for game in failed] == [4]
+	assert sorted([game.matchId for game in games if isinstance(game, Match)]) == [1, 3, 5]
+
+	with pytest.raises(errors.DataNotFound) as raised:
+		get_matches([4], concurrency=2)
+	assert raised.value.key == 4
@@ -0,0 +1,39 @@
+import asyncio
+import gc
+import warnings
+
+import pytest
+
+import AAshe.client
+import AAshe.utils.config as config
+
+
+@pytest.fixture
+def loop():
+	"""Sets a current event loop, `asyncio.run` of the other tests leaves none behind."""
+	loop = asyncio.new_event_loop()
+	asyncio.set_event_loop(loop)
+	yield loop
+	asyncio.set_event_loop(None)
+	loop.close()
+
+
+def test_run_async_closes_the_pooled_session(loop, monkeypatch):
+	monkeypatch.setattr(AAshe.client.AAshe, "default", None)
+	sessions = []
+
+	async def call(aiosession)->str:
+		assert not aiosession.closed
+		sessions.append(aiosession)
+		return "done"
+
+	with warnings.catch_warnings():
+		warnings.simplefilter("error", ResourceWarning)
+		assert config.run_async(call) == "done"
+		assert config.run_async(call) == "done"
+		gc.collect()
+
+	first, second = sessions
+	assert first.closed and first.connector is None
+	assert second is not first and second.closed
+	assert AAshe.client.AAshe.shared().session is None
@@ -0,0 +1,87 @@
+import contextlib
+import sqlite3
+
+import pytest
+
+import AAshe.sqlite
+import AAshe.utils.bulk as bulk
+import AAshe.match.matches as matches
+
+Match = matches.Match
+
+
+@pytest.fixture
+def path(tmp_path, monkeypatch):
+	"""Gives Match a database file with a relation of a row per participant, returns its path."""
+	path = str(tmp_path / "cache.db")
+	monkeypatch.setattr(Match, "memory_max_bytes", 0)
+	monkeypatch.setattr(Match, "relations", [AAshe.sqlite.SQLiteRelation(
+		table_name="match_picks", columns=[("championId", "INTEGER")],
+		rows=lambda match: [(participant.championId,) for participant in match.participants])])
+	Match.init_database(conn=sqlite3.connect(path))
+	yield path
+	Match.conn.close()
+
+
+def select(path: str, query: str)->list:
+	with contextlib.closing(sqlite3.connect(path)) as conn:
+		return conn.execute(query).fetchall()
+
+
+def stored(path: str, table: str=Match.table_name)->list:
+	return select(path, f"SELECT region, matchId FROM {table} GROUP BY region, matchId ORDER BY region, matchId")
+
+
+def test_bulk_delete_by_keys(path, build_match):
+	games = [build_match(match_id, region=region) for region in ("euw1", "na1") for match_id in range(1, 6)]
+	Match.bulk_write(games)
+
+	deleted = Match.bulk_delete([game for game in games if game.region == "euw1" and game.matchId % 2 == 0])
+
+	assert deleted == 2
+	expected = [("euw1", 1), ("euw1", 3), ("euw1", 5)] + [("na1", match_id) for match_id in range(1, 6)]
+	assert stored(path) == expected
+	# The rows of the relation are deleted with their entry.
+	assert stored(path, table="match_picks") == expected
+	assert len(select(path, "SELECT * FROM match_picks")) == 10 * len(expected)
+
+
+def test_bulk_delete_chunks_past_the_variable_limit(path, build_match, monkeypatch):
+	games = [build_match(match_id) for match_id in range(1, 1201)]
+	Match.bulk_write(games)
+	counts = []
+	delete_many = AAshe.sqlite.SQLiteQueries.delete_many
+
+	def counted(self, count: int)->str:
+		counts.append(count)
+		return delete_many(self, count)
+
+	monkeypatch.setattr(AAshe.sqlite.SQLiteQueries, "delete_many", counted)
+	assert bulk.chunk_size < 999 < len(games)
+
+	assert Match.bulk_delete(games) == 1200
+	assert counts == [bulk.chunk_size, bulk.chunk_size, 1200 - 2 * bulk.chunk_size]
+	assert stored(path) == [] and stored(path, table="match_picks") == []
+
+
+def test_bulk_delete_keeps_entries_written_after_the_objects(path, build_match):
+	old = build_match(1)
+	old.time -= 60
+	Match.bulk_write([old, build_match(2)])
+	newer = build_match(1)
+	Match.bulk_write([newer])
+
+	# The entry of match 1 was written again since `old` was read.
+	assert Match.bulk_delete([old]) == 0
+	assert Match.bulk_delete([newer]) == 1
+	assert stored(path) == [("euw1", 2)]
+
+
+def test_bulk_delete_null_keys(path, build_match):
+	game = build_match(1)
+	game.matchId = None
+	Match.bulk_write([game, build_match(2)])
+
+	assert Match.bulk_delete([game]) == 1
+	assert stored(path) == [("euw1", 2)]
+	assert stored(path, table="match_picks") == [("euw1", 2)]
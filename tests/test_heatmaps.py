@@ -0,0 +1,128 @@
+import sqlite3
+
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+import AAshe.match.heatmaps as heatmaps
+import AAshe.match.matches as matches
+import AAshe.match.timelines as timelines
+
+Heatmap = heatmaps.Heatmap
+Match = matches.Match
+Timeline = timelines.Timeline
+
+
+def position(x: int, y: int)->dict:
+	return {"x": x, "y": y}
+
+
+def timeline(match_id: int=1, region: str="euw1")->Timeline:
+	"""A timeline with positions in known bins of a 2x2 grid, the bins split the map at 7435 and 7490."""
+	return Timeline.from_response(region=region, match_id=match_id, resp_data={"frameInterval": 60000, "frames": [
+		{"timestamp": 0, "events": [], "participantFrames": {
+			"1": {"participantId": 1, "position": position(100, 100)},
+			# On the upper edges of the map, counted in the last bins.
+			"2": {"participantId": 2, "position": position(14870, 14980)},
+			# Out of the map.
+			"3": {"participantId": 3, "position": position(-5, 100)},
+			"6": {"participantId": 6, "position": position(14000, 14000)}}},
+		{"timestamp": 60000, "participantFrames": {
+			"1": {"participantId": 1, "position": position(7000, 7000)},
+			"6": {"participantId": 6}}, "events": [
+			{"type": "CHAMPION_KILL", "timestamp": 61000, "killerId": 1, "victimId": 6,
+				"assistingParticipantIds": [], "position": position(100, 14000)},
+			# Killed by a tower, no participant did it.
+			{"type": "CHAMPION_KILL", "timestamp": 62000, "killerId": 0, "victimId": 1, "position": position(14000, 100)},
+			{"type": "WARD_PLACED", "timestamp": 63000, "creatorId": 6, "wardType": "YELLOW_TRINKET"},
+			{"type": "BUILDING_KILL", "timestamp": 64000, "killerId": 6, "position": position(20000, 20000)},
+			{"type": "ITEM_PURCHASED", "timestamp": 65000, "participantId": 1, "itemId": 1001}]}]})
+
+
+def grids(heatmap: Heatmap, champions: dict=None)->dict:
+	heatmap.add(timeline(), champions=champions)
+	return {key: grid.tolist() for key, grid in heatmap.get_grids().items()}
+
+
+def test_events_by_type():
+	assert grids(Heatmap(source="events", group_by="type", bins=2)) == {
+		"CHAMPION_KILL": [[0, 1], [1, 0]],
+		# The building is out of the map.
+		"BUILDING_KILL": [[0, 0], [0, 0]]}
+
+
+def test_events_by_team():
+	assert grids(Heatmap(source="events", group_by="team", bins=2)) == {100: [[0, 1], [0, 0]], 200: [[0, 0], [0, 0]]}
+
+
+def test_events_by_participant():
+	assert grids(Heatmap(source="events", group_by="participant", bins=2)) == {
+		1: [[0, 1], [0, 0]], 6: [[0, 0], [0, 0]]}
+
+
+def test_events_by_champion():
+	heatmap = Heatmap(source="events", group_by="champion", bins=2)
+	assert grids(heatmap, champions={1: 157, 6: 238}) == {157: [[0, 1], [0, 0]], 238: [[0, 0], [0, 0]]}
+
+	# Without the champions the timeline is skipped.
+	heatmap.add(timeline(), champions=None)
+	assert heatmap.skipped == 1 and heatmap.timelines == 1
+
+
+def test_events_of_a_single_grid():
+	assert grids(Heatmap(source="events", group_by=None, bins=2)) == {None: [[0, 1], [1, 0]]}
+	assert grids(Heatmap(source="events", group_by=None, types=("WARD_PLACED",), bins=2)) == {None: [[0, 0], [0, 0]]}
+
+
+def test_frames():
+	assert grids(Heatmap(source="frames", group_by="participant", bins=2)) == {
+		1: [[2, 0], [0, 0]], 2: [[0, 0], [0, 1]], 3: [[0, 0], [0, 0]], 6: [[0, 0], [0, 1]]}
+	assert grids(Heatmap(source="frames", group_by="team", bins=2)) == {100: [[2, 0], [0, 1]], 200: [[0, 0], [0, 1]]}
+	assert grids(Heatmap(source="frames", group_by="champion", bins=2), champions={1: 157, 2: 157, 6: 238}) == {
+		157: [[2, 0], [0, 1]], 238: [[0, 0], [0, 1]]}
+	assert grids(Heatmap(source="frames", group_by=None, bins=2)) == {None: [[2, 0], [0, 2]]}
+
+
+def test_map_range(monkeypatch):
+	monkeypatch.setattr(Heatmap, "map_range", ((0, 7000), (0, 7000)))
+	heatmap = Heatmap(source="frames", group_by=None, bins=(2, 1))
+	assert heatmap.edges[0].tolist() == [0, 3500, 7000] and heatmap.edges[1].tolist() == [0, 7000]
+	# Only the positions of participant 1 are within the range, the one on its edge too.
+	assert grids(heatmap) == {None: [[1], [1]]}
+
+
+def test_invalid_heatmaps():
+	with pytest.raises(ValueError):
+		Heatmap(source="positions")
+	with pytest.raises(ValueError):
+		Heatmap(group_by="lane")
+	with pytest.raises(ValueError):
+		Heatmap(source="frames", group_by="type")
+
+
+@pytest.fixture
+def cache(monkeypatch, build_match):
+	"""Caches the timelines of match 1 in euw1 and 2 in na1, and the matches of both ids in both regions."""
+	for cls in (Match, Timeline):
+		monkeypatch.setattr(cls, "memory_max_bytes", 0)
+		cls.init_database(conn=sqlite3.connect(":memory:"))
+	Timeline.bulk_write([timeline(1, "euw1"), timeline(2, "na1")])
+	Match.bulk_write([build_match(match_id, region=region) for match_id in (1, 2) for region in ("euw1", "na1")])
+	yield
+	Match.conn.close()
+	Timeline.conn.close()
+
+
+def test_read_champions_of_the_timelines_only(cache):
+	champions = Heatmap.read_champions([timeline(1, "euw1"), timeline(2, "na1")])
+
+	assert sorted(champions) == [(1, "euw1"), (2, "na1")]
+	# The champion ids of the sample matches are 10 * matchId + participantId.
+	assert champions[(2, "na1")] == {participant_id: 20 + participant_id for participant_id in range(1, 11)}
+
+
+def test_add_cache_by_champion(cache):
+	heatmap = Heatmap(source="events", group_by="champion", bins=2)
+	assert heatmap.add_cache() == 2
+	assert {key: grid.tolist() for key, grid in heatmap.get_grids().items()} == {
+		11: [[0, 1], [0, 0]], 21: [[0, 1], [0, 0]], 16: [[0, 0], [0, 0]], 26: [[0, 0], [0, 0]]}
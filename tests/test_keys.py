@@ -0,0 +1,99 @@
+import contextlib
+import sqlite3
+
+import pytest
+
+import AAshe.match.matches as matches
+
+Match = matches.Match
+
+
+@pytest.fixture
+def path(tmp_path, monkeypatch):
+	"""Returns the path of a database file, Match keeps nothing in memory."""
+	monkeypatch.setattr(Match, "memory_max_bytes", 0)
+	yield str(tmp_path / "cache.db")
+	if Match.conn is not None:
+		Match.conn.close()
+
+
+def select(path: str, query: str)->list:
+	with contextlib.closing(sqlite3.connect(path)) as conn:
+		return conn.execute(query).fetchall()
+
+
+def create_without_keys(path: str, match_ids: list)->None:
+	"""Writes `match_ids` to a table of Match created before its keys were unique.
+	
+	The gameDuration of an entry is the amount of entries of its match id written before it.
+	"""
+	query = Match.create_table()
+	with contextlib.closing(sqlite3.connect(path)) as conn:
+		conn.execute(query[:query.index(", UNIQUE(")] + ")")
+		for i, match_id in enumerate(match_ids):
+			conn.execute(
+				f"INSERT INTO {Match.table_name} (region, matchId, gameDuration) VALUES (?, ?, ?)",
+				("euw1", match_id, match_ids[:i].count(match_id)))
+		conn.commit()
+
+
+def test_upsert_overwrites_the_entry(path, build_match):
+	Match.init_database(conn=sqlite3.connect(path))
+	assert Match.get_queries().upsert is not None
+
+	build_match(1, gameDuration=1).write_data(commit=True)
+	build_match(1, gameDuration=2).write_data(commit=True)
+	Match.bulk_write([build_match(1, gameDuration=3), build_match(2, gameDuration=4)], commit=True)
+
+	assert select(path, f"SELECT matchId, gameDuration FROM {Match.table_name} ORDER BY matchId") == [(1, 3), (2, 4)]
+
+
+def test_migrate_keys_keeps_duplicates_by_default(path, build_match, caplog):
+	create_without_keys(path, [1, 1, 2])
+	Match.init_database(conn=sqlite3.connect(path))
+
+	assert "duplicate entries" in caplog.text
+	assert Match.get_queries().upsert is None
+	assert len(select(path, f"SELECT * FROM {Match.table_name}")) == 3
+
+	# Written without upserts, looking up the key first.
+	build_match(2, gameDuration=5).write_data(commit=True)
+	Match.bulk_write([build_match(3, gameDuration=6)], commit=True)
+	assert select(path, f"SELECT matchId, gameDuration FROM {Match.table_name} WHERE matchId > 1 ORDER BY matchId") == [
+		(2, 5), (3, 6)]
+
+
+def test_migrate_keys_deletes_duplicates_when_asked(path, build_match, monkeypatch, caplog):
+	create_without_keys(path, [1, 1, 2])
+	monkeypatch.setattr(Match, "migrate_duplicates", True)
+	Match.init_database(conn=sqlite3.connect(path))
+
+	assert "Deleting 1 duplicate entries" in caplog.text
+	assert Match.get_queries().upsert is not None
+	# The one written last is kept.
+	assert select(path, f"SELECT matchId, gameDuration FROM {Match.table_name} ORDER BY matchId") == [(1, 1), (2, 0)]
+	with pytest.raises(sqlite3.IntegrityError):
+		Match.conn.execute(f"INSERT INTO {Match.table_name} (region, matchId) VALUES ('euw1', 2)")
+
+
+def test_migrate_keys_without_duplicates(path, build_match):
+	create_without_keys(path, [1, 2])
+	Match.init_database(conn=sqlite3.connect(path))
+
+	assert Match.get_queries().upsert is not None
+	assert len(select(path, f"SELECT * FROM {Match.table_name}")) == 2
+
+
+def test_null_keys_are_not_duplicated(path, build_match):
+	Match.init_database(conn=sqlite3.connect(path))
+
+	def without_id(game_duration: int)->Match:
+		match = build_match(1, gameDuration=game_duration)
+		match.matchId = None
+		return match
+
+	without_id(1).write_data(commit=True)
+	without_id(2).write_data(commit=True)
+	Match.bulk_write([without_id(3), build_match(2, gameDuration=4)], commit=True)
+
+	assert select(path, f"SELECT matchId, gameDuration FROM {Match.table_name} ORDER BY matchId") == [(None, 3), (2, 4)]
@@ -0,0 +1,103 @@
+import asyncio
+import contextlib
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import AAshe.sqlite
+import AAshe.match.matches as matches
+
+Match = matches.Match
+
+
+@pytest.fixture
+def steps(monkeypatch):
+	"""Returns the names of the threads purge_expired is run on."""
+	threads = []
+	purge_expired = Match.purge_expired.__func__
+
+	def recorded(cls, *args, **kwargs)->int:
+		threads.append(threading.current_thread().name)
+		return purge_expired(cls, *args, **kwargs)
+
+	monkeypatch.setattr(Match, "memory_max_bytes", 0)
+	monkeypatch.setattr(Match, "maintenance_batch_size", 2)
+	monkeypatch.setattr(Match, "purge_expired", classmethod(recorded))
+	return threads
+
+
+def fill(build_match, old: list, new: list)->None:
+	"""Writes the matches of `old` two hours ago and the ones of `new` now."""
+	games = []
+	for match_ids, written in ((old, time.time() - 7200), (new, time.time())):
+		for match_id in match_ids:
+			game = build_match(match_id)
+			game.time = written
+			games.append(game)
+	Match.bulk_write(games, commit=True)
+
+
+def select(path: str, query: str)->list:
+	with contextlib.closing(sqlite3.connect(path)) as conn:
+		return conn.execute(query).fetchall()
+
+
+def indexes(path: str)->list:
+	return [row[1] for row in select(path, f"PRAGMA index_list({Match.table_name})")]
+
+
+def test_purge_with_a_storage(tmp_path, monkeypatch, steps, build_match):
+	path = str(tmp_path / "cache.db")
+	storage = AAshe.sqlite.AsyncStorage(path=path)
+	storage.init_database(Match)
+	try:
+		fill(build_match, old=[1, 2, 3, 4, 5], new=[6, 7])
+		# Set after the table was created, the maintenance creates the index.
+		monkeypatch.setattr(Match, "retention", 3600)
+		assert f"{Match.table_name}_time" not in indexes(path)
+
+		report = asyncio.run(AAshe.sqlite.SQLiteMaintenance(cls=Match, interval=3600).run_once())
+	finally:
+		storage.close()
+		Match.storage = None
+		Match.conn.close()
+
+	assert report["purged"] == 5
+	assert [row[0] for row in select(path, f"SELECT matchId FROM {Match.table_name} ORDER BY matchId")] == [6, 7]
+	assert f"{Match.table_name}_time" in indexes(path)
+	# In batches of maintenance_batch_size, on the writer of the storage.
+	assert steps == ["AAshe-sqlite-writer"] * 3
+
+
+def test_purge_with_a_connector(tmp_path, monkeypatch, steps, build_match):
+	path = str(tmp_path / "cache.db")
+	monkeypatch.setattr(Match, "retention", 3600)
+	Match.init_database(path=path)
+	try:
+		fill(build_match, old=[1], new=[2])
+		maintenance = AAshe.sqlite.SQLiteMaintenance(cls=Match, interval=3600)
+		report = asyncio.run(maintenance.run_once())
+	finally:
+		Match.connector = None
+		Match.conn.close()
+
+	assert report["purged"] == 1
+	assert maintenance.purged == 1 and maintenance.runs == 1
+	assert [row[0] for row in select(path, f"SELECT matchId FROM {Match.table_name}")] == [2]
+	assert len(steps) == 1 and steps[0].startswith("AAshe-sqlite-writer")
+
+
+def test_no_purge_without_retention(tmp_path, steps, build_match):
+	path = str(tmp_path / "cache.db")
+	Match.init_database(conn=sqlite3.connect(path))
+	try:
+		fill(build_match, old=[1], new=[])
+		report = asyncio.run(AAshe.sqlite.SQLiteMaintenance(cls=Match, interval=3600).run_once())
+	finally:
+		Match.conn.close()
+
+	assert report["purged"] == 0
+	assert not steps
+	assert len(select(path, f"SELECT * FROM {Match.table_name}")) == 1
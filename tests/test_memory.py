@@ -0,0 +1,98 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import AAshe.match.matches as matches
+import AAshe.summoner.summoners as summoners
+
+Match = matches.Match
+
+
+@pytest.fixture
+def cached(monkeypatch, build_match):
+	"""Gives Match an in-memory database holding one match, and a memory of `memory_max_bytes`."""
+	monkeypatch.setattr(Match, "memory_max_bytes", 64 * 1024 ** 2)
+	Match.init_database(conn=sqlite3.connect(":memory:"))
+	Match.bulk_write([build_match(1)])
+	yield Match.get_memory()
+	Match.conn.close()
+
+
+def read()->Match:
+	_object, = Match.read_all_data(region="euw1", matchId=1)
+	assert Match.participants.is_raw(_object)
+	return _object
+
+
+def test_building_a_lazy_attribute_is_charged(cached):
+	_object = read()
+	Match.remember(_object, region="euw1", matchId=1)
+	raw = cached.size
+	assert raw == _object.memory_size()
+
+	_object.participants
+	_object.teams
+	_object.participantIdentities
+	assert cached.size == _object.memory_size() > raw
+
+
+def test_building_evicts_past_max_bytes(cached):
+	_object = read()
+	cached.max_bytes = _object.memory_size() + 1
+	Match.remember(_object, region="euw1", matchId=1)
+	assert cached.stats()["entries"] == 1
+
+	_object.participants
+	assert cached.stats()["entries"] == 0
+	assert cached.size == 0
+	assert cached.evictions == 1
+
+
+def test_an_entry_kept_under_several_lookups_is_counted_once(monkeypatch):
+	monkeypatch.setattr(summoners.Summoner, "memory_max_bytes", 64 * 1024 ** 2)
+	monkeypatch.setattr(summoners.Summoner, "_memory", None, raising=False)
+	summoner = summoners.Summoner(
+		profileIconId=1, name="name", summonerLevel=30, revisionDate=0,
+		id="id", accountId="account", time=time.time(), region="euw1")
+	summoners.Summoner.remember_summoner(summoner)
+	memory = summoners.Summoner.get_memory()
+	assert memory.stats()["entries"] == 3
+	assert memory.size == summoner.memory_size()
+
+	# The entry is dropped once the last lookup keeping it is.
+	memory.max_bytes = 0
+	memory.evict()
+	assert memory.size == 0 and not memory.objects
+	assert memory.evictions == 3
+
+
+def test_measuring_again_does_not_charge_twice(cached):
+	_object = read()
+	Match.remember(_object, region="euw1", matchId=1)
+	_object.participants
+	# Like a put racing the build, which measured the object with the attribute built.
+	cached.grow(_object)
+	assert cached.size == _object.memory_size()
+
+
+def test_concurrent_puts_charge_once(cached, monkeypatch):
+	_object = read()
+	memory_size = Match.memory_size
+
+	def slow(self)->int:
+		time.sleep(0.01)
+		return memory_size(self)
+
+	monkeypatch.setattr(Match, "memory_size", slow)
+	threads = [
+		threading.Thread(target=Match.remember, args=(_object,), kwargs=dict(region="euw1", matchId=1, index=i))
+		for i in range(4)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+
+	assert cached.stats()["entries"] == 4
+	assert cached.size == memory_size(_object)
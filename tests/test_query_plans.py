@@ -0,0 +1,45 @@
+"""
+EXPLAIN QUERY PLAN of every cache lookup the model getters make.
+
+A lookup fails if it scans its table or sorts its results instead of reading
+them from an index in order.
+"""
+import sqlite3
+
+import pytest
+
+import AAshe.summoner.summoners as summoners
+import AAshe.match.matches as matches
+import AAshe.match.matchlists as matchlists
+import AAshe.match.timelines as timelines
+import AAshe.spectator.activegames as activegames
+import AAshe.lolstatus.sharddata as sharddata
+
+LOOKUPS = [
+	("Summoner.get_summoner(summoner_id)", summoners.Summoner, dict(id=1, region="euw1")),
+	("Summoner.get_summoner(account_id)", summoners.Summoner, dict(accountId=1, region="euw1")),
+	("Summoner.get_summoner(summoner_name)", summoners.Summoner, dict(name="name", region="euw1")),
+	("Summoner.get_summoners", summoners.Summoner, dict(id=[1, 2, 3], region="euw1")),
+	("Match.get_match", matches.Match, dict(matchId=1, region="euw1")),
+	("Match.get_matches", matches.Match, dict(matchId=[1, 2, 3], region="euw1")),
+	("Timeline.get_timeline", timelines.Timeline, dict(matchId=1, region="euw1")),
+	("Timeline.get_timelines", timelines.Timeline, dict(matchId=[1, 2, 3], region="euw1")),
+	("MatchList.get_matchlist", matchlists.MatchList, dict(accountId=1, region="euw1")),
+	("LiveMatch.get_game", activegames.LiveMatch, dict(summonerId=1, region="euw1")),
+	("ShardStatus.get_shardstatus", sharddata.ShardStatus, dict(region="euw1")),
+]
+
+
+@pytest.mark.parametrize("getter, cls, kwargs", LOOKUPS, ids=[getter for getter, _, _ in LOOKUPS])
+def test_lookup_uses_an_index(getter, cls, kwargs):
+	conn = sqlite3.connect(":memory:")
+	cls.init_database(conn=conn)
+	# The bulk getters go through read_cached, which doesn't order, the keys are unique.
+	bulk = any([isinstance(value, list) for value in kwargs.values()])
+	plan = cls.query_plan(order_by=None if bulk else [cls.desc("time")], **kwargs)
+
+	assert plan
+	for detail in plan:
+		assert not detail.startswith("SCAN"), plan
+		assert "TEMP B-TREE" not in detail, plan
+	conn.close()
@@ -0,0 +1,179 @@
+import multiprocessing
+import asyncio
+import sqlite3
+import time
+
+import AAshe.utils.ratelimit as ratelimit
+
+PERIOD = 10
+EVERY = 0.5
+
+
+def peak(slots: list, every: float)->int:
+	"""Most calls within any window [t, t + every)."""
+	slots = sorted(slots)
+	most = 0
+	start = 0
+	for end, t in enumerate(slots):
+		while t - slots[start] >= every:
+			start += 1
+		most = max(most, end - start + 1)
+	return most
+
+
+def worker(path: str, calls: int, start: float, results: multiprocessing.Queue):
+	ratelimit.RateLimit.logger.disabled = True
+
+	async def run()->list:
+		limit = ratelimit.RateLimit(name="Api Key Limit", store=ratelimit.SQLiteStore(path=path))
+		limit.add_limit(period=PERIOD, every=EVERY, region="euw1")
+		await asyncio.sleep(max(0.0, start - time.time()))
+		slots = []
+		for _ in range(calls):
+			await limit.check_cooldown(region="euw1")
+			slots.append(limit.region_limits["euw1"].reserved)
+		return slots
+
+	results.put(asyncio.run(run()))
+
+
+def test_processes_share_the_limits(tmp_path):
+	context = multiprocessing.get_context("fork")
+	results = context.Queue()
+	start = time.time() + 0.5
+	workers, calls = 4, 10
+	processes = [
+		context.Process(target=worker, args=(str(tmp_path / "limits.db"), calls, start, results))
+		for _ in range(workers)]
+	for process in processes:
+		process.start()
+	slots = [slot for _ in processes for slot in results.get(timeout=30)]
+	for process in processes:
+		process.join(timeout=30)
+
+	assert len(slots) == workers * calls
+	assert peak(slots, EVERY) <= PERIOD
+	# Alone, every worker would have sent its calls within the first window.
+	assert max(slots) - min(slots) >= (workers * calls / PERIOD - 1) * EVERY - 0.01
+
+
+def test_penalty_reaches_the_other_processes(tmp_path):
+	path = str(tmp_path / "limits.db")
+	first = ratelimit.RateLimit(name="Api Key Limit", store=ratelimit.SQLiteStore(path=path))
+	second = ratelimit.RateLimit(name="Api Key Limit", store=ratelimit.SQLiteStore(path=path))
+	for limit in (first, second):
+		limit.add_limit(period=PERIOD, every=EVERY, region="euw1")
+
+	penalized = time.time()
+	first.penalize(region="euw1", seconds=0.3)
+	asyncio.run(second.check_cooldown(region="euw1"))
+
+	assert second.region_limits["euw1"].reserved >= penalized + 0.3
+	assert time.time() >= penalized + 0.3
+
+
+def test_seeded_counts_reach_the_other_processes(tmp_path):
+	path = str(tmp_path / "limits.db")
+	first = ratelimit.RateLimit(name="Api Key Limit", store=ratelimit.SQLiteStore(path=path))
+	second = ratelimit.RateLimit(name="Api Key Limit", store=ratelimit.SQLiteStore(path=path))
+
+	seeded = time.time()
+	# The headers of a response of the first process count the whole budget as used.
+	first.add_limit(period=5, every=0.3, region="euw1", count=5)
+	second.add_limit(period=5, every=0.3, region="euw1")
+	asyncio.run(second.check_cooldown(region="euw1"))
+
+	assert second.region_limits["euw1"].reserved >= seeded + 0.3
+
+
+def test_reservation_does_not_block_the_loop(tmp_path):
+	path = str(tmp_path / "limits.db")
+	limit = ratelimit.RateLimit(name="Api Key Limit", store=ratelimit.SQLiteStore(path=path))
+	limit.add_limit(period=PERIOD, every=EVERY, region="euw1")
+	limit.store.connection()
+
+	# Another process in the middle of reserving a slot.
+	other = sqlite3.connect(path, isolation_level=None)
+	other.execute("BEGIN IMMEDIATE")
+
+	async def main()->(list, float):
+		ticks = []
+
+		async def ticker():
+			for _ in range(20):
+				ticks.append(time.perf_counter())
+				await asyncio.sleep(0.01)
+
+		asyncio.get_running_loop().call_later(0.1, other.execute, "COMMIT")
+		start = time.perf_counter()
+		task = asyncio.ensure_future(ticker())
+		await limit.check_cooldown(region="euw1")
+		waited = time.perf_counter() - start
+		await task
+		return ticks, waited
+
+	ticks, waited = asyncio.run(main())
+	assert waited >= 0.09
+	assert max([b - a for a, b in zip(ticks, ticks[1:])]) < 0.05
+
+
+Region = ratelimit.RateLimit.Region
+
+
+def send(limit: Region.Limit, calls: int, now: float=0.0)->list:
+	"""Sends `calls` calls as soon as `limit` allows them, returns their send times."""
+	sent = []
+	for _ in range(calls):
+		now = limit.earliest(now)
+		limit.hit(at=now)
+		sent.append(now)
+	return sent
+
+
+def test_sliding_log():
+	limit = Region.SlidingLog(period=3, every=1.0)
+	assert send(limit, 7) == [0.0, 0.0, 0.0, 1.0, 1.0, 1.0, 2.0]
+	assert limit.earliest(1.5) == 2.0 and limit.earliest(3.0) == 3.0
+
+	# Calls sent at their own pace only wait for the oldest of the last `period`.
+	limit = Region.SlidingLog(period=3, every=1.0)
+	for at in (0.0, 0.4, 0.8):
+		limit.hit(at=at)
+	assert limit.earliest(0.9) == 1.0
+	limit.hit(at=1.0)
+	assert limit.earliest(1.0) == 1.4
+
+	limit.seed(count=5, now=10.0)
+	assert list(limit.log) == [10.0] * 3
+	assert limit.earliest(10.5) == 11.0
+
+
+def test_gcra():
+	limit = Region.GCRA(period=4, every=1.0)
+	assert limit.emission == 0.25
+	assert send(limit, 5) == [0.0, 0.25, 0.5, 0.75, 1.0]
+	# Idle time isn't saved up for later.
+	assert send(limit, 2, now=10.0) == [10.0, 10.25]
+
+	limit.seed(count=2, now=20.0)
+	assert limit.earliest(20.0) == 20.5
+
+
+def test_gcra_burst(monkeypatch):
+	monkeypatch.setattr(Region.GCRA, "burst", 3)
+	limit = Region.GCRA(period=4, every=1.0)
+	assert send(limit, 6) == [0.0, 0.0, 0.0, 0.25, 0.5, 0.75]
+
+
+def test_store_counts_the_calls_with_the_engine(tmp_path):
+	store = ratelimit.SQLiteStore(path=str(tmp_path / "limits.db"))
+
+	def slots(engine: type)->list:
+		limits = [engine(period=4, every=1.0)]
+		name = engine.__name__
+		return [store.try_reserve(name=name, region="euw1", limits=limits, now=100.0) for _ in range(6)]
+
+	assert slots(Region.SlidingLog) == [100.0] * 4 + [101.0] * 2
+	# The same as the engine noting the calls itself.
+	assert slots(Region.GCRA) == send(Region.GCRA(period=4, every=1.0), 6, now=100.0) == [
+		100.0, 100.25, 100.5, 100.75, 101.0, 101.25]
@@ -0,0 +1,59 @@
+import sqlite3
+
+import pytest
+
+import AAshe.sqlite
+import AAshe.match.matches as matches
+
+Match = matches.Match
+
+
+def rows(match: Match)->list:
+	if match.gameDuration < 0:
+		raise ValueError("no rows")
+	return [(match.gameDuration,)]
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+	"""Gives Match a database file with a relation, returns a connection of its own to it."""
+	path = str(tmp_path / "cache.db")
+	monkeypatch.setattr(Match, "memory_max_bytes", 0)
+	monkeypatch.setattr(Match, "relations", [
+		AAshe.sqlite.SQLiteRelation(table_name="match_rows", columns=[("duration", "INTEGER")], rows=rows)])
+	Match.init_database(conn=sqlite3.connect(path))
+	other = sqlite3.connect(path)
+	yield other
+	other.close()
+	Match.conn.close()
+
+
+def test_failed_relation_is_not_committed_later(database, build_match):
+	with pytest.raises(ValueError):
+		build_match(1, gameDuration=-1).write_data(commit=True)
+	build_match(2, gameDuration=2).write_data(commit=True)
+
+	assert [row[0] for row in database.execute(f"SELECT matchId FROM {Match.table_name}")] == [2]
+	assert [row[0] for row in database.execute("SELECT duration FROM match_rows")] == [2]
+
+
+def test_failed_relation_keeps_the_previous_entry(database, build_match):
+	build_match(1, gameDuration=1).write_data(commit=True)
+	with pytest.raises(ValueError):
+		build_match(1, gameDuration=-1).write_data(commit=False)
+	Match.commit()
+
+	assert [row[0] for row in database.execute(f"SELECT gameDuration FROM {Match.table_name}")] == [1]
+	assert [row[0] for row in database.execute("SELECT duration FROM match_rows")] == [1]
+
+
+def test_failed_relation_keeps_the_rest_of_a_bulk_write(database, build_match):
+	# Pending on the connection, not committed yet.
+	build_match(1, gameDuration=1).write_data(commit=False)
+	failed = build_match(3, gameDuration=-1)
+	with pytest.raises(ValueError) as raised:
+		Match.bulk_write([build_match(2, gameDuration=2), failed, build_match(4, gameDuration=4)], commit=True)
+	assert raised.value.objects == [failed]
+
+	assert [row[0] for row in database.execute(f"SELECT matchId FROM {Match.table_name} ORDER BY matchId")] == [1, 2, 4]
+	assert [row[0] for row in database.execute("SELECT duration FROM match_rows ORDER BY duration")] == [1, 2, 4]
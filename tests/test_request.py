@@ -0,0 +1,151 @@
+import asyncio
+import time
+
+import aiohttp
+import aiohttp.test_utils
+import aiohttp.web
+import pytest
+
+import AAshe.errors as errors
+import AAshe.sqlite
+import AAshe.utils.config as config
+import AAshe.utils.ratelimit as ratelimit
+import AAshe.utils.request as request
+
+
+@pytest.fixture(autouse=True)
+def limits(monkeypatch):
+	"""A fresh api key limit per test, and retries that don't take long."""
+	monkeypatch.setattr(ratelimit.RateLimit, "key_limit", ratelimit.RateLimit(name="Api Key Limit"))
+	monkeypatch.setattr(config.Config, "retries", 3)
+	monkeypatch.setattr(config.Config, "retry_backoff", 0.05)
+	# The backoff waits its most, so it can be told apart from no wait.
+	monkeypatch.setattr(request.random, "uniform", lambda low, high: high)
+
+
+def fetch(responses: list, count: bool=True, method_limit: ratelimit.RateLimit=None)->(list, object):
+	"""Runs `make_riot_request` against a server answering with `responses`, a `(status, headers)` per call.
+
+	Returns:
+		tuple: The times the calls arrived at, and the data or the exception raised.
+	"""
+	arrivals = []
+
+	async def handler(_: aiohttp.web.Request)->aiohttp.web.Response:
+		arrivals.append(time.time())
+		status, headers = responses[min(len(arrivals), len(responses)) - 1]
+		body = '{"id": 1}' if status < 400 else '{"status": {"message": "failed"}}'
+		return aiohttp.web.Response(status=status, headers=headers, text=body, content_type="application/json")
+
+	async def main()->object:
+		app = aiohttp.web.Application()
+		app.router.add_get("/{region}/match", handler)
+		async with aiohttp.test_utils.TestServer(app) as server, aiohttp.ClientSession() as session:
+			token = ratelimit.current_method_limit.set(method_limit)
+			try:
+				data, _ = await request.make_riot_request(
+					cls=AAshe.sqlite.SQLite, aiosession=session, region="euw1",
+					url=f"http://{server.host}:{server.port}/{{}}/match", headers={}, count=count)
+				return data
+			except errors.AAsheException as e:
+				return e
+			finally:
+				ratelimit.current_method_limit.reset(token)
+
+	result = asyncio.run(main())
+	return arrivals, result
+
+
+def test_429_waits_for_retry_after():
+	arrivals, data = fetch([
+		(429, {"Retry-After": "0.3", "X-Rate-Limit-Type": "application"}),
+		(200, {})])
+
+	assert data == {"id": 1}
+	assert len(arrivals) == 2
+	assert arrivals[1] - arrivals[0] >= 0.3
+	assert ratelimit.RateLimit.key_limit.region_limits["euw1"].blocked >= arrivals[0] + 0.3
+
+
+def test_5xx_backs_off_exponentially():
+	arrivals, data = fetch([(503, {}), (500, {}), (200, {})])
+
+	assert data == {"id": 1}
+	assert len(arrivals) == 3
+	assert arrivals[1] - arrivals[0] >= 0.05
+	assert arrivals[2] - arrivals[1] >= 0.1
+	# A 5xx holds back only its own call.
+	assert ratelimit.RateLimit.key_limit.region_limits["euw1"].blocked == 0.0
+
+
+@pytest.mark.parametrize("status", request.retry_statuses)
+def test_retried_statuses(status):
+	arrivals, data = fetch([(status, {}), (status, {}), (200, {})])
+
+	assert data == {"id": 1}
+	assert len(arrivals) == 3
+	# Without a Retry-After every status backs off.
+	assert arrivals[1] - arrivals[0] >= 0.05
+	assert arrivals[2] - arrivals[1] >= 0.1
+
+
+@pytest.mark.parametrize("status", request.retry_statuses)
+def test_retry_after_comes_before_the_backoff(status):
+	arrivals, data = fetch([(status, {"Retry-After": "0.3"}), (200, {})])
+
+	assert data == {"id": 1}
+	assert arrivals[1] - arrivals[0] >= 0.3
+
+
+def test_retry_delay(monkeypatch):
+	monkeypatch.setattr(config.Config, "retry_backoff_max", 0.3)
+	assert request.retry_delay(resp_headers={"Retry-After": "2"}, attempt=0) == 2.0
+	assert request.retry_delay(resp_headers={"Retry-After": "2"}, attempt=5) == 2.0
+	# An HTTP date isn't read, the backoff is used instead.
+	assert request.retry_delay(resp_headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}, attempt=0) == 0.05
+
+	assert [request.retry_delay(resp_headers={}, attempt=attempt) for attempt in range(4)] == [0.05, 0.1, 0.2, 0.3]
+	monkeypatch.setattr(request.random, "uniform", lambda low, high: low)
+	assert request.retry_delay(resp_headers=None, attempt=3) == 0
+
+
+def test_gives_up_after_the_retries(monkeypatch):
+	monkeypatch.setattr(config.Config, "retries", 2)
+	arrivals, error = fetch([(500, {})])
+
+	assert isinstance(error, errors.InternalServerError)
+	assert error.server_message == "failed"
+	assert len(arrivals) == 3
+
+
+def test_errors_that_arent_retried():
+	arrivals, error = fetch([(404, {})])
+
+	assert isinstance(error, errors.DataNotFound)
+	assert len(arrivals) == 1
+
+
+def test_method_429_penalizes_the_method_limit():
+	method_limit = ratelimit.RateLimit(name="get_match")
+	method_limit.add_limit(period=100, every=10, region="euw1")
+	arrivals, data = fetch([
+		(429, {"Retry-After": "0.3", "X-Rate-Limit-Type": "method"}),
+		(200, {})], method_limit=method_limit)
+
+	assert data == {"id": 1}
+	assert arrivals[1] - arrivals[0] >= 0.3
+	assert method_limit.region_limits["euw1"].blocked >= arrivals[0] + 0.3
+	assert ratelimit.RateLimit.key_limit.region_limits["euw1"].blocked == 0.0
+
+
+def test_uncounted_calls_wait_for_a_penalty():
+	key_limit = ratelimit.RateLimit.key_limit
+	key_limit.add_limit(period=1, every=10, region="euw1", count=1)
+	penalized = time.time()
+	key_limit.penalize(region="euw1", seconds=0.3)
+
+	arrivals, data = fetch([(200, {})], count=False)
+
+	assert data == {"id": 1}
+	# Held back by the penalty, but not by the limit that's used up.
+	assert penalized + 0.3 <= arrivals[0] < penalized + 1.0
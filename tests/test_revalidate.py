@@ -0,0 +1,115 @@
+import asyncio
+import sqlite3
+import time
+import types
+
+import pytest
+
+import AAshe.sqlite
+import AAshe.utils.ratelimit as ratelimit
+import AAshe.summoner.summoners as summoners
+import AAshe.lolstatus.sharddata as sharddata
+
+Summoner = summoners.Summoner
+ShardStatus = sharddata.ShardStatus
+
+
+def summoner(written: float)->Summoner:
+	return Summoner(
+		profileIconId=1, name="name", summonerLevel=30, revisionDate=0,
+		id=1, accountId=2, time=written, region="euw1")
+
+
+def shard(written: float)->ShardStatus:
+	return ShardStatus(
+		name="EU West", region_tag="eu", hostname="prod.euw1.lol.riotgames.com", services=[], slug="euw",
+		locales=["en_GB"], region="euw1", time=written)
+
+
+CASES = {
+	"summoner": (
+		Summoner, "fetch_summoner", summoner,
+		lambda: Summoner.get_summoner(region="euw1", aiosession=None, summoner_id=1)),
+	"shard": (
+		ShardStatus, "fetch_shardstatus", shard,
+		lambda: ShardStatus.get_shardstatus(region="euw1", aiosession=None)),
+}
+
+
+@pytest.fixture(params=list(CASES))
+def stale(request, monkeypatch):
+	"""Caches an entry past `request_cooldown` but within `stale_while_revalidate`.
+
+	Returns the class, the getter and the fetches, the arguments of each call
+	of the fetch, which only returns a fresh entry once the `release` event is set.
+	"""
+	cls, fetch_name, build, getter = CASES[request.param]
+	monkeypatch.setattr(cls, "request_cooldown", 60)
+	monkeypatch.setattr(cls, "stale_while_revalidate", 3600)
+	monkeypatch.setattr(cls, "memory_max_bytes", 0)
+	monkeypatch.setattr(ratelimit.RateLimit, "key_limit", None)
+	cls.init_database(conn=sqlite3.connect(":memory:"))
+	build(time.time() - 120).write_data()
+	fetches = types.SimpleNamespace(calls=[], release=None)
+
+	async def fetch(region: str, aiosession, **kwargs)->AAshe.sqlite.SQLite:
+		fetches.calls.append(kwargs)
+		await fetches.release.wait()
+		fresh = build(time.time())
+		fresh.write_data()
+		return fresh
+
+	monkeypatch.setattr(cls, fetch_name, fetch)
+	yield cls, getter, fetches
+	cls.conn.close()
+
+
+def test_stale_entry_is_returned_and_refreshed_once(stale):
+	cls, getter, fetches = stale
+
+	async def main():
+		fetches.release = asyncio.Event()
+		# None of them waits for the refresh.
+		entries = await asyncio.wait_for(asyncio.gather(*[getter() for _ in range(5)]), timeout=1)
+		assert all([cls.is_stale(entry) for entry in entries])
+		await asyncio.sleep(0)
+		assert len(fetches.calls) == 1
+
+		fetches.release.set()
+		while AAshe.sqlite.refreshes.calls:
+			await asyncio.sleep(0.01)
+		entry = await getter()
+		assert not cls.is_stale(entry)
+
+	asyncio.run(main())
+	assert len(fetches.calls) == 1
+
+
+def test_no_refresh_while_rate_limited(stale, monkeypatch):
+	cls, getter, fetches = stale
+	key_limit = ratelimit.RateLimit(name="Api Key Limit")
+	key_limit.penalize(region="euw1", seconds=60)
+	monkeypatch.setattr(ratelimit.RateLimit, "key_limit", key_limit)
+
+	async def main():
+		fetches.release = asyncio.Event()
+		entry = await getter()
+		assert cls.is_stale(entry)
+		await asyncio.sleep(0)
+		assert not fetches.calls and not AAshe.sqlite.refreshes.calls
+
+	asyncio.run(main())
+
+
+def test_entry_past_stale_while_revalidate_is_requested(stale, monkeypatch):
+	cls, getter, fetches = stale
+	monkeypatch.setattr(cls, "stale_while_revalidate", 30)
+
+	async def main():
+		fetches.release = asyncio.Event()
+		fetches.release.set()
+		entry = await getter()
+		assert not cls.is_stale(entry)
+
+	asyncio.run(main())
+	assert len(fetches.calls) == 1
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+import AAshe.utils.serialization as serialization
+
+ijson = pytest.importorskip("ijson")
+
+
+class Stream:
+	"""The body of a response, read a few bytes at a time."""
+
+	def __init__(self, data: bytes, size: int=7):
+		self.data = data
+		self.size = size
+
+	async def read(self, size: int)->bytes:
+		chunk, self.data = self.data[:self.size], self.data[self.size:]
+		return chunk
+
+
+def test_stream_items_parses_the_document_once(monkeypatch):
+	document = {
+		"frames": [{"timestamp": 0, "frames": [1, 2]}, {"timestamp": 1, "events": [{"frames": []}]}, []],
+		"frameInterval": 60000}
+	parse_coro = ijson.parse_coro
+	parsers = []
+
+	def counted(*args, **kwargs):
+		parsers.append(args)
+		return parse_coro(*args, **kwargs)
+
+	monkeypatch.setattr(ijson, "parse_coro", counted)
+	frames, intervals = [], []
+	asyncio.run(serialization.stream_items(
+		stream=Stream(serialization.dumps(document)),
+		handlers={"frames.item": frames.append, "frameInterval": intervals.append}))
+	assert frames == document["frames"]
+	assert intervals == [60000]
+	assert len(parsers) == 1
+
+
+def test_stream_items_raises_on_invalid_documents():
+	with pytest.raises(ValueError):
+		asyncio.run(serialization.stream_items(stream=Stream(b'{"frames": [{"a": 1}, {'), handlers={"frames.item": print}))
+
+
+@pytest.mark.parametrize("codec", [codec for codec in serialization.codecs.values() if codec.available])
+def test_list_writer_spills_and_encodes_like_encode(codec, monkeypatch):
+	monkeypatch.setattr(serialization.ListWriter, "spill_bytes", 64)
+	items = [{"frame": i, "participantFrames": {"1": {"x": i}}} for i in range(100)]
+	writer = codec.list_writer()
+	for item in items:
+		writer.append(item)
+	assert writer.file._rolled
+	column = writer.finish()
+	assert writer.file.closed
+	assert column == codec.encode(items)
+	assert serialization.decode(column) == items
+
+
+@pytest.mark.parametrize("codec", [codec for codec in serialization.codecs.values() if codec.available])
+def test_empty_list_writer(codec):
+	assert serialization.decode(codec.list_writer().finish()) == []
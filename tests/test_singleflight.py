@@ -0,0 +1,144 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+import AAshe.sqlite
+import AAshe.utils.singleflight
+import AAshe.match.match
+import AAshe.match.matches
+import AAshe.match.timelines
+import AAshe.summoner.summoner
+import AAshe.summoner.summoners
+
+
+def test_concurrent_lookups_share_one_call():
+	calls = []
+
+	@AAshe.utils.singleflight.coalesced(name="test")
+	async def request(cls, region: str, url: str):
+		calls.append(url)
+		await asyncio.sleep(0.01)
+		return {"url": url}
+
+	async def main():
+		return await asyncio.gather(*[request(None, region="EUW1", url="/match/1") for _ in range(1000)])
+
+	results = asyncio.run(main())
+	assert calls == ["/match/1"]
+	assert len(results) == 1000
+	assert all([result is results[0] for result in results])
+	assert not request.flight.calls
+
+
+def test_different_keys_are_not_shared():
+	calls = []
+
+	@AAshe.utils.singleflight.coalesced(name="test")
+	async def request(cls, region: str, url: str):
+		calls.append((region, url))
+		await asyncio.sleep(0.01)
+		return url
+
+	async def main():
+		return await asyncio.gather(
+			request(None, region="euw1", url="/a"), request(None, region="EUW1", url="/a"),
+			request(None, region="na1", url="/a"), request(None, region="euw1", url="/b"))
+
+	assert asyncio.run(main()) == ["/a", "/a", "/a", "/b"]
+	assert sorted(calls) == [("euw1", "/a"), ("euw1", "/b"), ("na1", "/a")]
+
+
+def test_exception_reaches_every_caller():
+	flight = AAshe.utils.singleflight.SingleFlight(name="test")
+	calls = []
+
+	async def fail():
+		calls.append(1)
+		await asyncio.sleep(0.01)
+		raise KeyError("upstream")
+
+	async def main():
+		return await asyncio.gather(*[flight.do("key", fail) for _ in range(1000)], return_exceptions=True)
+
+	results = asyncio.run(main())
+	assert len(calls) == 1
+	assert all([isinstance(result, KeyError) for result in results])
+	assert not flight.calls
+
+	async def again():
+		return await flight.do("key", fail)
+
+	# The failure isn't kept, the next lookup calls again.
+	with pytest.raises(KeyError):
+		asyncio.run(again())
+	assert len(calls) == 2
+
+
+def test_cancelled_caller_leaves_the_call_to_the_others():
+	flight = AAshe.utils.singleflight.SingleFlight(name="test")
+	calls = []
+
+	async def slow():
+		calls.append(1)
+		await asyncio.sleep(0.05)
+		return "done"
+
+	async def main():
+		cancelled = asyncio.ensure_future(flight.do("key", slow))
+		others = [asyncio.ensure_future(flight.do("key", slow)) for _ in range(999)]
+		await asyncio.sleep(0.01)
+		cancelled.cancel()
+		with pytest.raises(asyncio.CancelledError):
+			await cancelled
+		return await asyncio.gather(*others)
+
+	results = asyncio.run(main())
+	assert calls == [1]
+	assert results == ["done"] * 999
+	assert not flight.calls
+
+
+@pytest.mark.parametrize("case", ["match", "timeline", "summoner"])
+def test_concurrent_fetches_build_and_write_once(case, monkeypatch, match_document, timeline_document):
+	cls, endpoint, request_name, document, fetch = {
+		"match": (
+			AAshe.match.matches.Match, AAshe.match.match.MatchEndpoint, "request_match", match_document(1),
+			lambda cls: cls.fetch_match(region="euw1", aiosession=None, match_id=1)),
+		"timeline": (
+			AAshe.match.timelines.Timeline, AAshe.match.match.TimelineEndpoint, "request_timeline",
+			timeline_document(1), lambda cls: cls.fetch_timeline(region="EUW1", aiosession=None, match_id="1")),
+		"summoner": (
+			AAshe.summoner.summoners.Summoner, AAshe.summoner.summoner.SummonerEndpoint, "request_summoner",
+			{"profileIconId": 1, "name": "Name", "summonerLevel": 30, "revisionDate": 0, "id": 1, "accountId": 2},
+			lambda cls: cls.fetch_summoner(region="euw1", aiosession=None, summoner_id=1)),
+	}[case]
+	requests, writes = [], []
+
+	async def request(**kwargs)->dict:
+		requests.append(kwargs["url"])
+		await asyncio.sleep(0.01)
+		return document
+
+	write_data_async = cls.write_data_async
+
+	async def write(self, commit: bool=True)->bool:
+		writes.append(self)
+		return await write_data_async(self, commit=commit)
+
+	monkeypatch.setattr(endpoint, request_name, request)
+	monkeypatch.setattr(cls, "write_data_async", write)
+	monkeypatch.setattr(cls, "memory_max_bytes", 0)
+	cls.init_database(conn=sqlite3.connect(":memory:"))
+
+	async def main()->list:
+		return await asyncio.gather(*[fetch(cls) for _ in range(20)])
+
+	try:
+		results = asyncio.run(main())
+	finally:
+		cls.conn.close()
+	assert len(requests) == 1
+	assert len(writes) == 1
+	assert all([result is writes[0] for result in results])
+	assert not AAshe.sqlite.fetches.calls
@@ -0,0 +1,89 @@
+import contextlib
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+import AAshe.sqlite
+import AAshe.match.matches as matches
+
+Match = matches.Match
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+	monkeypatch.setattr(Match, "memory_max_bytes", 0)
+	monkeypatch.setattr(Match, "relations", [])
+	storage = AAshe.sqlite.AsyncStorage(path=str(tmp_path / "cache.db"))
+	storage.init_database(Match)
+	yield storage
+	storage.close()
+	Match.storage = None
+
+
+def select(storage: AAshe.sqlite.AsyncStorage, query: str)->list:
+	with contextlib.closing(sqlite3.connect(storage.path)) as conn:
+		return conn.execute(query).fetchall()
+
+
+def count(storage: AAshe.sqlite.AsyncStorage, table: str=Match.table_name)->int:
+	return select(storage, f"SELECT COUNT(*) FROM {table}")[0][0]
+
+
+def test_failed_write_is_rolled_back_alone(storage, build_match):
+	def half_written():
+		build_match(1).execute_write()
+		raise KeyError("after the first write")
+
+	async def main():
+		return await asyncio.gather(
+			build_match(2).write_data_async(), storage.write(half_written), build_match(3).write_data_async(),
+			return_exceptions=True)
+
+	results = asyncio.run(main())
+	assert results[0] is True and results[2] is True
+	assert isinstance(results[1], KeyError)
+	assert sorted([row[0] for row in select(storage, f"SELECT matchId FROM {Match.table_name}")]) == [2, 3]
+
+
+def test_failed_relation_rolls_back_its_entry(storage, monkeypatch, build_match):
+	def rows(match: Match)->list:
+		if match.matchId == 1:
+			raise ValueError("no rows")
+		return [(match.matchId,)]
+
+	monkeypatch.setattr(Match, "relations", [
+		AAshe.sqlite.SQLiteRelation(table_name="match_rows", columns=[("row", "INTEGER")], rows=rows)])
+	storage.init_database(Match)
+
+	async def main():
+		return await asyncio.gather(
+			build_match(1).write_data_async(), Match.bulk_write_async([build_match(2), build_match(3)]),
+			return_exceptions=True)
+
+	results = asyncio.run(main())
+	assert isinstance(results[0], ValueError)
+	assert results[1] == 2
+	assert count(storage) == 2
+	assert count(storage, "match_rows") == 2
+
+
+def test_closed_loop_does_not_stop_the_writer(storage, build_match):
+	def slow():
+		time.sleep(0.2)
+		build_match(1).execute_write()
+
+	async def abandon():
+		# The loop is closed before the write is done.
+		with pytest.raises(asyncio.TimeoutError):
+			await asyncio.wait_for(storage.write(slow), timeout=0.05)
+
+	asyncio.run(abandon())
+
+	async def main():
+		await asyncio.wait_for(build_match(2).write_data_async(), timeout=5)
+
+	asyncio.run(main())
+	assert storage.writer.is_alive()
+	assert count(storage) == 2
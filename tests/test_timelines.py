@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+
+import AAshe.sqlite
+import AAshe.utils.serialization as serialization
+import AAshe.match.timelines as timelines
+
+Timeline = timelines.Timeline
+
+
+class Stream:
+	"""The body of a response, counting the bytes read from it."""
+
+	def __init__(self, data: bytes):
+		self.data = data
+		self.read_bytes = 0
+
+	async def read(self, size: int)->bytes:
+		chunk = self.data[self.read_bytes:self.read_bytes + min(size, 1000)]
+		self.read_bytes += len(chunk)
+		return chunk
+
+
+@pytest.mark.parametrize("codec", [name for name, codec in serialization.codecs.items() if codec.available])
+def test_parse_response_reads_the_body_once(codec, monkeypatch, timeline_document):
+	ijson = pytest.importorskip("ijson")
+	document = timeline_document(1)
+	stream = Stream(serialization.dumps(document))
+	parsers = []
+	parse_coro = ijson.parse_coro
+
+	def counted(*args, **kwargs):
+		parsers.append(args)
+		return parse_coro(*args, **kwargs)
+
+	def decoded(data: bytes):
+		raise AssertionError("The response was decoded again.")
+
+	monkeypatch.setattr(Timeline, "codec", codec)
+	with monkeypatch.context() as patched:
+		patched.setattr(ijson, "parse_coro", counted)
+		patched.setattr(serialization, "loads", decoded)
+		resp_data = asyncio.run(Timeline.parse_response(stream))
+
+	assert len(parsers) == 1
+	assert stream.read_bytes == len(stream.data)
+	assert resp_data["frameInterval"] == 60000
+	assert isinstance(resp_data["frames"], AAshe.sqlite.SQLiteLazy.Raw)
+	assert serialization.decode(resp_data["frames"].data) == document["frames"]
+
+	timeline = Timeline.from_response(region="euw1", match_id=1, resp_data=resp_data)
+	assert Timeline.frames.is_raw(timeline)
+	assert [frame.timestamp for frame in timeline.frames] == [frame["timestamp"] for frame in document["frames"]]
+
+
+def matching(document: dict, type: str=None, start: int=None, end: int=None, **ids)->list:
+	"""The events of `document` `TimelineEvents.query` returns, found one by one."""
+	found = []
+	for i, frame in enumerate(document["frames"]):
+		for event in frame["events"]:
+			if type is not None and event["type"] != type:
+				continue
+			if start is not None and event["timestamp"] < start or end is not None and event["timestamp"] >= end:
+				continue
+			if all([event.get(name) == value for name, value in ids.items()]):
+				found.append((event["type"], event["timestamp"], i))
+	# Stable, the events of a type at the same time stay in the order of the frames.
+	return sorted(found, key=lambda event: event[:2])
+
+
+@pytest.mark.parametrize("type", [None, "CHAMPION_KILL", "WARD_PLACED", "ITEM_PURCHASED", "UNKNOWN_TYPE"])
+@pytest.mark.parametrize("ids", [
+	{}, {"participantId": 3}, {"killerId": 2}, {"creatorId": 4}, {"victimId": 5, "killerId": 1},
+	{"participantId": 99}])
+@pytest.mark.parametrize("start, end", [(None, None), (60000, None), (None, 180000), (90000, 150000)])
+def test_events_query(type, ids, start, end, timeline_document):
+	pytest.importorskip("numpy")
+	document = timeline_document(1, events_per_frame=40)
+	events = timelines.TimelineEvents.from_frames(document["frames"])
+
+	records = events.query(type=type, start=start, end=end, **ids)
+	found = [(events.types[record["type"]], int(record["timestamp"]), int(record["frame"])) for record in records]
+	assert found == matching(document, type=type, start=start, end=end, **ids)
+
+
+def test_events_from_frame_objects(timeline_document, build_timeline):
+	numpy = pytest.importorskip("numpy")
+	document = timeline_document(1)
+	events = timelines.TimelineEvents.from_frames(document["frames"])
+	built = timelines.TimelineEvents.from_frames(build_timeline(1).frames)
+
+	assert len(events) == sum([len(frame["events"]) for frame in document["frames"]])
+	assert (events.types, events.strings) == (built.types, built.strings)
+	assert numpy.array_equal(events.records, built.records)
+	assert not len(timelines.TimelineEvents.from_frames([]).query(type="CHAMPION_KILL", participantId=1))
+
+
+def test_events_records(timeline_document):
+	pytest.importorskip("numpy")
+	document = timeline_document(2)
+	events = timelines.TimelineEvents.from_frames(document["frames"])
+
+	kills = events.query(type="CHAMPION_KILL")
+	assert len(kills) == len(matching(document, type="CHAMPION_KILL")) > 0
+	for record in kills:
+		event, = [
+			event for event in document["frames"][record["frame"]]["events"]
+			if event["type"] == "CHAMPION_KILL" and event["timestamp"] == record["timestamp"]]
+		assert (record["killerId"], record["victimId"]) == (event["killerId"], event["victimId"])
+		assert (record["x"], record["y"]) == (event["position"]["x"], event["position"]["y"])
+		assert record["assistingParticipantIds"] == sum([1 << i for i in event["assistingParticipantIds"]])
+		# Missing from a kill.
+		assert record["participantId"] == record["creatorId"] == record["wardType"] == -1
+
+	for record in events.query(type="WARD_PLACED"):
+		assert events.strings[record["wardType"]] == "YELLOW_TRINKET"
+		assert record["x"] == record["y"] == -1
+
+	with pytest.raises(KeyError):
+		events.query(itemId=1001)
+
+
+def test_to_arrays(timeline_document, build_timeline):
+	numpy = pytest.importorskip("numpy")
+	document = timeline_document(3, minutes=5)
+	# A participant missing from a frame, and one without a position.
+	del document["frames"][2]["participantFrames"]["7"]
+	del document["frames"][4]["participantFrames"]["2"]["position"]
+
+	timeline = Timeline.from_response(region="euw1", match_id=3, resp_data=document)
+	column = serialization.get_codec(Timeline.codec).encode(document["frames"])
+	raw = Timeline(matchId=3, region="euw1", frameInterval=60000, frames=AAshe.sqlite.SQLiteLazy.Raw(column))
+	for arrays in (timelines.TimelineArrays.from_frames(document["frames"]), timeline.to_arrays(), raw.to_arrays()):
+		assert arrays.timestamps.shape == (6,) and arrays.timestamps.dtype == numpy.float64
+		assert arrays.participantIds.tolist() == list(range(1, 11)) and arrays.participantIds.dtype == numpy.int64
+		for name in timelines.TimelineArrays.names + ("x", "y"):
+			values = getattr(arrays, name)
+			assert values.shape == (6, 10) and values.dtype == numpy.float64
+		assert arrays.timestamps.tolist() == [minute * 60000 for minute in range(6)]
+
+		for minute, frame in enumerate(document["frames"]):
+			for participant_id in range(1, 11):
+				column = participant_id - 1
+				participant_frame = frame["participantFrames"].get(str(participant_id))
+				if participant_frame is None:
+					assert all([numpy.isnan(getattr(arrays, name)[minute, column]) for name in ("totalGold", "x")])
+					continue
+				assert arrays.totalGold[minute, column] == 500 + minute * 100 * participant_id
+				assert arrays.xp[minute, column] == minute * 10 * participant_id
+				assert arrays.minionsKilled[minute, column] == minute * participant_id
+				assert arrays.level[minute, column] == min(18, 1 + minute // 2)
+				position = participant_frame.get("position")
+				if position is None:
+					assert numpy.isnan(arrays.x[minute, column]) and numpy.isnan(arrays.y[minute, column])
+				else:
+					assert (arrays.x[minute, column], arrays.y[minute, column]) == (position["x"], position["y"])
+
+		# Blue minus red, the missing participant counts as 0.
+		assert arrays.difference("xp")[1] == 10 * (sum(range(1, 6)) - sum(range(6, 11)))
+		assert arrays.difference("xp")[2] == 20 * (sum(range(1, 6)) - sum(range(6, 11)) + 7)
+
+	# The frames of a cached timeline are not built.
+	assert Timeline.frames.is_raw(raw)
@@ -0,0 +1,104 @@
+import itertools
+import typing
+import asyncio
+import logging
+
+import AAshe.utils.ratelimit as ratelimit
+
+logger = logging.getLogger(__name__)
+
+default_concurrency = 10
+# Used when the key limits of the region are not known yet.
+
+chunk_size = 500
+# Keys per `IN (...)` query, below SQLite's default limit of 999 variables.
+
+
+def chunks(iterable: typing.Iterable, size: int=None)->typing.Iterator[list]:
+	"""Splits `iterable` into lists of at most `size` entries."""
+	iterator = iter(iterable)
+	while True:
+		chunk = list(itertools.islice(iterator, size or chunk_size))
+		if not chunk:
+			return
+		yield chunk
+
+
+def concurrency_for(region: str)->int:
+	"""Returns how many requests may be in flight for `region`.
+
+	That is the burst of the shortest key limit, anything above it would only
+	wait in `RateLimit.check_cooldown` while holding on to a connection.
+
+	Args:
+		region(str): Region the requests are sent to.
+
+	Returns:
+		int: The concurrency cap.
+	"""
+	key_limit = ratelimit.RateLimit.key_limit
+	region_limit = key_limit.region_limits.get(region.lower()) if key_limit else None
+	if region_limit is None or not region_limit.limits:
+		return default_concurrency
+	return max(1, min(region_limit.limits, key=lambda limit: limit.every).period)
+
+
+async def stream(
+		keys: typing.Iterable,
+		func: typing.Callable,
+		concurrency: int,
+		return_exceptions: bool=False)->typing.AsyncIterator:
+	"""Awaits `func(key)` for every key with at most `concurrency` calls in flight.
+
+	Results are yielded as they complete, not in the order of `keys`. The keys are
+	consumed lazily and at most `concurrency` results are held at a time, so it
+	can run through any number of keys.
+
+	Args:
+		keys(typing.Iterable): Keys to call `func` with.
+		func(typing.Callable): Coroutine function taking a single key.
+		concurrency(int): Most calls in flight at the same time.
+		return_exceptions(bool): Yield the exception raised for a key instead of
+			raising it and stopping the rest of the calls. Either way the key is
+			set as the `key` of the exception, to tell which one failed.
+
+	Returns:
+		typing.AsyncIterator: The results of the calls.
+	"""
+	keys = iter(keys)
+	# Unbounded so a worker can always tell it's done, `held` caps the results waiting instead.
+	queue = asyncio.Queue()
+	held = asyncio.Semaphore(max(1, concurrency))
+	done = object()
+
+	async def worker():
+		try:
+			for key in keys:
+				try:
+					result = await func(key)
+				except Exception as exception:
+					logger.debug(msg=f"Call for {key} raised {exception!r}.")
+					exception.key = key
+					result = exception
+				await held.acquire()
+				queue.put_nowait(result)
+		finally:
+			# Also when a call raises a BaseException, which is raised below once the workers are done.
+			queue.put_nowait(done)
+
+	workers = [asyncio.ensure_future(worker()) for _ in range(max(1, concurrency))]
+	running = len(workers)
+	try:
+		while running:
+			result = await queue.get()
+			if result is done:
+				running -= 1
+				continue
+			held.release()
+			if isinstance(result, Exception) and not return_exceptions:
+				raise result
+			yield result
+		await asyncio.gather(*workers)
+	finally:
+		for task in workers:
+			task.cancel()
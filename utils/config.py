@@ -1,7 +1,9 @@
 import traceback
-import aiohttp
 import sqlite3
 import asyncio
+import typing
+
+import AAshe.client
 
 regions = [
 	"BR1",
@@ -25,6 +27,13 @@ class Config:
 	sql_cache = True
 	conn = None
 	
+	retries = 3
+	# How many times a call is retried after a 429, 500, 502, 503 or 504 response.
+	retry_backoff = 0.5
+	# Seconds the first retry waits at most without a Retry-After, doubled for every retry after it.
+	retry_backoff_max = 30.0
+	# The most seconds a retry waits without a Retry-After.
+	
 	def __init__(self):
 		pass
 	
@@ -37,27 +46,33 @@ class Config:
 			
 	@classmethod
 	def initiate(cls, api_key, conn: sqlite3.Connection=None):
-		cls.__API_KEY__ = api_key
+		cls.api_key = api_key
 		if conn:
 			cls.__sql_cache__ = True
 			cls.__conn__ = conn
 			cls.__c__ = conn.cursor()
 
 
-def run_async(func: asyncio.coroutine, **kwargs)->object:
-	"""Allows testing within the docstrings"""
+def run_async(func: typing.Callable, **kwargs)->object:
+	"""Allows testing within the docstrings, using the shared client's pooled session.
+	
+	The session is bound to the loop of the call, it's closed with its connections once the call is done.
+	"""
 	loop = asyncio.get_event_loop()
-	aiosession = aiohttp.ClientSession(loop=loop)
+	
+	async def call():
+		client = AAshe.client.AAshe.shared()
+		kwargs["aiosession"] = client.aiosession
+		try:
+			return await func(**kwargs)
+		finally:
+			await client.close()
 
 	try:
-		kwargs["aiosession"] = aiosession
-		m = loop.run_until_complete(func(**kwargs))
-		# loop.run_forever()
+		m = loop.run_until_complete(call())
 
 	except:
 		traceback.print_exc()
 		m = None
 
-	aiosession.close()
-
 	return m
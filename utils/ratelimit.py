@@ -1,10 +1,222 @@
-import AAshe.utils.config as config
 import AAshe.sqlite
+import collections
+import bisect
+import contextvars
+import threading
+import sqlite3
+import typing
 import time
 import asyncio
 import logging
 
 
+current_method_limit = contextvars.ContextVar("current_method_limit", default=None)
+# The method limit of the endpoint currently making a request, so a 429 of type
+# "method" can be fed back into it from the request layer.
+
+
+class SQLiteStore:
+	"""
+	Keeps the sent calls in a SQLite table, shared by every process using the same file.
+	
+	Each process still learns the limits from the headers, but the slots are
+	reserved against the calls of all of them, inside a `BEGIN IMMEDIATE`
+	transaction so no two processes can hand out the same slot. Only the send
+	times are stored, the engine of each limit counts them as it would its own. The counts
+	seeded from the headers and the penalties of a 429 are written there too,
+	so the other processes hold back as well.
+	
+	The transaction is never waited for on the event loop, while another
+	process holds it the reservation sleeps `retry_interval` and tries again.
+	"""
+	
+	logger = logging.getLogger(__name__)
+	table_name = "aashe_rate_limit"
+	
+	retry_interval = 0.001
+	max_retry_interval = 0.05
+	# Seconds slept before trying the transaction again, doubled up to the max while it's held.
+	
+	__slots__ = (
+		"path",  # type: str
+		"timeout",  # type: float
+		"local",  # type: threading.local
+	)
+	
+	def __init__(self, path: str, timeout: float=30.0):
+		"""
+		Args:
+			path(str): The database file shared by the processes.
+			timeout(float): Seconds a reservation waits for the other processes at most.
+		"""
+		self.path = path
+		self.timeout = timeout
+		self.local = threading.local()
+	
+	def __repr__(self):
+		return "<{}:{}>".format(self.__class__.__name__, self.path)
+	
+	def connection(self)->sqlite3.Connection:
+		"""Returns the connection of the current thread, connections can't be shared between threads."""
+		conn = getattr(self.local, "conn", None)
+		if conn is None:
+			# Fails at once instead of blocking when another process is writing, see `reserve`.
+			conn = sqlite3.connect(self.path, timeout=0, isolation_level=None)
+			for query in (
+					"PRAGMA journal_mode=WAL",
+					f"CREATE TABLE IF NOT EXISTS {self.table_name}(name TEXT, region TEXT, sent REAL)",
+					f"CREATE INDEX IF NOT EXISTS {self.table_name}_sent ON {self.table_name}(name, region, sent)",
+					f"CREATE TABLE IF NOT EXISTS {self.table_name}_blocked("
+					f"name TEXT, region TEXT, until REAL, UNIQUE(name, region))"):
+				self.execute(conn, query)
+			self.local.conn = conn
+		return conn
+	
+	def execute(self, conn: sqlite3.Connection, query: str)->None:
+		"""Executes a statement of `connection`, waiting out the locks of the other processes."""
+		deadline = time.time() + self.timeout
+		while True:
+			try:
+				conn.execute(query)
+				return
+			except sqlite3.OperationalError as e:
+				if not self.is_locked(e) or time.time() > deadline:
+					raise
+				time.sleep(self.retry_interval)
+	
+	@staticmethod
+	def is_locked(error: sqlite3.OperationalError)->bool:
+		"""Returns if `error` comes from another connection holding the database."""
+		return "locked" in str(error) or "busy" in str(error)
+	
+	def blocked(self, name: str, region: str)->float:
+		"""Returns the UNIX time no call of the limiter `name` is sent before in `region`, 0 if there is none.
+		
+		A read, which WAL lets through while another process writes.
+		"""
+		row = self.connection().execute(
+			f"SELECT until FROM {self.table_name}_blocked WHERE name=(?) AND region=(?)", (name, region)).fetchone()
+		return row[0] if row else 0.0
+	
+	def try_reserve(
+			self,
+			name: str,
+			region: str,
+			limits: typing.List['RateLimit.Region.Limit'],
+			now: float,
+			blocked: float=0.0,
+			seeds: typing.List[typing.Tuple[float, int, float]]=(),
+			reserve: bool=True)->typing.Optional[float]:
+		"""Hands out the next send slot for the limiter `name` in `region`, if no other process is reserving one.
+		
+		Args:
+			name(str): Name of the limiter, e.g. the api key or the method.
+			region(str): Region the call is made to.
+			limits(list): Limits of the region, the stored calls are counted by their engine, see `replay`.
+			now(float): Current UNIX time.
+			blocked(float): UNIX time this process was told by a 429 to wait until.
+			seeds(list): `(every, count, at)` of the calls the headers counted
+				in a window at `at`, see `seed`.
+			reserve(bool): Only write `blocked` and `seeds`, without reserving a slot.
+		
+		Returns:
+			float: UNIX time the call may be sent at, or the one calls are blocked
+				until without `reserve`. None if the transaction is held elsewhere.
+		"""
+		conn = self.connection()
+		try:
+			conn.execute("BEGIN IMMEDIATE")
+		except sqlite3.OperationalError as e:
+			if self.is_locked(e):
+				return None
+			raise
+		
+		try:
+			if blocked > now:
+				conn.execute(
+					f"INSERT INTO {self.table_name}_blocked(name, region, until) VALUES (?, ?, ?) "
+					f"ON CONFLICT(name, region) DO UPDATE SET until=MAX(until, excluded.until)",
+					(name, region, blocked))
+			blocked, = conn.execute(
+				f"SELECT MAX(until) FROM {self.table_name}_blocked WHERE name=(?) AND region=(?)",
+				(name, region)).fetchone()
+			send_at = max(now, blocked or 0.0)
+			
+			# The windows of the shorter limits are seeded first, the calls missing
+			# from a longer one are put just before them so they aren't counted twice.
+			before = 0.0
+			for every, count, at in sorted(seeds):
+				counted, = conn.execute(
+					f"SELECT COUNT(*) FROM {self.table_name} WHERE name=(?) AND region=(?) AND sent > (?)",
+					(name, region, at - every)).fetchone()
+				conn.executemany(
+					f"INSERT INTO {self.table_name}(name, region, sent) VALUES (?, ?, ?)",
+					[(name, region, at - before)] * max(0, count - counted))
+				before = every
+			
+			if reserve:
+				# Slots are handed out in order, so the new one is the latest.
+				latest, = conn.execute(
+					f"SELECT MAX(sent) FROM {self.table_name} WHERE name=(?) AND region=(?)",
+					(name, region)).fetchone()
+				send_at = max(send_at, latest or 0.0)
+				
+				sent = [row[0] for row in conn.execute(
+					f"SELECT sent FROM {self.table_name} WHERE name=(?) AND region=(?) ORDER BY sent",
+					(name, region))]
+				for limit in limits:
+					send_at = max(send_at, self.replay(limit, sent).earliest(send_at))
+				
+				conn.execute(
+					f"INSERT INTO {self.table_name}(name, region, sent) VALUES (?, ?, ?)",
+					(name, region, send_at))
+				
+				if limits:
+					conn.execute(
+						f"DELETE FROM {self.table_name} WHERE name=(?) AND region=(?) AND sent < (?)",
+						(name, region, send_at - max([limit.every for limit in limits])))
+			
+			conn.execute("COMMIT")
+		except:
+			conn.execute("ROLLBACK")
+			raise
+		
+		return send_at
+	
+	@staticmethod
+	def replay(limit: 'RateLimit.Region.Limit', sent: typing.List[float])->'RateLimit.Region.Limit':
+		"""Returns a new limit of the engine of `limit`, which noted the calls of `sent` within its window.
+		
+		The store only keeps the send times, each engine rebuilds its own state from them.
+		
+		Args:
+			limit(RateLimit.Region.Limit): Limit of this process, only its class, `period` and `every` are used.
+			sent(list): UNIX times of the calls of every process, in order.
+		"""
+		replayed = limit.__class__(period=limit.period, every=limit.every)
+		if sent:
+			for at in sent[bisect.bisect_right(sent, sent[-1] - limit.every):]:
+				replayed.hit(at=at)
+		return replayed
+	
+	async def reserve(self, name: str, region: str, limits: typing.List['RateLimit.Region.Limit'], **kwargs)->float:
+		"""`try_reserve`, sleeping on the event loop while another process holds the transaction.
+		
+		Raises:
+			sqlite3.OperationalError: If the transaction couldn't be had for `timeout` seconds.
+		"""
+		deadline = time.time() + self.timeout
+		interval = self.retry_interval
+		while True:
+			send_at = self.try_reserve(name=name, region=region, limits=limits, now=time.time(), **kwargs)
+			if send_at is not None:
+				return send_at
+			if time.time() > deadline:
+				raise sqlite3.OperationalError(f"{self.path} stayed locked for {self.timeout}s.")
+			await asyncio.sleep(interval)
+			interval = min(interval * 2, self.max_retry_interval)
+
+
 class RateLimit:
 	
 	logger = logging.getLogger(__name__)
@@ -21,6 +233,13 @@ class RateLimit:
 		__quiet__ = False
 		
 		class Limit:
+			"""
+			Fixed window limit, the window starts with the first call and
+			allows `period` calls until `every` seconds has passed.
+			
+			Every limit engine answers the same two questions,
+			`earliest` when the next call may be sent and `hit` to note a call.
+			"""
 			
 			__quiet__ = False
 			
@@ -41,14 +260,101 @@ class RateLimit:
 			
 			def __repr__(self):
 				return "<{}/{}s:count-{}, {}>".format(self.period, self.every, self.calls, self.calls == self.period)
+			
+			def earliest(self, now: float)->float:
+				"""Returns the earliest time a call can be sent, `now` if there is no need to wait."""
+				if now - self.first_call >= self.every or self.calls < self.period:
+					return now
+				return self.first_call + self.every
+			
+			def hit(self, at: float)->None:
+				"""Notes a call sent at `at`."""
+				if at - self.first_call >= self.every:
+					self.first_call = at
+					self.calls = 0
+				self.calls += 1
+			
+			def seed(self, count: int, now: float)->None:
+				"""Replaces the state with `count` calls the server has already counted in the current window."""
+				self.first_call = now
+				self.calls = count
+		
+		class SlidingLog(Limit):
+			"""
+			Sliding window limit, keeps the time of the last `period` calls.
+			
+			A call is allowed once the oldest of them is `every` seconds old,
+			so no window of `every` seconds ever holds more than `period` calls.
+			"""
+			
+			__slots__ = (
+				"log",  # type: collections.deque
+			)
+			
+			def __init__(self, period, every):
+				super().__init__(period=period, every=every)
+				self.log = collections.deque(maxlen=period)
+			
+			def __repr__(self):
+				return "<{}/{}s:log-{}>".format(self.period, self.every, len(self.log))
+			
+			def earliest(self, now: float)->float:
+				if len(self.log) < self.period:
+					return now
+				return max(now, self.log[0] + self.every)
+			
+			def hit(self, at: float)->None:
+				self.log.append(at)
+			
+			def seed(self, count: int, now: float)->None:
+				self.log.clear()
+				self.log.extend([now] * min(count, self.period))
+		
+		class GCRA(Limit):
+			"""
+			Generic cell rate algorithm, spaces calls `every / period` seconds apart.
+			
+			`burst` calls may be sent back to back. Riot counts fixed windows,
+			so anything above 1 can put more than `period` calls in a window.
+			"""
+			
+			burst = 1
+			
+			__slots__ = (
+				"tat",  # type: float
+			)
+			
+			def __init__(self, period, every):
+				super().__init__(period=period, every=every)
+				# Theoretical arrival time of the next call.
+				self.tat = 0.0
+			
+			def __repr__(self):
+				return "<{}/{}s:tat-{:.3f}>".format(self.period, self.every, self.tat)
+			
+			@property
+			def emission(self)->float:
+				return self.every / self.period
+			
+			def earliest(self, now: float)->float:
+				return max(now, self.tat - (self.burst - 1) * self.emission)
+			
+			def hit(self, at: float)->None:
+				self.tat = max(self.tat, at) + self.emission
+			
+			def seed(self, count: int, now: float)->None:
+				self.tat = now + count * self.emission
 		
 		__slots__ = (
 			"region",  # type: str
 			"limits",  # type: ['Limit']
 			
 			"time",  # type: float
+			"reserved",  # type: float
+			"blocked",  # type: float
+			"seeds",  # type: typing.List[typing.Tuple[float, int, float]]
 			
-			"lock"  # type: asyncio.Lock
+			"lock"  # type: threading.Lock
 		)
 		
 		def __init__(self, region: str, lock: bool):
@@ -56,9 +362,16 @@ class RateLimit:
 			self.limits = list()
 			
 			self.time = 0
+			# The latest send slot handed out, slots are handed out in order.
+			self.reserved = 0.0
+			# No call is sent before this, set from the Retry-After of a 429.
+			self.blocked = 0.0
+			# `(every, count, at)` of the counts seeded from the headers, until they are written to the store.
+			self.seeds = []
 			
+			# Only held while handing out a slot, never while waiting for it.
 			if lock:
-				self.lock = asyncio.Lock()
+				self.lock = threading.Lock()
 			else:
 				self.lock = None
 		
@@ -68,16 +381,32 @@ class RateLimit:
 		def add_limit(self, limit: Limit):
 			self.limits.append(limit)
 	
+	default_engine = Region.SlidingLog
+	# The limit engine used by new RateLimit objects, any subclass of `Region.Limit`.
+	
+	default_store = None  # type: SQLiteStore
+	# Where new RateLimit objects keep their sent calls, None keeps them in this process.
+	# Set it to a `SQLiteStore` to share the limits between processes using the same api key.
+	
 	__slots__ = (
 		"name",  # type: str
 		"time",  # type: float
 		"use_lock",  # type: bool
+		"engine",  # type: typing.Type[RateLimit.Region.Limit]
+		"store",  # type: SQLiteStore
 		"region_limits"  # type: dict
 	)
 	
-	def __init__(self, name: str, use_lock=True):
+	def __init__(
+			self,
+			name: str,
+			use_lock=True,
+			engine: typing.Type['RateLimit.Region.Limit']=None,
+			store: SQLiteStore=None):
 		self.name = name
 		self.use_lock = use_lock
+		self.engine = engine or self.__class__.default_engine
+		self.store = store or self.__class__.default_store
 		self.time = time.time()
 		self.region_limits = {}
 	
@@ -89,7 +418,8 @@ class RateLimit:
 		
 		for limit in region_limit.limits:
 			if limit.period == period and region_limit.region == region.lower():
-				limit.calls = calls
+				limit.seed(count=calls, now=time.time())
+				self.seed(region_limit=region_limit, every=limit.every, count=calls)
 	
 	def add_limit(self, period, every, region, count=0):
 		if region.lower() not in self.region_limits:
@@ -103,69 +433,150 @@ class RateLimit:
 				self.logger.warning(msg="Unable to add limit due to existing one")
 				return False
 		
-		region_limit.add_limit(RateLimit.Region.Limit(period=period, every=every))
+		limit = self.engine(period=period, every=every)
+		if count:
+			limit.seed(count=count, now=time.time())
+			self.seed(region_limit=region_limit, every=every, count=count)
+		region_limit.add_limit(limit)
 		return True
 	
-	async def check_cooldown(self, region: str, count: bool= True) -> None or int:
-		"""Checks the limits and how many requests are made."""
-		# Checks if more time than `every` has passed.
+	def seed(self, region_limit: Region, every: float, count: int)->None:
+		"""Writes the calls the headers counted in the current window to the store, if there is one.
+		
+		They're kept on the region until the store is free to write them, at the latest with the next slot reserved.
+		"""
+		if self.store is None:
+			return
+		region_limit.seeds.append((every, count, time.time()))
+		self.publish(region_limit=region_limit)
+	
+	def publish(self, region_limit: Region)->None:
+		"""Writes the seeds and penalty of the region to the store, unless another process is writing."""
+		seeds = list(region_limit.seeds)
+		if self.store.try_reserve(
+				name=self.name, region=region_limit.region.lower(), limits=region_limit.limits, now=time.time(),
+				blocked=region_limit.blocked, seeds=seeds, reserve=False) is not None:
+			del region_limit.seeds[:len(seeds)]
+	
+	async def check_cooldown(self, region: str, count: bool= True) -> None:
+		"""Waits until the call may be sent according to the limits of the region.
+		
+		Calls that don't count on the limits are only held back while the region is penalized.
+		"""
 		if region.lower() not in self.region_limits:
 			self.logger.info(msg="Region was not within dictionary, adding.")
 			self.region_limits[region.lower()] = self.__class__.Region(region=region, lock=self.use_lock)
-			return True
+			return None
 		
 		region_limit = self.region_limits[region.lower()]
 		
+		if not count:
+			blocked = region_limit.blocked
+			if self.store is not None:
+				blocked = max(blocked, self.store.blocked(name=self.name, region=region_limit.region.lower()))
+			return await self.sleep_until(region_limit=region_limit, send_at=blocked)
+		
 		# You might ask why the fuck I did this.
 		# The same limit class is used for method limits and api key limits.
 		# And I dont want to lock down an entire region because of it.
-		# Though this does create a potential hazard if you use more than one asyncio Loop.
-		if self.use_lock:
-			with await region_limit.lock:
-				return await self.process_cooldown(region_limit=region_limit, count=count)
-		return await self.process_cooldown(region_limit=region_limit, count=count)
-	
-	async def process_cooldown(self, region_limit: Region, count: bool):
-		limit_reset = []
-		time_to_sleep = 0
-		for limit in region_limit.limits:
-			t = self.process_limit(limit=limit, limit_reset=limit_reset, count=count)
-			
-			if t > time_to_sleep:
-				time_to_sleep = t
+		# So the slot is reserved under the lock, and slept for after it's released,
+		# the waiters all sleep at the same time and wake in the order they came.
+		# With a store its transaction orders the slots instead, between processes
+		# and between the coroutines of this one, and is retried without blocking the loop.
+		if self.store is not None:
+			send_at = await self.reserve_shared(region_limit=region_limit)
+		elif self.use_lock:
+			with region_limit.lock:
+				send_at = self.reserve(region_limit=region_limit)
+		else:
+			send_at = self.reserve(region_limit=region_limit)
 		
-		if time_to_sleep > 0:
-			self.logger.critical(msg=f"LIMIT: waiting for cooldown. {time_to_sleep + self.margin_of_error}s")
-			await asyncio.sleep(time_to_sleep + self.margin_of_error)
+		await self.sleep_until(region_limit=region_limit, send_at=send_at)
+	
+	async def sleep_until(self, region_limit: Region, send_at: float)->None:
+		"""Sleeps until `send_at`, and after it while the region is blocked.
+		
+		A penalty can come in while sleeping, then the slot is pushed back. With
+		a store the penalties of the other processes count as well.
+		"""
+		delay = send_at - time.time()
+		while delay > 0:
+			self.logger.critical(msg=f"LIMIT: waiting for cooldown. {delay + self.margin_of_error}s")
+			await asyncio.sleep(delay + self.margin_of_error)
+			blocked = region_limit.blocked
+			if self.store is not None:
+				blocked = max(blocked, self.store.blocked(name=self.name, region=region_limit.region.lower()))
+			delay = blocked - time.time()
+	
+	def penalize(self, region: str, seconds: float)->None:
+		"""Holds back every call to the region for `seconds`, including those already waiting.
 		
-		if limit_reset:
-			for limit in limit_reset:
-				limit.first_call = time.time()
+		Args:
+			region(str): Region the penalty applies to.
+			seconds(float): Seconds from now until calls may be sent again, usually the Retry-After.
+		"""
+		if region.lower() not in self.region_limits:
+			self.region_limits[region.lower()] = self.__class__.Region(region=region, lock=self.use_lock)
 		
-		del limit_reset
+		region_limit = self.region_limits[region.lower()]
+		region_limit.blocked = max(region_limit.blocked, time.time() + seconds)
+		self.logger.warning(msg=f"LIMIT: {self.name} penalized for {seconds}s in {region}.")
+		if self.store is not None:
+			self.publish(region_limit=region_limit)
 	
-	@staticmethod
-	def process_limit(limit: Region.Limit, limit_reset: list, count: bool) -> int:
-		time_to_sleep = 0
-		
-		# In case time window has expired, and its starting again.
-		# - Adds the limit to note the time when it fires a request.
-		if time.time() - limit.first_call > limit.every:
-			limit_reset.append(limit)
-			limit.calls = 0
-		
-		# # A calculation so it waits the exact amount until it goes off cooldown. (Only keeps the highest wait time)
-		# - Also adds the limit to note when it start counting again.
-		elif limit.calls >= limit.period:
-			if limit.every - (time.time() - limit.first_call) > time_to_sleep:
-				time_to_sleep = limit.every - (time.time() - limit.first_call)
-				limit_reset.append(limit)
-			limit.calls = 0
+	def delay(self, region: str)->float:
+		"""Returns the seconds a call to the region would wait for if it was sent now, without reserving a slot.
 		
-		if count:
-			limit.calls += 1
+		With a store only the calls of this process are accounted for.
+		"""
+		region_limit = self.region_limits.get(region.lower())
+		if region_limit is None:
+			return 0.0
 		
-		return time_to_sleep
+		now = time.time()
+		send_at = max([limit.earliest(now) for limit in region_limit.limits], default=now)
+		return max(send_at, region_limit.reserved, region_limit.blocked) - now
+	
+	def reserve(self, region_limit: Region) -> float:
+		"""Hands out the next send slot of the region and notes it on every limit.
+		
+		Only the calls of this process are accounted for, with a store
+		`check_cooldown` reserves the slot there instead.
+		
+		Args:
+			region_limit(RateLimit.Region): Region to reserve the slot in.
+		
+		Returns:
+			float: UNIX time the call may be sent at.
+		"""
+		now = time.time()
+		
+		send_at = max([limit.earliest(now) for limit in region_limit.limits], default=now)
+		send_at = max(send_at, region_limit.reserved, region_limit.blocked)
+		
+		for limit in region_limit.limits:
+			limit.hit(at=send_at)
+		region_limit.reserved = send_at
+		
+		return send_at
+	
+	async def reserve_shared(self, region_limit: Region)->float:
+		"""Hands out the next send slot of the region from the store, against the calls of every process.
+		
+		The seeds and the penalty of the region are written to the store with it.
+		
+		Args:
+			region_limit(RateLimit.Region): Region to reserve the slot in.
+		
+		Returns:
+			float: UNIX time the call may be sent at.
+		"""
+		seeds = list(region_limit.seeds)
+		region_limit.reserved = await self.store.reserve(
+			name=self.name, region=region_limit.region.lower(), limits=region_limit.limits,
+			blocked=region_limit.blocked, seeds=seeds)
+		del region_limit.seeds[:len(seeds)]
+		return region_limit.reserved
 	
 	def __repr__(self):
 		return "<{}>".format(self.name)
@@ -180,11 +591,11 @@ def method_limited(refresh_cooldown=3600, name=None, use_lock=True):
 	:param int refresh_cooldown: Amount of time before it refreshes.
 	:param str name: Name of the limiter.
 	:param bool count: If it should count on the api key. (Not all endpoints count on it)
-	:param bool use_lock: If to use the asyncio locks to lock down regions.
+	:param bool use_lock: If to lock the regions while a send slot is reserved.
 	:return: Decorated function that will forward method invocations if the time window has elapsed.
 	"""
 	
-	def decorator(func: asyncio.coroutine):
+	def decorator(func: typing.Callable):
 		"""
 		Extend the behaviour of the following
 		function, forwarding method invocations
@@ -206,7 +617,11 @@ def method_limited(refresh_cooldown=3600, name=None, use_lock=True):
 			# Checks the rate limits
 			await cls.method_limit.check_cooldown(region=region)
 
-			response = await func(*args, cls=cls, region=region, **kwargs)  # type: (bytes, dict,)
+			token = current_method_limit.set(cls.method_limit)
+			try:
+				response = await func(*args, cls=cls, region=region, **kwargs)  # type: (object, dict,)
+			finally:
+				current_method_limit.reset(token)
 
 			if not response:
 				RateLimit.logger.warning(msg="[Method]Failure: Empty reponse from {}".format(func.__name__))
@@ -216,7 +631,7 @@ def method_limited(refresh_cooldown=3600, name=None, use_lock=True):
 
 			# Insures region is within the dictionary.
 			if region.lower() not in cls.method_limit.region_limits:
-				cls.info("[Error]: Region was not within dictionary, adding.")
+				RateLimit.logger.info(msg="[Method]: Region was not within dictionary, adding.")
 				cls.method_limit.region_limits[region.lower()] = RateLimit.Region(
 					region=region,
 					lock=use_lock)
@@ -250,7 +665,7 @@ def method_limited(refresh_cooldown=3600, name=None, use_lock=True):
 									every=float(every),
 									region=region,
 									count=rate_limit_count[every]):
-								cls.info(
+								RateLimit.logger.info(
 									msg=f"[Method] LIMIT: added limit <{rate_limits[every]}/{every}s> with count {rate_limit_count[every]}.")
 
 				region_limit.time = time.time()
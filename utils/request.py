@@ -1,55 +1,45 @@
-from typing import Union
+from typing import Union, Callable, Awaitable
 
 import AAshe.errors as errors
+import AAshe.utils.config as config
 import AAshe.utils.ratelimit as ratelimit
+import AAshe.utils.serialization as serialization
 import AAshe.sqlite
+import AAshe.client
 
 import aiohttp
+import asyncio
+import random
 import time
-import json
 
+exceptions = \
+	{
+		# You fucked up
+		400: errors.BadRequest,
+		401: errors.Unauthorized,
+		403: errors.Forbidden,
+		404: errors.DataNotFound,
+		405: errors.MethodNotAllowed,
+		415: errors.UnsupportedMediaType,
+		429: errors.RateLimitExceeded,
 
-async def make_riot_request(
-	cls: AAshe.sqlite.SQLite, aiosession: aiohttp.ClientSession, region: str, url: str, headers: dict, timeout: int=10, count=True) \
-		->(bytes, dict):
-	"""
-	Makes a web request with an aiosession and returns the data.
+		# Server fucked up
+		500: errors.InternalServerError,
+		502: errors.BadGateway,
+		503: errors.ServiceUnavailable,
+		504: errors.GatewayTimeout
+	}
 
-	Args:
-		cls: AAshe.sqlite.MessagePrint
-			Used to broadcast status messages.
-		aiosession:
-			aiosession used to make the request.
-		region:
-			Region used in the request.
-		url:
-			URL to call.
-		headers:
-			Headers used for the call, usually empty.
-		timeout:
-			Timeout timer.
-		count:
-			If it should count on the rate limit.
 
-	Returns:
-		(bytes, dict)
-			Contains the raw data, and the return headers.
-	"""
-	# Insures there is a Rate Limit object
-	if ratelimit.RateLimit.key_limit is None:
-		ratelimit.RateLimit.key_limit = ratelimit.RateLimit(name="Api Key Limit")
-	
-	# Checks the rate limits
-	await ratelimit.RateLimit.key_limit.check_cooldown(region=region, count=count)
-	
-	resp_data = None
-	resp_headers = None
-	# Makes actual request
-	with aiohttp.Timeout(timeout):
-		async with aiosession.get(url=url.format(region.lower()), headers=headers) as resp:
-			resp_data = await resp.read()
-			resp_headers = resp.headers
-	
+retry_statuses = (429, 500, 502, 503, 504)
+
+parse_read_bufsize = 16 * 1024
+# Bytes buffered of a response that is parsed as it arrives, see `make_riot_request`. Parsing
+# is slower than the network, so up to twice this waits in memory for every such response.
+
+
+def update_key_limit(cls: AAshe.sqlite.SQLite, region: str, resp_headers: dict)->None:
+	"""Reads the api key limits from the headers of a response."""
 	if region.lower() not in ratelimit.RateLimit.key_limit.region_limits:
 		cls.info(msg="Region was not within dictionary, adding.")
 		ratelimit.RateLimit.key_limit.region_limits[region.lower()] = ratelimit.RateLimit.Region(
@@ -77,9 +67,9 @@ async def make_riot_request(
 					
 					rate_limit_count = {}
 					for str_limit in resp_headers["X-App-Rate-Limit-Count"].strip().split(","):
-						count, every = str_limit.split(":", 1)
+						rate_count, every = str_limit.split(":", 1)
 						
-						rate_limit_count[int(every)] = int(count)
+						rate_limit_count[int(every)] = int(rate_count)
 					
 					# Adds them
 					for every in list(rate_limits.keys()):
@@ -91,30 +81,134 @@ async def make_riot_request(
 							
 							cls.debug(msg=f"Added limit <{rate_limits[every]}/{every}s> with count {rate_limit_count[every]}.")
 
-	if "status" in json.loads(resp_data.decode()):
-		exceptions = \
-			{
-				# You fucked up
-				400: errors.BadRequest,
-				401: errors.Unauthorized,
-				403: errors.Forbidden,
-				404: errors.DataNotFound,
-				405: errors.MethodNotAllowed,
-				415: errors.UnsupportedMediaType,
-				429: errors.RateLimitExceeded,
-
-				# Server fucked up
-				500: errors.InternalServerError,
-				502: errors.BadGateway,
-				503: errors.ServiceUnavailable,
-				504: errors.GatewayTimeout
-			}
-		
-		exception = exceptions[json.loads(resp_data.decode())["status"]["status_code"]]
-		exception.server_message = json.loads(resp_data.decode())["status"]["message"]
-		raise exception
+
+def retry_delay(resp_headers: dict, attempt: int)->float:
+	"""Seconds to wait before retrying, the Retry-After if there is one, else a jittered exponential backoff."""
+	if resp_headers and "Retry-After" in resp_headers:
+		try:
+			return float(resp_headers["Retry-After"])
+		except ValueError:
+			pass
+	
+	# Full jitter, so the callers retrying after the same failure don't all come back at once.
+	return random.uniform(0, min(config.Config.retry_backoff_max, config.Config.retry_backoff * 2 ** attempt))
+
+
+def make_exception(resp_status: int, resp_data: bytes)->errors.AAsheException:
+	"""Returns the exception matching the status code."""
+	if resp_status in exceptions:
+		exception = exceptions[resp_status]()
+	else:
+		exception = errors.AAsheException()
+		exception.message = "Unexpected status code"
+		exception.status_code = resp_status
 	
-	return resp_data, resp_headers
+	# The body is only read for the message, and might not even be json.
+	try:
+		exception.server_message = serialization.loads(resp_data)["status"]["message"]
+	except (ValueError, KeyError, TypeError):
+		exception.server_message = None
+	return exception
 
 
-a
\ No newline at end of file
+async def make_riot_request(
+	cls: AAshe.sqlite.SQLite, aiosession: aiohttp.ClientSession, region: str, url: str, headers: dict, timeout: int=10, count=True,
+	retries: int=None, parse: Callable[[aiohttp.StreamReader], Awaitable[object]]=None) \
+		->(object, dict):
+	"""
+	Makes a web request with an aiosession and returns the decoded data.
+	
+	The body is only decoded once, with `AAshe.utils.serialization.loads`,
+	errors are recognized from the status code of the response.
+	
+	Responses with 429, 500, 502, 503 and 504 are retried. A 429 with
+	X-Rate-Limit-Type application or method holds back every call on that
+	limit for the Retry-After, the others wait with a jittered exponential backoff.
+
+	Args:
+		cls: AAshe.sqlite.SQLite
+			Used to broadcast status messages.
+		aiosession:
+			aiosession used to make the request, if None the pooled session
+			of the shared `AAshe.client.AAshe` is used.
+		region:
+			Region used in the request.
+		url:
+			URL to call.
+		headers:
+			Headers used for the call, usually empty.
+		timeout:
+			Timeout timer.
+		count:
+			If it should count on the rate limit.
+		retries:
+			How many times to retry, `Config.retries` if None.
+		parse:
+			Parses the body of a successful response from its stream as it arrives,
+			instead of it being read whole and decoded, see
+			`AAshe.utils.serialization.stream_items`. What it returns is the data.
+
+	Returns:
+		(object, dict)
+			Contains the decoded data, and the return headers.
+	
+	Raises:
+		AAsheException: The matching exception from `AAshe.errors` if the status code is 400 or above,
+			after the retries are used up.
+	"""
+	# Insures there is a Rate Limit object
+	if ratelimit.RateLimit.key_limit is None:
+		ratelimit.RateLimit.key_limit = ratelimit.RateLimit(name="Api Key Limit")
+	
+	if aiosession is None:
+		aiosession = AAshe.client.AAshe.shared().aiosession
+	
+	if retries is None:
+		retries = config.Config.retries
+	
+	method_limit = ratelimit.current_method_limit.get()
+	
+	attempt = 0
+	while True:
+		# Checks the rate limits, the first call was already checked on the method limit by the endpoint.
+		await ratelimit.RateLimit.key_limit.check_cooldown(region=region, count=count)
+		if attempt and method_limit is not None:
+			await method_limit.check_cooldown(region=region)
+		
+		resp_data = None
+		resp_headers = None
+		resp_status = None
+		# Makes actual request
+		async with aiosession.get(
+				url=url.format(region.lower()),
+				headers=headers,
+				timeout=aiohttp.ClientTimeout(total=timeout),
+				read_bufsize=parse_read_bufsize if parse is not None else None) as resp:
+			resp_headers = resp.headers
+			resp_status = resp.status
+			if parse is not None and resp_status < 400:
+				data = await parse(resp.content)
+			else:
+				resp_data = await resp.read()
+		
+		update_key_limit(cls=cls, region=region, resp_headers=resp_headers)
+		
+		if resp_status < 400:
+			return (data if parse is not None else serialization.loads(resp_data)), resp_headers
+		
+		if resp_status not in retry_statuses or attempt >= retries:
+			raise make_exception(resp_status=resp_status, resp_data=resp_data)
+		
+		delay = retry_delay(resp_headers=resp_headers, attempt=attempt)
+		attempt += 1
+		
+		limit_type = resp_headers.get("X-Rate-Limit-Type") if resp_status == 429 else None
+		cls.warning(msg=f"Retry {attempt}/{retries} of {resp_status} ({limit_type or 'no limit type'}) in {delay:.2f}s.")
+		
+		# The limits make every waiter hold back, the others only wait themselves.
+		if limit_type == "application":
+			ratelimit.RateLimit.key_limit.penalize(region=region, seconds=delay)
+		elif limit_type == "method" and method_limit is not None:
+			method_limit.penalize(region=region, seconds=delay)
+		else:
+			await asyncio.sleep(delay)
@@ -0,0 +1,313 @@
+import tempfile
+import typing
+import zlib
+import abc
+import json
+
+try:
+	import orjson
+except ImportError:
+	orjson = None
+
+try:
+	import msgpack
+except ImportError:
+	msgpack = None
+
+try:
+	import zstandard
+except ImportError:
+	zstandard = None
+
+try:
+	import ijson
+except ImportError:
+	ijson = None
+
+# Why this?
+# Responses are decoded once, in the request layer, and orjson is a lot faster
+# on the multi-megabyte timeline payloads. Both accept bytes as well as str.
+if orjson is not None:
+	loads = orjson.loads
+	backend = "orjson"
+
+	def dumps(value: object)->bytes:
+		return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+else:
+	loads = json.loads
+	backend = "json"
+
+	def dumps(value: object)->bytes:
+		return json.dumps(value, separators=(",", ":")).encode()
+
+
+class ListWriter:
+	"""
+	Encodes a list for a column of `codec` an item at a time, see `Codec.list_writer`.
+
+	Every item is encoded as it is appended, and what was encoded is kept in a
+	temporary file once it takes more than `spill_bytes`, so a list being
+	received doesn't take its size in memory and isn't decoded again to be
+	encoded. The items are written as JSON, which `codec.encode_json` turns into
+	the column.
+	"""
+
+	spill_bytes = 16 * 1024
+
+	__slots__ = (
+		"codec",  # type: Codec
+		"file",  # type: tempfile.SpooledTemporaryFile
+		"count",  # type: int
+	)
+
+	def __init__(self, codec: 'Codec'):
+		self.codec = codec
+		self.file = tempfile.SpooledTemporaryFile(max_size=self.spill_bytes)
+		self.count = 0
+		self.file.write(b"[")
+
+	def append(self, item: object)->None:
+		if self.count:
+			self.file.write(b",")
+		self.file.write(dumps(item))
+		self.count += 1
+
+	def read(self)->bytes:
+		"""Returns what was written and closes the file."""
+		self.file.seek(0)
+		data = self.file.read()
+		self.close()
+		return data
+
+	def finish(self)->typing.Union[str, bytes]:
+		"""Returns the list as it is written to the column."""
+		self.file.write(b"]")
+		return self.codec.encode_json(self.read())
+
+	def close(self)->None:
+		self.file.close()
+
+
+class MessagePackListWriter(ListWriter):
+	"""Packs every item with MessagePack, the array header is written once their amount is known."""
+
+	__slots__ = ()
+
+	def __init__(self, codec: 'Codec'):
+		self.codec = codec
+		self.file = tempfile.SpooledTemporaryFile(max_size=self.spill_bytes)
+		self.count = 0
+
+	def append(self, item: object)->None:
+		self.file.write(msgpack.packb(item))
+		self.count += 1
+
+	def finish(self)->bytes:
+		return bytes((self.codec.tag,)) + msgpack.Packer().pack_array_header(self.count) + self.read()
+
+
+class Codec(abc.ABC):
+	"""
+	Encodes the nested columns of a model, the lists, dicts and `SQLiteSubClass`
+	values, for writing and decodes them when they are read.
+
+	Binary codecs prefix what they write with their `tag`, so `decode` reads a
+	column whatever codec wrote it, and the codec of a model can be changed
+	without rewriting its table.
+	"""
+
+	name = None  # type: str
+	tag = None  # type: int
+	column_type = "BLOB"
+	available = True  # If the optional module the codec needs is installed.
+
+	def __repr__(self):
+		return "<{}:{}>".format(self.__class__.__name__, self.name)
+
+	def encode(self, value: object)->typing.Union[str, bytes]:
+		"""Returns `value` as it is written to the column."""
+		return bytes((self.tag,)) + self.dumps(value)
+
+	def encode_json(self, data: bytes)->typing.Union[str, bytes]:
+		"""Returns the JSON document `data` as it is written to the column, decoding it only if the codec needs to."""
+		return self.encode(loads(data))
+
+	def list_writer(self)->ListWriter:
+		"""Returns a writer a list is appended to an item at a time, and encoded like `encode` once it's finished."""
+		return ListWriter(codec=self)
+
+	@abc.abstractmethod
+	def dumps(self, value: object)->bytes:
+		"""Returns `value` encoded, without the tag."""
+
+	@abc.abstractmethod
+	def loads(self, data: bytes)->object:
+		"""Returns the value `data`, without the tag, encodes."""
+
+
+class JSONCodec(Codec):
+	"""JSON text, what the nested columns have always held."""
+
+	name = "json"
+	column_type = "TEXT"
+
+	def encode(self, value: object)->str:
+		return dumps(value).decode()
+
+	def encode_json(self, data: bytes)->str:
+		return data.decode()
+
+	def dumps(self, value: object)->bytes:
+		return dumps(value)
+
+	def loads(self, data: typing.Union[str, bytes])->object:
+		return loads(data)
+
+
+class MessagePackCodec(Codec):
+	"""MessagePack, smaller than JSON and faster to decode. Needs `msgpack`."""
+
+	name = "msgpack"
+	tag = 1
+	available = msgpack is not None
+
+	def dumps(self, value: object)->bytes:
+		return msgpack.packb(value)
+
+	def loads(self, data: bytes)->object:
+		return msgpack.unpackb(data, strict_map_key=False)
+
+	def list_writer(self)->ListWriter:
+		return MessagePackListWriter(codec=self)
+
+
+class ZlibCodec(Codec):
+	"""JSON compressed with zlib, from the standard library."""
+
+	name = "zlib"
+	tag = 2
+
+	def __init__(self, level: int=6):
+		self.level = level
+
+	def encode_json(self, data: bytes)->bytes:
+		return bytes((self.tag,)) + zlib.compress(data, self.level)
+
+	def dumps(self, value: object)->bytes:
+		return zlib.compress(dumps(value), self.level)
+
+	def loads(self, data: bytes)->object:
+		return loads(zlib.decompress(data))
+
+
+class ZstdCodec(Codec):
+	"""JSON compressed with Zstandard, about as small as zlib for a fraction of the time. Needs `zstandard`."""
+
+	name = "zstd"
+	tag = 3
+	available = zstandard is not None
+
+	def __init__(self, level: int=3):
+		self.level = level
+
+	def encode_json(self, data: bytes)->bytes:
+		return bytes((self.tag,)) + zstandard.ZstdCompressor(level=self.level).compress(data)
+
+	def dumps(self, value: object)->bytes:
+		return zstandard.ZstdCompressor(level=self.level).compress(dumps(value))
+
+	def loads(self, data: bytes)->object:
+		return loads(zstandard.ZstdDecompressor().decompress(data))
+
+
+codecs = {codec.name: codec for codec in (JSONCodec(), MessagePackCodec(), ZlibCodec(), ZstdCodec())}
+tags = {codec.tag: codec for codec in codecs.values() if codec.tag is not None}
+
+
+def get_codec(codec: typing.Union[str, Codec])->Codec:
+	"""Returns the codec named `codec`, or `codec` itself.
+
+	Raises:
+		KeyError: If there is no codec with that name.
+		ImportError: If the module the codec needs isn't installed.
+	"""
+	if isinstance(codec, str):
+		codec = codecs[codec]
+	if not codec.available:
+		raise ImportError(f"The {codec.name} codec needs a module that isn't installed.")
+	return codec
+
+
+def decode(data: typing.Union[str, bytes, None])->object:
+	"""Decodes a nested column written by any of the codecs, text is JSON.
+
+	Raises:
+		ValueError: If the blob wasn't written by a known codec.
+	"""
+	if data is None:
+		return None
+	if isinstance(data, str):
+		return loads(data)
+
+	codec = tags.get(data[0])
+	if codec is None:
+		raise ValueError(f"Unknown codec tag {data[0]}.")
+	return get_codec(codec).loads(memoryview(data)[1:])
+
+
+async def stream_items(
+		stream: typing.Any,
+		handlers: typing.Dict[str, typing.Callable[[object], None]],
+		chunk_size: int=64 * 1024)->None:
+	"""Parses the JSON document of `stream` incrementally, handing every item to the handler of its prefix.
+
+	The items are handed over as soon as they are parsed, so only the chunk and
+	the items being parsed are held on to, never the whole document. The prefixes
+	are those of ijson, like "frames.item" for every element of the list "frames",
+	or "frameInterval" for a value of the document.
+
+	Args:
+		stream: What the document is read from with `await stream.read(chunk_size)`,
+			like the `content` of an aiohttp response.
+		handlers(dict): The function called with every item by prefix.
+		chunk_size(int): Bytes read at once.
+
+	Raises:
+		ImportError: If ijson isn't installed.
+		ValueError: If the document isn't valid JSON.
+	"""
+	if ijson is None:
+		raise ImportError("Parsing a stream needs ijson, which isn't installed.")
+
+	# The document is parsed once, the items of the prefixes are built from its events.
+	events = ijson.sendable_list()
+	parser = ijson.parse_coro(events, use_float=True)
+	# The item being built, and its prefix.
+	builder = prefix = None
+
+	try:
+		while True:
+			chunk = await stream.read(chunk_size)
+			if chunk:
+				parser.send(chunk)
+			else:
+				parser.close()
+			for current, event, value in events:
+				if builder is not None:
+					builder.event(event, value)
+					# Nested containers have longer prefixes, the item ends with its own.
+					if current == prefix and (event == "end_map" or event == "end_array"):
+						handlers[prefix](builder.value)
+						builder = None
+				elif current in handlers and event != "map_key":
+					if event == "start_map" or event == "start_array":
+						builder = ijson.ObjectBuilder()
+						builder.event(event, value)
+						prefix = current
+					else:
+						handlers[current](value)
+			del events[:]
+			if not chunk:
+				return
+	except ijson.JSONError as e:
+		raise ValueError(f"Invalid JSON document: {e}") from e
@@ -0,0 +1,79 @@
+import typing
+import asyncio
+import logging
+
+
+class SingleFlight:
+	"""
+	Shares one in-flight call between every coroutine asking for the same key.
+
+	The call runs as its own task, so a caller being cancelled doesn't cancel it
+	for the others still waiting on it.
+	"""
+
+	logger = logging.getLogger(__name__)
+
+	__slots__ = (
+		"name",  # type: str
+		"calls",  # type: typing.Dict[typing.Hashable, asyncio.Future]
+	)
+
+	def __init__(self, name: str):
+		self.name = name
+		self.calls = {}
+
+	def __repr__(self):
+		return "<{}:{}>".format(self.name, len(self.calls))
+
+	async def do(self, key: typing.Hashable, func: typing.Callable, *args, **kwargs)->object:
+		"""Awaits the call in flight for `key`, or starts `func(*args, **kwargs)` if there is none.
+
+		Args:
+			key(typing.Hashable): Identifies identical calls.
+			func(typing.Callable): Coroutine function making the call.
+
+		Returns:
+			object: The result of the shared call.
+		"""
+		return await asyncio.shield(self.start(key, func, *args, **kwargs))
+
+	def start(self, key: typing.Hashable, func: typing.Callable, *args, **kwargs)->asyncio.Future:
+		"""Returns the call in flight for `key`, starting `func(*args, **kwargs)` if there is none, without awaiting it."""
+		task = self.calls.get(key)
+
+		if task is None:
+			task = asyncio.ensure_future(func(*args, **kwargs))
+			self.calls[key] = task
+			task.add_done_callback(lambda _: self.calls.pop(key, None))
+		else:
+			self.logger.debug(msg=f"[{self.name}] Joined call in flight for {key}.")
+
+		return task
+
+
+def coalesced(name: str=None):
+	"""
+	Coalesces identical concurrent requests to an endpoint into one.
+
+	Requests are identical when they share the region and url, the url
+	containing both the path and query parameters, and the `parse` of their
+	body if there is one. Every caller receives the same decoded document, so
+	it must be treated as read-only.
+
+	:param str name: Name of the endpoint.
+	:return: Decorated function sharing the in-flight request.
+	"""
+
+	def decorator(func: typing.Callable):
+		flight = SingleFlight(name=name or func.__name__)
+
+		async def wrapper(cls, region: str, url: str, *args, **kwargs):
+			"""Decorator wrapper function"""
+			return await flight.do(
+				(flight.name, region.lower(), url, kwargs.get("parse")),
+				func, cls, *args, region=region, url=url, **kwargs)
+
+		wrapper.flight = flight
+		return wrapper
+
+	return decorator